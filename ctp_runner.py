@@ -3,13 +3,15 @@ import time
 from datetime import datetime
 
 from engine.adapter_loader import load_adapter
-from engine.alert_manager import AlertManager
+from engine.alert_manager import build_alert_manager
 from engine.config_validator import report_validation, validate_config
 from engine.ctp_adapter import CtpAdapter
 from engine.ctp_loader import prepare_ctp_sdk
 from engine.gateway_ctp import CtpMarketDataGateway, CtpTradeGateway
+from engine.logger import build_logger
 from engine.position_reconciler import diff_account, diff_positions, summarize_positions
 from engine.reconnect import ReconnectPolicy
+from engine.state_db import state_options
 from engine.state_store import StateStore
 
 
@@ -39,9 +41,9 @@ def main():
     report_validation(errors, warnings)
 
     ctp = cfg["ctp"]
-    monitor = cfg.get("monitor", {})
     symbol = cfg.get("symbol", "")
-    alert = AlertManager(monitor.get("alert_file", "logs/alerts.log"), monitor.get("webhook_url", ""))
+    logger = build_logger(cfg)
+    alert = build_alert_manager(cfg)
 
     sdk_path = ctp.get("sdk_path", "")
     simulate = ctp.get("simulate", True)
@@ -58,7 +60,7 @@ def main():
         base_delay=reconnect_cfg.get("base_delay", 1.0),
         max_delay=reconnect_cfg.get("max_delay", 30.0),
     )
-    store = StateStore(ctp.get("state_path", "state/ctp_state.json"))
+    store = StateStore(ctp.get("state_path", "state/ctp_state.json"), **state_options(cfg))
 
     md_args = {
         "broker_id": ctp.get("broker_id"),
@@ -79,7 +81,7 @@ def main():
         "product_info": ctp.get("product_info"),
     }
 
-    print("[CTP] connecting...")
+    logger.log("[CTP] connecting...")
     md_ok = _connect_with_retry("md", md, md_args, policy, alert)
     td_ok = _connect_with_retry("td", td, td_args, policy, alert)
     if not (md_ok and td_ok):
@@ -106,7 +108,7 @@ def main():
             "symbol": symbol,
         }
     )
-    print(f"[CTP] connected (simulate={simulate})")
+    logger.log(f"[CTP] connected (simulate={simulate})")
 
     watchdog = ctp.get("watchdog", {}) or {}
     interval_sec = int(watchdog.get("interval_sec", 30))
@@ -162,6 +164,11 @@ def main():
             mismatch = bool(position_diffs or account_diffs)
             if mismatch and not protection_mode:
                 protection_mode = True
+                logger.error(
+                    "[CTP] reconcile mismatch, protection mode on",
+                    position_diffs=position_diffs,
+                    account_diffs=account_diffs,
+                )
                 alert.send_event(
                     event="ctp_reconcile_mismatch",
                     level="ERROR",
@@ -170,6 +177,7 @@ def main():
                 )
             if not mismatch and protection_mode:
                 protection_mode = False
+                logger.log("[CTP] reconcile recovered, protection mode off")
                 alert.send_event(
                     event="ctp_reconcile_recovered",
                     level="INFO",
@@ -210,7 +218,10 @@ def main():
     except KeyboardInterrupt:
         md.disconnect()
         td.disconnect()
-        print("[CTP] exit")
+        logger.log("[CTP] exit")
+    finally:
+        logger.close()
+        alert.close()
 
 
 if __name__ == "__main__":
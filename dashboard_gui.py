@@ -6,9 +6,16 @@ import threading
 import tkinter as tk
 from tkinter import ttk
 
+from engine.change_feed import FileWatch, TailReader, build_feed_listener
 from engine.data_policy import assert_source_allowed, get_data_policy
+from engine.runtime_state import RuntimeState
+from engine.state_db import StateDB
 from main import main as run_backtest_main
 
+# Poll interval bounds: back to the minimum on any change, doubled while idle.
+POLL_MIN_MS = 400
+POLL_MAX_MS = 3000
+
 
 def _read_json(path):
     if not os.path.exists(path):
@@ -39,6 +46,27 @@ class MonitorUI:
         self.config_path = "config.json"
         self.cfg = _read_json(self.config_path)
         self.alert_path = (self.cfg.get("monitor", {}) or {}).get("alert_file", "logs/alerts.log")
+        # With the sqlite state backend the runtime snapshot is read from the database,
+        # over a private connection: PRAGMA data_version only moves for commits made by
+        # other connections, including a backtest started from this window.
+        state_cfg = self.cfg.get("state", {}) or {}
+        self.runtime_db = None
+        if state_cfg.get("backend") == "sqlite":
+            db = StateDB(state_cfg.get("db_path", "state/state.db"))
+            self.runtime_db = RuntimeState(self.runtime_path, db=db, export_json=False)
+        self.runtime_db_version = None
+        # Files are only parsed after a stat shows a new mtime/size; alerts.log is tailed
+        # from its end. With monitor.runtime_feed_port set, main/sim_live push runtime
+        # updates over a local UDP socket and the file is only re-read on "resync".
+        portfolio_dir = (self.cfg.get("portfolio", {}) or {}).get("output_dir", os.path.join("output", "portfolio"))
+        self.portfolio_path = os.path.join(portfolio_dir, "portfolio_summary.json")
+        self.runtime_watch = FileWatch(self.runtime_path)
+        self.perf_watch = FileWatch(self.perf_path)
+        self.portfolio_watch = FileWatch(self.portfolio_path)
+        self.paper_check_watch = FileWatch(self.paper_check_path)
+        self.alert_tail = TailReader(self.alert_path)
+        self.feed = build_feed_listener(self.cfg)
+        self.poll_ms = POLL_MIN_MS
 
         self.worker = None
         self.fetch_worker = None
@@ -54,6 +82,7 @@ class MonitorUI:
         self.live_output = ""
         self.live_stopping = False
         self.last_runtime_ts = ""
+        self.last_event_seq = 0
         self.last_trade_key = ""
 
         if not default_symbol:
@@ -436,6 +465,10 @@ class MonitorUI:
 
     def _on_close(self):
         self._stop_live_run()
+        if self.feed is not None:
+            self.feed.close()
+        if self.runtime_db is not None:
+            self.runtime_db.db.close()
         self.root.destroy()
 
     def _update_from_runtime(self, runtime):
@@ -468,7 +501,24 @@ class MonitorUI:
             self.var_strategy_params.set(text)
 
         ts = runtime.get("updated_at", "")
-        if ts and ts != self.last_runtime_ts:
+        events = runtime.get("recent_events")
+        if isinstance(events, list) and events:
+            # Coalesced snapshots can skip events; the ring keeps every one of them.
+            if events[-1].get("seq", 0) < self.last_event_seq:
+                self.last_event_seq = 0
+            for item in events:
+                seq = item.get("seq", 0)
+                if seq <= self.last_event_seq:
+                    continue
+                self.last_event_seq = seq
+                self._append_log(
+                    f"{item.get('updated_at', ts)} 事件={self._event_text(item.get('event'))} "
+                    f"步骤={item.get('last_step', runtime.get('last_step', '-'))} "
+                    f"价格={_format_num(item.get('last_price', runtime.get('last_price')))} "
+                    f"资金={_format_num(item.get('capital', runtime.get('capital')))}"
+                )
+            self.last_runtime_ts = ts
+        elif ts and ts != self.last_runtime_ts:
             self.last_runtime_ts = ts
             event = self._event_text(runtime.get("event", "tick"))
             self._append_log(
@@ -497,9 +547,11 @@ class MonitorUI:
                     self.trade_table.delete(self.trade_table.get_children()[-1])
 
     def _update_from_performance(self):
+        if not self.perf_watch.changed():
+            return False
         perf = _read_json(self.perf_path)
         if not perf:
-            return
+            return True
         self.var_pnl.set(_format_num(perf.get("total_pnl")))
         self.var_win_rate.set(f"{float(perf.get('win_rate', 0.0)):.2f}%")
         self.var_drawdown.set(_format_num(perf.get("max_drawdown")))
@@ -507,48 +559,107 @@ class MonitorUI:
         self.var_sortino.set(_format_num(perf.get("sortino")))
         self.var_profit_factor.set(_format_num(perf.get("profit_factor")))
         self.var_expectancy.set(_format_num(perf.get("expectancy")))
+        return True
 
     def _update_from_portfolio(self):
-        portfolio_cfg = self.cfg.get("portfolio", {})
-        portfolio_dir = portfolio_cfg.get("output_dir", os.path.join("output", "portfolio"))
-        summary = _read_json(os.path.join(portfolio_dir, "portfolio_summary.json"))
+        if not self.portfolio_watch.changed():
+            return False
+        summary = _read_json(self.portfolio_path)
         if not summary:
-            return
+            return True
         self.var_portfolio_pnl.set(_format_num(summary.get("total_pnl")))
         self.var_portfolio_dd.set(_format_num(summary.get("max_drawdown")))
         self.var_portfolio_symbols.set(str(len(summary.get("selected_symbols", []))))
         self.var_portfolio_blocked.set(str(len(summary.get("blocked_by_corr", []))))
         self.var_portfolio_method.set(str(summary.get("weight_method", "-")))
         self.var_portfolio_rebalance.set(str(summary.get("rebalance_events", 0)))
+        return True
 
     def _update_from_paper_check(self):
+        if not self.paper_check_watch.changed():
+            return False
         report = _read_json(self.paper_check_path)
         if not report:
-            return
+            return True
         ok = bool(report.get("ok"))
         errors = int(report.get("error_count", 0) or 0)
         self.var_paper_check.set("通过" if ok else f"失败({errors})")
+        return True
 
     def _update_last_alert(self):
-        if not os.path.exists(self.alert_path):
-            return
         try:
-            with open(self.alert_path, "r", encoding="utf-8") as f:
-                lines = [line.strip() for line in f if line.strip()]
-            if not lines:
-                return
-            self.var_last_alert.set(lines[-1])
+            lines = self.alert_tail.poll()
         except Exception:
-            pass
+            return False
+        if not lines:
+            return False
+        self.var_last_alert.set(lines[-1])
+        return True
+
+    def _read_runtime(self, force=False):
+        # Returns the runtime snapshot when it changed since the last call, else None.
+        if self.runtime_db is not None:
+            try:
+                version = self.runtime_db.db.data_version()
+                if version == self.runtime_db_version and not force:
+                    return None
+                self.runtime_db_version = version
+                return self.runtime_db.load()
+            except Exception:
+                return None
+        if not self.runtime_watch.changed() and not force:
+            return None
+        return _read_json(self.runtime_path)
 
-    def _poll(self):
-        runtime = _read_json(self.runtime_path)
+    def _mark_runtime_seen(self):
+        if self.runtime_db is not None:
+            try:
+                self.runtime_db_version = self.runtime_db.db.data_version()
+            except Exception:
+                pass
+        else:
+            self.runtime_watch.changed()
+
+    def _feed_gap(self, payload):
+        # True when the first pushed event does not follow the last one shown. A lower
+        # last seq means a new run (seqs restart), checked against 0 like the display does.
+        events = payload.get("recent_events")
+        if not isinstance(events, list) or not events:
+            return False
+        last = self.last_event_seq if events[-1].get("seq", 0) >= self.last_event_seq else 0
+        return events[0].get("seq", 0) > last + 1
+
+    def _update_runtime_feed(self):
+        changed = False
+        resync = False
+        if self.feed is not None:
+            for payload in self.feed.drain():
+                if payload.get("resync"):
+                    resync = True
+                    continue
+                if self._feed_gap(payload):
+                    # A datagram was dropped: read the file/db ring before applying any
+                    # later payload, or the missed events would look already seen.
+                    resync = True
+                    break
+                self._update_from_runtime(payload)
+                changed = True
+        if changed and not resync:
+            # The pushed payload already carries what the file/db holds; just mark it seen.
+            self._mark_runtime_seen()
+            return True
+        runtime = self._read_runtime(force=resync)
         if runtime:
             self._update_from_runtime(runtime)
-        self._update_from_performance()
-        self._update_from_portfolio()
-        self._update_from_paper_check()
-        self._update_last_alert()
+            changed = True
+        return changed
+
+    def _poll(self):
+        changed = self._update_runtime_feed()
+        changed = self._update_from_performance() or changed
+        changed = self._update_from_portfolio() or changed
+        changed = self._update_from_paper_check() or changed
+        changed = self._update_last_alert() or changed
 
         if self.fetch_worker and not self.fetch_worker.is_alive() and self.btn_fetch["state"] == tk.DISABLED:
             self.btn_fetch.configure(state=tk.NORMAL)
@@ -593,7 +704,12 @@ class MonitorUI:
                 self.var_status.set("模拟盘完成")
                 self._append_log("模拟盘完成")
 
-        self.root.after(400, self._poll)
+        busy = any(
+            w is not None and w.is_alive()
+            for w in (self.worker, self.fetch_worker, self.portfolio_worker, self.live_worker)
+        )
+        self.poll_ms = POLL_MIN_MS if (changed or busy) else min(self.poll_ms * 2, POLL_MAX_MS)
+        self.root.after(self.poll_ms, self._poll)
 
 
 def main(default_symbol=None, auto_start=False, auto_start_live=False):
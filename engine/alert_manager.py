@@ -1,48 +1,231 @@
+import atexit
 import json
 import os
+import queue
+import threading
+import time
 from datetime import datetime
 from urllib import error, request
 
 
+# Webhook alerts per event and minute unless monitor.alert_rate_limit_per_min says otherwise.
+DEFAULT_RATE_LIMIT_PER_MIN = 10
+
+
 class AlertManager:
-    def __init__(self, alert_file="logs/alerts.log", webhook_url=""):
+    # Alerts are written to the local log (kept-open, line-flushed handle) and printed
+    # synchronously; webhook delivery runs on a background thread so a slow endpoint
+    # never blocks the caller. The webhook side has:
+    # - a bounded queue (alerts beyond `queue_size` are dropped and counted),
+    # - batching (up to `batch_size` alerts per POST; a lone alert is posted as-is),
+    # - retries with exponential backoff,
+    # - dedup: the same event and level (or the same explicit dedup_key) within
+    #   `dedup_sec` is suppressed (off by default); messages such as "cycle=N" differ
+    #   on every call, so they are not part of the key,
+    # - a per-event rate limit of `rate_limit_per_min` webhook alerts (0 = unlimited).
+    # Suppressed alerts still go to the local log, and the next delivered alert of that
+    # event carries "suppressed": <count>.
+    def __init__(
+        self,
+        alert_file="logs/alerts.log",
+        webhook_url="",
+        queue_size=1000,
+        batch_size=20,
+        batch_wait_sec=0.2,
+        max_retries=3,
+        retry_backoff_sec=0.5,
+        timeout_sec=5.0,
+        dedup_sec=0.0,
+        rate_limit_per_min=DEFAULT_RATE_LIMIT_PER_MIN,
+    ):
         self.alert_file = alert_file
         self.webhook_url = webhook_url
-        os.makedirs(os.path.dirname(alert_file), exist_ok=True)
+        self.batch_size = max(1, int(batch_size))
+        self.batch_wait_sec = float(batch_wait_sec)
+        self.max_retries = max(0, int(max_retries))
+        self.retry_backoff_sec = float(retry_backoff_sec)
+        self.timeout_sec = float(timeout_sec)
+        self.dedup_sec = float(dedup_sec or 0)
+        self.rate_limit_per_min = int(rate_limit_per_min or 0)
+        self.stats = {"queued": 0, "delivered": 0, "retried": 0, "dropped": 0, "failed": 0, "suppressed": 0}
+        folder = os.path.dirname(alert_file)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._file = None
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._last_sent = {}
+        self._sent_times = {}
+        self._suppressed = {}
+        self._worker = None
+        self._closed = False
+        self._exit_hook = False
+
+    def _write_line(self, line):
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.alert_file, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
 
     def send(self, message):
         ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         line = f"[{ts}] {message}"
-        with open(self.alert_file, "a", encoding="utf-8") as f:
-            f.write(line + "\n")
+        self._write_line(line)
         print(line)
 
-    def send_event(self, event, message, level="INFO", data=None):
+    def send_event(self, event, message, level="INFO", data=None, dedup_key=None):
         payload = {
             "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "level": str(level).upper(),
             "event": str(event),
             "message": str(message),
-            "data": data or {},
+            "data": dict(data or {}),
         }
-        with open(self.alert_file, "a", encoding="utf-8") as f:
-            f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+        self._write_line(json.dumps(payload, ensure_ascii=False))
         print(f"[{payload['time']}][{payload['level']}][{payload['event']}] {payload['message']}")
-        self._send_webhook(payload)
+        self._send_webhook(payload, dedup_key)
 
-    def _send_webhook(self, payload):
-        if not self.webhook_url:
+    def _admit(self, payload, now, dedup_key=None):
+        # Dedup / rate-limit gate for the webhook; returns False when suppressed.
+        event = payload["event"]
+        key = (event, payload["level"]) if dedup_key is None else ("key", str(dedup_key))
+        last = self._last_sent.get(key)
+        if self.dedup_sec > 0 and last is not None and now - last < self.dedup_sec:
+            return False
+        if self.rate_limit_per_min > 0:
+            times = [t for t in self._sent_times.get(event, []) if now - t < 60.0]
+            if len(times) >= self.rate_limit_per_min:
+                self._sent_times[event] = times
+                return False
+            times.append(now)
+            self._sent_times[event] = times
+        self._last_sent[key] = now
+        return True
+
+    def _send_webhook(self, payload, dedup_key=None):
+        if not self.webhook_url or self._closed:
             return
-        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            if not self._admit(payload, time.monotonic(), dedup_key):
+                self.stats["suppressed"] += 1
+                self._suppressed[payload["event"]] = self._suppressed.get(payload["event"], 0) + 1
+                return
+            suppressed = self._suppressed.pop(payload["event"], 0)
+        # The worker reads the payload later; queue a copy the caller cannot change.
+        payload = dict(payload)
+        if suppressed:
+            payload["suppressed"] = suppressed
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(payload)
+        except queue.Full:
+            with self._lock:
+                self.stats["dropped"] += 1
+            return
+        with self._lock:
+            self.stats["queued"] += 1
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="alert-webhook", daemon=True)
+            self._worker.start()
+            if not self._exit_hook:
+                atexit.register(self.close)
+                self._exit_hook = True
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.batch_wait_sec
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    nxt = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+            self._deliver(batch)
+            for _ in range(len(batch) + (1 if stop else 0)):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _post(self, body):
         req = request.Request(
             self.webhook_url,
             data=body,
             headers={"Content-Type": "application/json"},
             method="POST",
         )
-        try:
-            with request.urlopen(req, timeout=5):
-                return
-        except (error.URLError, TimeoutError):
-            # Alert channel is best effort. Fail quietly to avoid breaking the strategy loop.
+        with request.urlopen(req, timeout=self.timeout_sec):
+            return
+
+    def _deliver(self, batch):
+        payload = batch[0] if len(batch) == 1 else {"batch": len(batch), "alerts": batch}
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._post(body)
+            except (error.URLError, OSError, ValueError):
+                # Alert channel is best effort: retry with backoff, then count as failed.
+                if attempt < self.max_retries:
+                    with self._lock:
+                        self.stats["retried"] += 1
+                    time.sleep(self.retry_backoff_sec * (2**attempt))
+                continue
+            with self._lock:
+                self.stats["delivered"] += len(batch)
             return
+        with self._lock:
+            self.stats["failed"] += len(batch)
+
+    def flush(self, timeout=10.0):
+        # Waits until every queued webhook alert has been delivered or given up on.
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._queue.unfinished_tasks
+
+    def close(self, timeout=10.0):
+        if self._closed:
+            return
+        self._closed = True
+        if self._exit_hook:
+            atexit.unregister(self.close)
+            self._exit_hook = False
+        if self._worker is not None and self._worker.is_alive():
+            self.flush(timeout)
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                pass
+            self._worker.join(timeout=1.0)
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def build_alert_manager(cfg):
+    monitor = cfg.get("monitor", {}) or {}
+    return AlertManager(
+        alert_file=monitor.get("alert_file", "logs/alerts.log"),
+        webhook_url=monitor.get("webhook_url", ""),
+        queue_size=monitor.get("alert_queue_size", 1000),
+        batch_size=monitor.get("webhook_batch_size", 20),
+        max_retries=monitor.get("webhook_max_retries", 3),
+        timeout_sec=monitor.get("webhook_timeout_sec", 5.0),
+        dedup_sec=monitor.get("alert_dedup_sec", 0.0),
+        rate_limit_per_min=monitor.get("alert_rate_limit_per_min", DEFAULT_RATE_LIMIT_PER_MIN),
+    )
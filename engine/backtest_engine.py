@@ -1,5 +1,9 @@
 import os
-from datetime import datetime
+
+from engine.bar_store import bar_minute, minute_to_datetime
+from engine.recorders import EquityRecorder
+from engine.running_stats import RunningStats
+from engine.series_window import CloseBuffer, SeriesWindow
 
 
 def run_backtest(
@@ -19,12 +23,14 @@ def run_backtest(
     safety_cfg=None,
 ):
     capital = initial_capital
-    equity_curve = []
+    equity_curve = EquityRecorder(capacity=len(bars) or 1)
     daily_trade_count = 0
     current_date = None
     last_gate_reason = None
     peak_equity = initial_capital
     runtime_max_drawdown = 0.0
+    close_buffer = CloseBuffer()
+    stats = RunningStats()
 
     safety_cfg = safety_cfg or {}
     kill_switch_file = safety_cfg.get("kill_switch_file", "")
@@ -37,30 +43,20 @@ def run_backtest(
         dd = peak_equity - capital
         if dd > runtime_max_drawdown:
             runtime_max_drawdown = dd
-        total_trades = len(execution.trades)
-        win_trades = sum(1 for t in execution.trades if float(t.get("pnl", 0.0)) > 0)
-        win_rate = (win_trades / total_trades * 100.0) if total_trades > 0 else 0.0
+        stats.sync_trades(execution.trades)
         return {
             "total_pnl": capital - initial_capital,
             "runtime_drawdown": runtime_max_drawdown,
-            "win_rate": win_rate,
+            "win_rate": stats.win_rate,
         }
 
     def append_equity(step, bar_time):
-        equity_curve.append(
-            {
-                "step": step,
-                "cash": capital,
-                "unrealized": 0,
-                "equity": capital,
-                "drawdown": 0,
-                "datetime": bar_time,
-            }
-        )
+        equity_curve.append(step, capital, 0.0, capital, stats.add_equity(capital), bar_time)
 
     for step, bar in enumerate(bars):
         price = bar["close"]
-        bar_dt = datetime.strptime(bar["datetime"], "%Y-%m-%d %H:%M")
+        close_buffer.append(price)
+        bar_dt = minute_to_datetime(bar_minute(bar))
         bar_date = bar_dt.date()
         if runtime_update:
             metrics = runtime_metrics()
@@ -141,7 +137,7 @@ def run_backtest(
                         "capital": capital,
                         "position": execution.position,
                         "trades": len(execution.trades),
-                        "last_trade": execution.trades[-1],
+                        "last_trade": execution.trades[-1].to_dict(),
                         "halt_reason": risk.halt_reason,
                     }
                 )
@@ -162,7 +158,7 @@ def run_backtest(
             append_equity(step, bar["datetime"])
             continue
 
-        atr = risk.update_atr(bars[: step + 1])
+        atr = risk.update_atr(SeriesWindow(bars, step + 1))
         if hasattr(risk, "update_volatility_pause"):
             risk.update_volatility_pause(atr)
 
@@ -180,7 +176,7 @@ def run_backtest(
                             "capital": capital,
                             "position": execution.position,
                             "trades": len(execution.trades),
-                            "last_trade": execution.trades[-1],
+                            "last_trade": execution.trades[-1].to_dict(),
                         }
                     )
             append_equity(step, bar["datetime"])
@@ -201,8 +197,7 @@ def run_backtest(
             append_equity(step, bar["datetime"])
             continue
 
-        prices = [b["close"] for b in bars[: step + 1]]
-        signal = strategy.generate_signal(prices, step=step)
+        signal = strategy.generate_signal(close_buffer.window(), step=step)
         if signal == 0:
             block_by("NO_SIGNAL")
             append_equity(step, bar["datetime"])
@@ -257,7 +252,7 @@ def run_backtest(
                     "capital": capital,
                     "position": execution.position,
                     "trades": len(execution.trades),
-                    "last_trade": execution.trades[-1],
+                    "last_trade": execution.trades[-1].to_dict(),
                 }
             )
 
@@ -277,7 +272,9 @@ def run_backtest(
             }
         )
 
+    stats.sync_trades(execution.trades)
     return {
         "capital": capital,
         "equity_curve": equity_curve,
+        "stats": stats,
     }
@@ -58,8 +58,8 @@ def build_risk(config):
     )
 
 
-def run_once(config, bars, strategy_cfg):
-    execution = SimExecution(
+def build_execution(config):
+    return SimExecution(
         slippage=config["contract"]["slippage"],
         contract_multiplier=config["contract"].get("multiplier", 1),
         commission_per_contract=config["contract"].get("commission_per_contract", 0.0),
@@ -68,6 +68,10 @@ def run_once(config, bars, strategy_cfg):
         fill_ratio_max=config["contract"].get("fill_ratio_max", 1.0),
         cost_model=build_cost_model(config),
     )
+
+
+def run_once(config, bars, strategy_cfg):
+    execution = build_execution(config)
     risk = build_risk(config)
     strategy = create_strategy(strategy_cfg)
 
@@ -92,10 +96,10 @@ def run_once(config, bars, strategy_cfg):
         runtime_update=None,
     )
 
-    total_pnl = sum(trade["pnl"] for trade in execution.trades)
+    stats = result["stats"]
     return {
-        "pnl": float(total_pnl),
-        "trades": int(len(execution.trades)),
-        "max_drawdown": float(compute_max_drawdown(result["equity_curve"])),
+        "pnl": float(stats.pnl_sum),
+        "trades": int(stats.trades),
+        "max_drawdown": float(stats.max_drawdown),
     }
 
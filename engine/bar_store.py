@@ -0,0 +1,347 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+from collections.abc import Sequence
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+CACHE_VERSION = 2
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_EPOCH = datetime(1970, 1, 1)
+_COLUMNS = ("times", "minutes", "opens", "highs", "lows", "closes")
+_ITER_CHUNK = 4096
+
+
+def to_epoch_minute(text):
+    # "YYYY-MM-DD HH:MM[:SS]" -> minutes since 1970-01-01 (naive local time), -1 if unparsable.
+    try:
+        day = date(int(text[0:4]), int(text[5:7]), int(text[8:10])).toordinal() - _EPOCH_ORDINAL
+        return day * 1440 + int(text[11:13]) * 60 + int(text[14:16])
+    except (TypeError, ValueError):
+        return -1
+
+
+def bar_minute(bar):
+    # Epoch minute of a bar: the pre-parsed "ts" field when the loader set it, otherwise
+    # parsed from the datetime string (raises ValueError like strptime used to).
+    ts = bar.get("ts")
+    if ts is None:
+        ts = to_epoch_minute(bar["datetime"])
+    if ts < 0:
+        raise ValueError(f"Bad bar datetime: {bar.get('datetime')!r}")
+    return ts
+
+
+def datetime_to_minute(dt):
+    return (dt - _EPOCH) // timedelta(minutes=1)
+
+
+def minute_to_datetime(ts):
+    return _EPOCH + timedelta(minutes=int(ts))
+
+
+def minute_to_date(ts):
+    return date.fromordinal(ts // 1440 + _EPOCH_ORDINAL)
+
+
+def make_bar(dt, open_, high, low, close):
+    ts = to_epoch_minute(dt)
+    return {
+        "datetime": dt,
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "ts": ts,
+        "day_ord": ts // 1440 + _EPOCH_ORDINAL,
+        "minute_of_day": ts % 1440,
+    }
+
+
+class BarSeries(Sequence):
+    # Columnar bars: one contiguous array per field. Indexing yields the usual OHLC bar
+    # dict plus the pre-parsed clock fields ts (epoch minute), day_ord (date ordinal) and
+    # minute_of_day; slicing yields a BarSeries view.
+    __slots__ = _COLUMNS
+
+    def __init__(self, times, minutes, opens, highs, lows, closes):
+        self.times = times
+        self.minutes = minutes
+        self.opens = opens
+        self.highs = highs
+        self.lows = lows
+        self.closes = closes
+
+    @classmethod
+    def from_bars(cls, bars):
+        times = [str(b["datetime"]) for b in bars]
+        width = max([len(t) for t in times] + [1])
+        return cls(
+            np.array([t.encode("ascii", "replace") for t in times], dtype=f"S{width}"),
+            np.array([to_epoch_minute(t) for t in times], dtype=np.int64),
+            np.array([float(b["open"]) for b in bars], dtype=np.float64),
+            np.array([float(b["high"]) for b in bars], dtype=np.float64),
+            np.array([float(b["low"]) for b in bars], dtype=np.float64),
+            np.array([float(b["close"]) for b in bars], dtype=np.float64),
+        )
+
+    def __len__(self):
+        return len(self.closes)
+
+    def _bar(self, i):
+        ts = int(self.minutes[i])
+        return {
+            "datetime": self.times[i].decode("ascii"),
+            "open": float(self.opens[i]),
+            "high": float(self.highs[i]),
+            "low": float(self.lows[i]),
+            "close": float(self.closes[i]),
+            "ts": ts,
+            "day_ord": ts // 1440 + _EPOCH_ORDINAL,
+            "minute_of_day": ts % 1440,
+        }
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return BarSeries(*(getattr(self, name)[index] for name in _COLUMNS))
+        n = len(self)
+        if index < 0:
+            index += n
+        if index < 0 or index >= n:
+            raise IndexError("BarSeries index out of range")
+        return self._bar(index)
+
+    def __iter__(self):
+        for start in range(0, len(self), _ITER_CHUNK):
+            stop = start + _ITER_CHUNK
+            for t, o, h, lo, c, ts in zip(
+                self.times[start:stop].tolist(),
+                self.opens[start:stop].tolist(),
+                self.highs[start:stop].tolist(),
+                self.lows[start:stop].tolist(),
+                self.closes[start:stop].tolist(),
+                self.minutes[start:stop].tolist(),
+            ):
+                yield {
+                    "datetime": t.decode("ascii"),
+                    "open": o,
+                    "high": h,
+                    "low": lo,
+                    "close": c,
+                    "ts": ts,
+                    "day_ord": ts // 1440 + _EPOCH_ORDINAL,
+                    "minute_of_day": ts % 1440,
+                }
+
+    def __repr__(self):
+        return f"BarSeries(len={len(self)})"
+
+    def to_list(self):
+        return list(self)
+
+
+def read_csv_columns(path):
+    times = []
+    opens = []
+    highs = []
+    lows = []
+    closes = []
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return BarSeries.from_bars([])
+        index = {(name or "").replace("\ufeff", "").strip(): i for i, name in enumerate(header)}
+        missing = [key for key in ("datetime", "open", "high", "low", "close") if key not in index]
+        if missing:
+            raise KeyError(missing[0])
+        i_dt, i_o, i_h, i_l, i_c = (index[k] for k in ("datetime", "open", "high", "low", "close"))
+        for row in reader:
+            if not row:
+                continue
+            times.append(row[i_dt])
+            opens.append(float(row[i_o]))
+            highs.append(float(row[i_h]))
+            lows.append(float(row[i_l]))
+            closes.append(float(row[i_c]))
+    width = max([len(t) for t in times] + [1])
+    return BarSeries(
+        np.array([t.encode("ascii", "replace") for t in times], dtype=f"S{width}"),
+        np.array([to_epoch_minute(t) for t in times], dtype=np.int64),
+        np.array(opens, dtype=np.float64),
+        np.array(highs, dtype=np.float64),
+        np.array(lows, dtype=np.float64),
+        np.array(closes, dtype=np.float64),
+    )
+
+
+class CsvTailReader:
+    # Append-aware reader for a bar CSV that is polled repeatedly (sim_live). It keeps
+    # the parsed bars plus the byte offset and bytes of the last parsed row; each poll
+    # only parses what was written after that offset. When the bytes before the offset
+    # no longer match (file rewritten, truncated, or a partial row was extended) the
+    # whole file is parsed again and `reloaded` is set.
+    def __init__(self, path):
+        self.path = path
+        self.reset()
+
+    def reset(self):
+        self.bars = []
+        self.offset = 0
+        self.reloaded = False
+        self._last_line = b""
+        self._terminated = True
+        self._columns = None
+
+    @property
+    def latest_time(self):
+        return self.bars[-1]["datetime"] if self.bars else ""
+
+    def _continues(self, f, size):
+        if self._columns is None or size < self.offset:
+            return False
+        n = len(self._last_line)
+        f.seek(self.offset - n)
+        if f.read(n) != self._last_line:
+            return False
+        if not self._terminated and size > self.offset:
+            # The last row had no newline yet; anything but a newline means it grew.
+            return f.read(1) in (b"\n", b"\r")
+        return True
+
+    def poll(self):
+        # Returns the number of rows parsed by this call (bars appended to self.bars).
+        if not os.path.exists(self.path):
+            self.reset()
+            return 0
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self.reloaded = not self._continues(f, size)
+            if self.reloaded:
+                self.reset()
+                self.reloaded = True
+            f.seek(self.offset)
+            chunk = f.read(size - self.offset)
+        if not chunk:
+            return 0
+        parsed = 0
+        pos = 0
+        while pos < len(chunk):
+            nl = chunk.find(b"\n", pos)
+            end = len(chunk) if nl < 0 else nl + 1
+            raw = chunk[pos:end]
+            pos = end
+            line = raw.decode("utf-8-sig" if self.offset == 0 else "utf-8").strip()
+            self.offset += len(raw)
+            self._last_line = raw
+            self._terminated = nl >= 0
+            if not line:
+                continue
+            row = next(csv.reader([line]))
+            if self._columns is None:
+                self._columns = self._parse_header(row)
+                continue
+            self._parse_row(row)
+            parsed += 1
+        return parsed
+
+    # Subclasses override these two to read other CSVs the same way.
+    def _parse_header(self, row):
+        index = {name.replace("\ufeff", "").strip(): i for i, name in enumerate(row)}
+        return tuple(index[k] for k in ("datetime", "open", "high", "low", "close"))
+
+    def _parse_row(self, row):
+        i_dt, i_o, i_h, i_l, i_c = self._columns
+        self.bars.append(make_bar(row[i_dt], float(row[i_o]), float(row[i_h]), float(row[i_l]), float(row[i_c])))
+
+
+class BarStore:
+    # Binary column cache for data/<symbol>.csv, stored as .npy files in a generation
+    # folder under <data_dir>/.cache/<symbol>/ and memory-mapped on load. meta.json
+    # names the current generation; it is replaced atomically after a new generation
+    # is complete, so readers see either the old columns or the new ones, never a mix.
+    # The cache is rebuilt whenever the CSV size or mtime differs from meta.json.
+    def __init__(self, data_dir="data", cache_dir=None):
+        self.data_dir = data_dir
+        self.cache_dir = cache_dir or os.path.join(data_dir, ".cache")
+
+    def _csv_path(self, symbol):
+        return os.path.join(self.data_dir, f"{symbol}.csv")
+
+    def _symbol_dir(self, symbol):
+        return os.path.join(self.cache_dir, symbol)
+
+    def _signature(self, csv_path):
+        st = os.stat(csv_path)
+        return {"version": CACHE_VERSION, "csv_size": st.st_size, "csv_mtime_ns": st.st_mtime_ns}
+
+    def _read_meta(self, symbol):
+        path = os.path.join(self._symbol_dir(symbol), "meta.json")
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def _meta_fresh(self, meta, signature):
+        return bool(meta) and all(meta.get(k) == v for k, v in signature.items())
+
+    def is_fresh(self, symbol):
+        return self._meta_fresh(self._read_meta(symbol), self._signature(self._csv_path(symbol)))
+
+    def _load_cache(self, symbol, meta):
+        # None unless every column of the generation holds meta["rows"] rows.
+        folder = os.path.join(self._symbol_dir(symbol), meta["generation"])
+        columns = [np.load(os.path.join(folder, f"{name}.npy"), mmap_mode="r") for name in _COLUMNS]
+        if any(len(column) != meta["rows"] for column in columns):
+            return None
+        return BarSeries(*columns)
+
+    def _write_cache(self, symbol, series, signature):
+        folder = self._symbol_dir(symbol)
+        os.makedirs(folder, exist_ok=True)
+        generation = tempfile.mkdtemp(prefix="gen-", dir=folder)
+        for name in _COLUMNS:
+            np.save(os.path.join(generation, f"{name}.npy"), np.ascontiguousarray(getattr(series, name)))
+        meta_path = os.path.join(folder, "meta.json")
+        tmp = f"{meta_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(dict(signature, rows=len(series), generation=os.path.basename(generation)), f)
+        os.replace(tmp, meta_path)
+        # Older generations go when nobody maps them any more (Windows refuses before).
+        for name in os.listdir(folder):
+            if name not in ("meta.json", os.path.basename(generation)) and not name.endswith(".tmp"):
+                path = os.path.join(folder, name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+    def load(self, symbol):
+        csv_path = self._csv_path(symbol)
+        if not os.path.exists(csv_path):
+            raise FileNotFoundError(f"Data file not found: {csv_path}")
+        signature = self._signature(csv_path)
+        meta = self._read_meta(symbol)
+        if self._meta_fresh(meta, signature):
+            try:
+                cached = self._load_cache(symbol, meta)
+            except Exception:
+                cached = None
+            if cached is not None:
+                return cached
+        series = read_csv_columns(csv_path)
+        try:
+            self._write_cache(symbol, series, signature)
+        except OSError:
+            # Read-only data dir or a cache file still mapped by another process.
+            pass
+        return series
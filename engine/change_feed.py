@@ -0,0 +1,149 @@
+import json
+import os
+import socket
+
+# Largest runtime datagram we send; bigger payloads become a {"resync": true} notice.
+MAX_DATAGRAM = 60000
+
+
+class FileWatch:
+    # Cheap change check for a file that is replaced or rewritten as a whole:
+    # changed() only stats it and compares (mtime, size) with the previous call.
+    def __init__(self, path):
+        self.path = path
+        self._key = None
+
+    def changed(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self._key = None
+            return False
+        key = (st.st_mtime_ns, st.st_size)
+        if key == self._key:
+            return False
+        self._key = key
+        return True
+
+
+class TailReader:
+    # Follows the end of an append-only text file (alerts.log). The first poll seeks
+    # back from the end to the last line instead of reading the whole file; later polls
+    # read only the bytes appended since. A file that shrank or was replaced is
+    # picked up again from its last line.
+    def __init__(self, path, block_size=4096):
+        self.path = path
+        self.block_size = block_size
+        self.offset = None
+        self._ino = None
+        self._partial = b""
+
+    def _last_line_start(self, f, size):
+        pos = size
+        tail = b""
+        while pos > 0:
+            step = min(self.block_size, pos)
+            pos -= step
+            f.seek(pos)
+            tail = f.read(step) + tail
+            body = tail.rstrip(b"\r\n")
+            cut = body.rfind(b"\n")
+            if cut >= 0:
+                return pos + cut + 1
+        return 0
+
+    def poll(self):
+        # Returns the complete lines appended since the previous call.
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self.offset = None
+            return []
+        with open(self.path, "rb") as f:
+            if self.offset is None or st.st_size < self.offset or (st.st_ino and st.st_ino != self._ino):
+                self.offset = self._last_line_start(f, st.st_size)
+                self._ino = st.st_ino
+                self._partial = b""
+            if st.st_size == self.offset:
+                return []
+            f.seek(self.offset)
+            data = f.read(st.st_size - self.offset)
+        self.offset += len(data)
+        lines = (self._partial + data).split(b"\n")
+        self._partial = lines.pop()
+        out = []
+        for line in lines:
+            text = line.decode("utf-8", errors="replace").strip()
+            if text:
+                out.append(text)
+        return out
+
+
+class FeedPublisher:
+    # Pushes runtime payloads to a dashboard on this machine as UDP datagrams.
+    # Fire and forget: nobody listening, or a full socket buffer, just drops the message.
+    def __init__(self, port, host="127.0.0.1"):
+        self.address = (host, int(port))
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.sent = 0
+        self.dropped = 0
+
+    def publish(self, payload):
+        data = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        if len(data) > MAX_DATAGRAM:
+            data = json.dumps({"resync": True, "updated_at": payload.get("updated_at")}).encode("utf-8")
+        try:
+            self.sock.sendto(data, self.address)
+        except OSError:
+            self.dropped += 1
+            return
+        self.sent += 1
+
+    def close(self):
+        self.sock.close()
+
+
+class FeedListener:
+    # Dashboard side of FeedPublisher; drain() never blocks.
+    def __init__(self, port, host="127.0.0.1"):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, int(port)))
+        self.sock.setblocking(False)
+
+    def drain(self, limit=1000):
+        out = []
+        while len(out) < limit:
+            try:
+                data, _ = self.sock.recvfrom(65535)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                # e.g. WSAECONNRESET on Windows after an earlier send failed.
+                continue
+            try:
+                payload = json.loads(data.decode("utf-8"))
+            except ValueError:
+                continue
+            if isinstance(payload, dict):
+                out.append(payload)
+        return out
+
+    def close(self):
+        self.sock.close()
+
+
+def build_feed_publisher(cfg):
+    port = int(((cfg or {}).get("monitor", {}) or {}).get("runtime_feed_port", 0) or 0)
+    return FeedPublisher(port) if port > 0 else None
+
+
+def build_feed_listener(cfg):
+    port = int(((cfg or {}).get("monitor", {}) or {}).get("runtime_feed_port", 0) or 0)
+    if port <= 0:
+        return None
+    try:
+        return FeedListener(port)
+    except OSError:
+        # Port taken (e.g. a second dashboard); fall back to watching the state file.
+        return None
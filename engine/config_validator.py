@@ -2,6 +2,7 @@
 from datetime import datetime
 
 from engine.data_policy import validate_data_policy
+from engine.logger import LEVELS as LOG_LEVELS
 
 
 def _is_number(value):
@@ -195,6 +196,8 @@ def validate_config(config, mode="paper"):
             "min_trades",
             "min_holdout_trades",
             "min_score_improve",
+            "workers",
+            "halving_eta",
         ]
         for key in numeric_keys:
             value = cycle_cfg.get(key)
@@ -202,6 +205,12 @@ def validate_config(config, mode="paper"):
                 continue
             if not _is_number(value):
                 push_error(f"research_cycle.{key} must be a number.")
+        search = cycle_cfg.get("search")
+        if search is not None and search not in ("grid", "halving"):
+            push_error("research_cycle.search must be grid or halving.")
+        eta = cycle_cfg.get("halving_eta")
+        if _is_number(eta) and eta < 2:
+            push_error("research_cycle.halving_eta must be >= 2.")
 
     scheduler = config.get("scheduler", {})
     if scheduler:
@@ -262,6 +271,14 @@ def validate_config(config, mode="paper"):
                     "(later profile may be ignored)."
                 )
 
+    cost_sweep = config.get("cost_sweep", {})
+    for key in ("slippage", "commission_per_contract"):
+        values = (cost_sweep or {}).get(key)
+        if values is not None and (
+            not isinstance(values, list) or not all(_is_number(v) and v >= 0 for v in values)
+        ):
+            push_error(f"cost_sweep.{key} must be a list of numbers >= 0.")
+
     monitor = config.get("monitor", {})
     if monitor and monitor.get("drawdown_alert_threshold") is not None:
         threshold = monitor.get("drawdown_alert_threshold")
@@ -271,6 +288,39 @@ def validate_config(config, mode="paper"):
         threshold = monitor.get("no_new_data_error_threshold")
         if not isinstance(threshold, int) or threshold < 1:
             push_error("monitor.no_new_data_error_threshold must be an integer >= 1.")
+    if monitor and monitor.get("runtime_flush_sec") is not None:
+        value = monitor.get("runtime_flush_sec")
+        if not _is_number(value) or value < 0:
+            push_error("monitor.runtime_flush_sec must be >= 0.")
+    if monitor and monitor.get("log_level") is not None and str(monitor.get("log_level")).upper() not in LOG_LEVELS:
+        push_error(f"monitor.log_level must be one of {', '.join(LOG_LEVELS)}.")
+    if monitor and monitor.get("log_format") is not None and monitor.get("log_format") not in ("text", "jsonl"):
+        push_error("monitor.log_format must be text or jsonl.")
+    for key in ("log_compress", "log_async"):
+        if monitor and monitor.get(key) is not None and not isinstance(monitor.get(key), bool):
+            push_error(f"monitor.{key} must be true or false.")
+    for key in ("webhook_timeout_sec", "alert_dedup_sec", "log_rotate_sec"):
+        if monitor and monitor.get(key) is not None:
+            value = monitor.get(key)
+            if not _is_number(value) or value < 0:
+                push_error(f"monitor.{key} must be >= 0.")
+    if monitor and monitor.get("runtime_feed_port") is not None:
+        port = monitor.get("runtime_feed_port")
+        if not isinstance(port, int) or isinstance(port, bool) or port < 0 or port > 65535:
+            push_error("monitor.runtime_feed_port must be an integer between 0 and 65535.")
+    int_keys = (
+        ("alert_queue_size", 1),
+        ("webhook_batch_size", 1),
+        ("webhook_max_retries", 0),
+        ("alert_rate_limit_per_min", 0),
+        ("log_max_bytes", 0),
+        ("log_backup_count", 1),
+    )
+    for key, minimum in int_keys:
+        if monitor and monitor.get(key) is not None:
+            value = monitor.get(key)
+            if not isinstance(value, int) or isinstance(value, bool) or value < minimum:
+                push_error(f"monitor.{key} must be an integer >= {minimum}.")
 
     data_quality = config.get("data_quality", {})
     if data_quality:
@@ -325,6 +375,26 @@ def validate_config(config, mode="paper"):
         ):
             push_error("data_quality.warn_coverage_ratio must be >= data_quality.min_coverage_ratio.")
 
+    state = config.get("state", {})
+    if state:
+        if state.get("backend") is not None and state.get("backend") not in ("json", "sqlite"):
+            push_error("state.backend must be json or sqlite.")
+        if state.get("db_path") is not None and (not isinstance(state.get("db_path"), str) or not state.get("db_path")):
+            push_error("state.db_path must be a non-empty string.")
+        if state.get("export_json") is not None and not isinstance(state.get("export_json"), bool):
+            push_error("state.export_json must be true or false.")
+
+    backtest_cache = config.get("backtest_cache", {})
+    if backtest_cache:
+        if backtest_cache.get("enabled") is not None and not isinstance(backtest_cache.get("enabled"), bool):
+            push_error("backtest_cache.enabled must be true or false.")
+        path = backtest_cache.get("path")
+        if path is not None and (not isinstance(path, str) or not path):
+            push_error("backtest_cache.path must be a non-empty string.")
+        max_entries = backtest_cache.get("max_entries")
+        if max_entries is not None and (not _is_number(max_entries) or max_entries < 1):
+            push_error("backtest_cache.max_entries must be >= 1.")
+
     paper_check = config.get("paper_check", {})
     if paper_check:
         enabled = paper_check.get("enabled")
@@ -0,0 +1,231 @@
+from engine.backtest_eval import build_execution, build_risk, parse_schedule, parse_time, schedule_allows
+from engine.bar_store import bar_minute, minute_to_datetime
+from engine.indicators import true_range
+from engine.running_stats import RunningStats
+from engine.series_window import CloseBuffer
+from engine.strategy_factory import create_strategy
+
+# Contract keys a cost scenario may override.
+COST_KEYS = ("slippage", "commission_per_contract", "commission_min", "fill_ratio_min", "fill_ratio_max")
+
+
+def _members(strategy):
+    return list(strategy.members) if hasattr(strategy, "members") else [strategy]
+
+
+def record_signal_timeline(config, bars, strategy_cfg):
+    # One pass over the bars for everything in run_backtest that does not depend on
+    # fills or costs: closes, day changes, schedule / trade-window gates, true ranges
+    # and each strategy member's price signal (before its cooldown / loss-streak gate,
+    # which replay_costs applies from the replayed trades).
+    strategy = create_strategy(strategy_cfg)
+    members = _members(strategy)
+    trade_start = parse_time(strategy_cfg.get("trade_start", ""))
+    trade_end = parse_time(strategy_cfg.get("trade_end", ""))
+    schedule = parse_schedule(config.get("market_hours") or config.get("schedule"))
+
+    close_buffer = CloseBuffer()
+    closes, bar_times, new_days, gates, true_ranges = [], [], [], [], []
+    signals = [[] for _ in members]
+    current_date = None
+    prev_close = None
+    for bar in bars:
+        price = bar["close"]
+        close_buffer.append(price)
+        bar_dt = minute_to_datetime(bar_minute(bar))
+        bar_date = bar_dt.date()
+        new_days.append(current_date is None or bar_date != current_date)
+        current_date = bar_date
+
+        gate = None
+        if not schedule_allows(bar_dt, schedule):
+            gate = "SCHEDULE_CLOSED"
+        elif trade_start and bar_dt.time() < trade_start:
+            gate = "BEFORE_TRADE_START"
+        elif trade_end and bar_dt.time() > trade_end:
+            gate = "AFTER_TRADE_END"
+        gates.append(gate)
+
+        closes.append(price)
+        bar_times.append(bar["datetime"])
+        true_ranges.append(None if prev_close is None else true_range(bar["high"], bar["low"], prev_close))
+        prev_close = price
+        window = close_buffer.window() if gate is None else None
+        for member, out in zip(members, signals):
+            out.append(0 if window is None else member.generate_signal(window))
+
+    return {
+        "symbol": config["symbol"],
+        "strategy_cfg": strategy_cfg,
+        "close": closes,
+        "bar_time": bar_times,
+        "new_day": new_days,
+        "gate": gates,
+        "true_range": true_ranges,
+        "signals": signals,
+    }
+
+
+def apply_cost_scenario(config, scenario):
+    # Copy of config with the scenario's contract cost keys (and cost_model, if given)
+    # swapped in; everything else is shared with the original. A new slippage also
+    # shifts cost_model profiles that set their own slippage by the same amount, so
+    # session differences are kept.
+    if not scenario:
+        return config
+    out = dict(config)
+    contract = dict(config.get("contract", {}))
+    out["contract"] = contract
+    if scenario.get("cost_model") is not None:
+        out["cost_model"] = scenario["cost_model"]
+    elif scenario.get("slippage") is not None and (config.get("cost_model") or {}).get("profiles"):
+        shift = float(scenario["slippage"]) - float(contract.get("slippage", 0.0))
+        profiles = []
+        for item in config["cost_model"]["profiles"]:
+            if isinstance(item, dict) and item.get("slippage") is not None:
+                item = dict(item, slippage=float(item["slippage"]) + shift)
+            profiles.append(item)
+        out["cost_model"] = dict(config["cost_model"], profiles=profiles)
+    for key in COST_KEYS:
+        if scenario.get(key) is not None:
+            contract[key] = scenario[key]
+    return out
+
+
+def replay_costs(config, timeline, scenario=None):
+    # Replays run_backtest's execution / risk layer over a recorded timeline. For the
+    # same config the result equals run_once; `scenario` swaps in other cost settings.
+    cfg = apply_cost_scenario(config, scenario)
+    strategy_cfg = timeline["strategy_cfg"]
+    execution = build_execution(cfg)
+    risk = build_risk(cfg)
+    strategy = create_strategy(strategy_cfg)
+    members = _members(strategy)
+    composite = hasattr(strategy, "members")
+    signals = timeline["signals"]
+    symbol = timeline["symbol"]
+    max_trades_per_day = cfg["backtest"]["max_trades_per_day"]
+    min_atr = strategy_cfg.get("min_atr", 0.0)
+    capital = cfg["backtest"]["initial_capital"]
+    stats = RunningStats()
+    daily_trade_count = 0
+
+    closes = timeline["close"]
+    bar_times = timeline["bar_time"]
+    new_days = timeline["new_day"]
+    gates = timeline["gate"]
+    true_ranges = timeline["true_range"]
+    for step, price in enumerate(closes):
+        bar_time = bar_times[step]
+        if new_days[step]:
+            daily_trade_count = 0
+            risk.on_new_day()
+            if hasattr(strategy, "on_new_day"):
+                strategy.on_new_day()
+
+        if execution.position is not None and risk.should_force_close():
+            pnl = execution.force_close(price, bar_time=bar_time)
+            capital += pnl
+            risk.update_after_trade(pnl, capital)
+            risk.force_close_triggered = True
+            stats.add_equity(capital)
+            continue
+
+        if gates[step] is not None:
+            stats.add_equity(capital)
+            continue
+
+        tr = true_ranges[step]
+        atr = None if tr is None else risk.update_true_range(tr)
+        risk.update_volatility_pause(atr)
+
+        if execution.position is not None:
+            closed, pnl = execution.check_exit(price, risk, bar_time=bar_time)
+            if closed:
+                capital += pnl
+                risk.update_after_trade(pnl, capital)
+                if hasattr(strategy, "on_trade_close"):
+                    strategy.on_trade_close(pnl, step)
+            stats.add_equity(capital)
+            continue
+
+        if daily_trade_count >= max_trades_per_day or not risk.allow_trade():
+            stats.add_equity(capital)
+            continue
+        if atr is not None and atr < min_atr:
+            stats.add_equity(capital)
+            continue
+
+        if composite:
+            score = 0.0
+            for i, (member, weight) in enumerate(zip(members, strategy.weights)):
+                if not member.is_paused(step):
+                    score += weight * signals[i][step]
+            signal = 1 if score > strategy.threshold else -1 if score < -strategy.threshold else 0
+        else:
+            signal = 0 if strategy.is_paused(step) else signals[0][step]
+        if signal == 0:
+            stats.add_equity(capital)
+            continue
+
+        position_size = risk.calc_position_size(capital, price, atr)
+        if position_size <= 0 or not risk.can_open_order(position_size):
+            stats.add_equity(capital)
+            continue
+
+        if execution.send_order(symbol, signal, price, position_size, atr=atr, risk=risk, bar_time=bar_time):
+            daily_trade_count += 1
+            risk.record_order()
+        stats.add_equity(capital)
+
+    if execution.position is not None:
+        pnl = execution.force_close(closes[-1], bar_time=bar_times[-1])
+        capital += pnl
+        risk.update_after_trade(pnl, capital)
+
+    stats.sync_trades(execution.trades)
+    return {
+        "pnl": float(stats.pnl_sum),
+        "trades": int(stats.trades),
+        "max_drawdown": float(stats.max_drawdown),
+    }
+
+
+def _dedup(values):
+    out = []
+    for v in values:
+        if v not in out:
+            out.append(v)
+    return out
+
+
+def build_cost_scenarios(config):
+    # Slippage x commission grid from config["cost_sweep"]; without it, 1x/2x/3x the
+    # contract slippage against 1x/2x the contract commission.
+    contract = config.get("contract", {})
+    sweep = config.get("cost_sweep") or {}
+    slippage = float(contract.get("slippage", 0.0))
+    commission = float(contract.get("commission_per_contract", 0.0))
+    slippages = sweep.get("slippage") or ([slippage, slippage * 2, slippage * 3] if slippage else [0.0, 1.0, 2.0])
+    commissions = sweep.get("commission_per_contract") or [commission, commission * 2]
+    scenarios = []
+    for slip in _dedup(slippages):
+        for comm in _dedup(commissions):
+            scenarios.append(
+                {"name": f"slip={slip:g} comm={comm:g}", "slippage": slip, "commission_per_contract": comm}
+            )
+    return scenarios
+
+
+def run_cost_sweep(config, bars, strategy_cfg, scenarios, timeline=None):
+    # Stress table: one row per scenario, all sharing one recorded signal timeline.
+    if timeline is None:
+        timeline = record_signal_timeline(config, bars, strategy_cfg)
+    rows = []
+    for scenario in scenarios:
+        stats = replay_costs(config, timeline, scenario)
+        row = {"scenario": scenario.get("name", "")}
+        row.update({key: scenario[key] for key in COST_KEYS if scenario.get(key) is not None})
+        row.update(stats)
+        rows.append(row)
+    return rows
@@ -1,40 +1,85 @@
-import csv
 import os
-from datetime import datetime, timedelta
+import numpy as np
 
-from engine.market_scheduler import is_market_open
+from engine.bar_store import BarSeries, BarStore, bar_minute, read_csv_columns
+from engine.market_scheduler import compile_schedule
+
+
+def _bar_times(bars):
+    if isinstance(bars, BarSeries):
+        return bars.times
+    return [b.get("datetime") for b in bars]
+
+
+def _time_keys(bars):
+    if isinstance(bars, BarSeries):
+        return [t.decode("ascii") for t in bars.times.tolist()]
+    return [b.get("datetime") for b in bars]
+
+
+def _first_occurrences(times):
+    # Indices of the first bar for each distinct datetime, in original order.
+    if isinstance(times, np.ndarray):
+        _, first = np.unique(times, return_index=True)
+        return np.sort(first)
+    seen = {}
+    for i, dt in enumerate(times):
+        if dt not in seen:
+            seen[dt] = i
+    return np.fromiter(seen.values(), dtype=np.int64, count=len(seen))
+
+
+def _bar_clock_columns(bars, index):
+    if isinstance(bars, BarSeries):
+        ts = np.asarray(bars.minutes[index], dtype=np.int64)
+        if ts.size and ts.min() < 0:
+            raise ValueError("Bad bar datetime")
+        return ts, np.asarray(bars.closes[index], dtype=np.float64)
+    ts = np.fromiter((bar_minute(bars[i]) for i in index), dtype=np.int64, count=len(index))
+    closes = np.fromiter((float(bars[i]["close"]) for i in index), dtype=np.float64, count=len(index))
+    return ts, closes
+
+
+def _gap_stats(ts, closes, schedule):
+    # Missing minutes and max close-to-close jump over bars sorted by time.
+    if len(ts) < 2:
+        return 0, 0.0
+    deltas = np.diff(ts)
+    gaps = deltas > 1
+    if not gaps.any():
+        miss = 0
+    elif schedule is None:
+        miss = int((deltas[gaps] - 1).sum())
+    else:
+        miss = int(compile_schedule(schedule).count_open(ts[:-1][gaps] + 1, ts[1:][gaps]).sum())
+    prev = closes[:-1]
+    nonzero = prev != 0
+    jumps = np.abs(closes[1:][nonzero] - prev[nonzero]) / np.abs(prev[nonzero])
+    max_jump = float(jumps.max()) if jumps.size else 0.0
+    return miss, max_jump
 
 
 class DataEngine:
-    def __init__(self, data_dir="data"):
+    def __init__(self, data_dir="data", use_cache=True):
         self.data_dir = data_dir
+        self.use_cache = use_cache
+        self.store = BarStore(data_dir)
 
     def _path(self, symbol):
         return os.path.join(self.data_dir, f"{symbol}.csv")
 
     def get_bars(self, symbol):
+        # Returns a BarSeries: indexing/iteration yields the usual bar dicts, while the
+        # OHLC columns stay in contiguous arrays memory-mapped from data/.cache/.
         path = self._path(symbol)
         if not os.path.exists(path):
             raise FileNotFoundError(f"Data file not found: {path}")
-        bars = []
-        with open(path, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                # Handle BOM headers such as "\ufeffdatetime".
-                normalized = {(k or "").replace("\ufeff", ""): v for k, v in row.items()}
-                bars.append(
-                    {
-                        "datetime": normalized["datetime"],
-                        "open": float(normalized["open"]),
-                        "high": float(normalized["high"]),
-                        "low": float(normalized["low"]),
-                        "close": float(normalized["close"]),
-                    }
-                )
-        return bars
+        if self.use_cache:
+            return self.store.load(symbol)
+        return read_csv_columns(path)
 
     def get_price_series(self, symbol):
-        return [b["close"] for b in self.get_bars(symbol)]
+        return self.get_bars(symbol).closes.tolist()
 
     def validate_bars(self, bars, schedule=None):
         raw_total = len(bars)
@@ -52,50 +97,17 @@ class DataEngine:
             return report
 
         # Deduplicate by datetime for stable gap/jump analysis.
-        seen = set()
-        unique = []
-        duplicate_count = 0
-        for b in bars:
-            dt = b.get("datetime")
-            if dt in seen:
-                duplicate_count += 1
-                continue
-            seen.add(dt)
-            unique.append(b)
-        report["duplicates"] = duplicate_count
-        report["total"] = len(unique)
-        if not unique:
+        keep = _first_occurrences(_bar_times(bars))
+        report["duplicates"] = raw_total - len(keep)
+        report["total"] = len(keep)
+        if not len(keep):
             report["coverage_ratio"] = 0.0
             return report
 
         try:
-            parsed = []
-            for b in unique:
-                parsed.append((datetime.strptime(b["datetime"], "%Y-%m-%d %H:%M"), float(b["close"])))
-            parsed.sort(key=lambda x: x[0])
-
-            prev, prev_close = parsed[0]
-            miss = 0
-            max_jump = 0.0
-            for cur, cur_close in parsed[1:]:
-                delta = (cur - prev).total_seconds() / 60.0
-                if delta > 1:
-                    if schedule is None:
-                        miss += int(delta - 1)
-                    else:
-                        probe = prev + timedelta(minutes=1)
-                        while probe < cur:
-                            if is_market_open(probe, schedule):
-                                miss += 1
-                            probe += timedelta(minutes=1)
-
-                if prev_close != 0:
-                    jump = abs(cur_close - prev_close) / abs(prev_close)
-                    if jump > max_jump:
-                        max_jump = jump
-                prev = cur
-                prev_close = cur_close
-
+            ts, closes = _bar_clock_columns(bars, keep)
+            order = np.argsort(ts, kind="stable")
+            miss, max_jump = _gap_stats(ts[order], closes[order], schedule)
             report["missing"] = miss
             report["max_jump_ratio"] = max_jump
             expected_open = report["total"] + report["missing"]
@@ -120,3 +132,85 @@ class DataEngine:
         os.makedirs(os.path.dirname(path), exist_ok=True)
         with open(path, "w", encoding="utf-8") as f:
             f.write("\n".join(lines))
+
+
+class BarQualityTracker:
+    # validate_bars for a bar list that only grows at the end (sim_live polling): bars
+    # appended since the previous update are scanned and merged into the cached report.
+    # Anything else (shorter list, rewritten history, out-of-order tail, new schedule)
+    # falls back to a full validate_bars.
+    def __init__(self, data_engine=None):
+        self.data = data_engine or DataEngine()
+        self.schedule = None
+        self.report = None
+        self.count = 0
+        self.last_datetime = None
+        self.seen = set()
+        self.last_ts = None
+        self.last_close = None
+
+    def _rebuild(self, bars, schedule):
+        self.schedule = schedule
+        self.report = self.data.validate_bars(bars, schedule=schedule)
+        self.count = len(bars)
+        self.last_datetime = bars[-1]["datetime"] if bars else None
+        self.seen = set(_time_keys(bars))
+        self.last_ts = None
+        self.last_close = None
+        keep = _first_occurrences(_bar_times(bars))
+        if len(keep):
+            try:
+                ts, closes = _bar_clock_columns(bars, keep)
+                last = np.argsort(ts, kind="stable")[-1]
+                self.last_ts = int(ts[last])
+                self.last_close = float(closes[last])
+            except Exception:
+                pass
+        return dict(self.report)
+
+    def update(self, bars, schedule=None):
+        n = len(bars)
+        if (
+            self.report is None
+            or schedule is not self.schedule
+            or not self.count
+            or n < self.count
+            or bars[self.count - 1]["datetime"] != self.last_datetime
+            or self.last_ts is None
+        ):
+            return self._rebuild(bars, schedule)
+        if n == self.count:
+            return dict(self.report)
+
+        tail = bars[self.count :]
+        fresh = []
+        for i, dt in enumerate(_time_keys(tail)):
+            if dt not in self.seen:
+                self.seen.add(dt)
+                fresh.append(i)
+        try:
+            ts, closes = _bar_clock_columns(tail, np.asarray(fresh, dtype=np.int64))
+        except Exception:
+            return self._rebuild(bars, schedule)
+        if ts.size and ts.min() < self.last_ts:
+            return self._rebuild(bars, schedule)
+
+        report = self.report
+        report["raw_total"] += len(tail)
+        report["end"] = tail[-1]["datetime"]
+        report["duplicates"] += len(tail) - len(fresh)
+        if fresh:
+            order = np.argsort(ts, kind="stable")
+            ts = np.concatenate([[self.last_ts], ts[order]])
+            closes = np.concatenate([[self.last_close], closes[order]])
+            miss, max_jump = _gap_stats(ts, closes, schedule)
+            report["total"] += len(fresh)
+            report["missing"] += miss
+            report["max_jump_ratio"] = max(report["max_jump_ratio"], max_jump)
+            expected_open = report["total"] + report["missing"]
+            report["coverage_ratio"] = (float(report["total"]) / float(expected_open)) if expected_open > 0 else 1.0
+            self.last_ts = int(ts[-1])
+            self.last_close = float(closes[-1])
+        self.count = n
+        self.last_datetime = bars[-1]["datetime"]
+        return dict(report)
@@ -1,5 +1,6 @@
 ﻿import hashlib
 from engine.execution_base import ExecutionBase
+from engine.recorders import TradeRecord, TradeRecorder
 
 
 def _parse_hhmm(value):
@@ -57,12 +58,24 @@ class SimExecution(ExecutionBase):
         self.fill_ratio_max = fill_ratio_max
         self.cost_model = cost_model or {}
         self.position = None
-        self.trades = []
+        self.trades = TradeRecorder()
+        self._profile_cache = None
 
     def _stable_unit(self, key):
         h = hashlib.md5(key.encode("utf-8")).hexdigest()
         return int(h[:8], 16) / float(0xFFFFFFFF)
 
+    def _profile_windows(self):
+        # cost_model profiles with start/end parsed once; rebuilt if cost_model is replaced.
+        cached = self._profile_cache
+        if cached is None or cached[0] is not self.cost_model:
+            windows = []
+            for item in self.cost_model.get("profiles") or []:
+                windows.append((_parse_hhmm((item or {}).get("start")), _parse_hhmm((item or {}).get("end")), item))
+            cached = (self.cost_model, windows)
+            self._profile_cache = cached
+        return cached[1]
+
     def _resolve_profile(self, bar_time):
         now_minutes = _time_from_bar(bar_time)
         profile = {
@@ -75,10 +88,7 @@ class SimExecution(ExecutionBase):
         }
         if not self.cost_model:
             return profile
-        profiles = self.cost_model.get("profiles") or []
-        for item in profiles:
-            start = _parse_hhmm((item or {}).get("start"))
-            end = _parse_hhmm((item or {}).get("end"))
+        for start, end, item in self._profile_windows():
             if _in_session(now_minutes, start, end):
                 profile["name"] = str(item.get("name", "profile"))
                 if item.get("slippage") is not None:
@@ -188,21 +198,21 @@ class SimExecution(ExecutionBase):
         )
         commission = self._calc_round_trip_commission(size, commission_multiplier=commission_multiplier)
         pnl = gross_pnl - commission
-        trade = {
-            "direction": direction,
-            "entry_price": entry,
-            "exit_price": exit_price,
-            "requested_size": self.position.get("requested_size", size),
-            "fill_ratio": self.position.get("fill_ratio", 1.0),
-            "size": size,
-            "contract_multiplier": contract_multiplier,
-            "cost_profile": self.position.get("cost_profile", "default"),
-            "gross_pnl": gross_pnl,
-            "commission": commission,
-            "pnl": pnl,
-            "entry_time": self.position.get("entry_time"),
-            "exit_time": bar_time,
-        }
+        trade = TradeRecord(
+            direction=direction,
+            entry_price=entry,
+            exit_price=exit_price,
+            requested_size=self.position.get("requested_size", size),
+            fill_ratio=self.position.get("fill_ratio", 1.0),
+            size=size,
+            contract_multiplier=contract_multiplier,
+            cost_profile=self.position.get("cost_profile", "default"),
+            gross_pnl=gross_pnl,
+            commission=commission,
+            pnl=pnl,
+            entry_time=self.position.get("entry_time"),
+            exit_time=bar_time,
+        )
         self.trades.append(trade)
         self.position = None
         return True, pnl
@@ -223,21 +233,21 @@ class SimExecution(ExecutionBase):
         )
         commission = self._calc_round_trip_commission(size, commission_multiplier=commission_multiplier)
         pnl = gross_pnl - commission
-        trade = {
-            "direction": direction,
-            "entry_price": entry,
-            "exit_price": price,
-            "requested_size": self.position.get("requested_size", size),
-            "fill_ratio": self.position.get("fill_ratio", 1.0),
-            "size": size,
-            "contract_multiplier": contract_multiplier,
-            "cost_profile": self.position.get("cost_profile", "default"),
-            "gross_pnl": gross_pnl,
-            "commission": commission,
-            "pnl": pnl,
-            "entry_time": self.position.get("entry_time"),
-            "exit_time": bar_time,
-        }
+        trade = TradeRecord(
+            direction=direction,
+            entry_price=entry,
+            exit_price=price,
+            requested_size=self.position.get("requested_size", size),
+            fill_ratio=self.position.get("fill_ratio", 1.0),
+            size=size,
+            contract_multiplier=contract_multiplier,
+            cost_profile=self.position.get("cost_profile", "default"),
+            gross_pnl=gross_pnl,
+            commission=commission,
+            pnl=pnl,
+            entry_time=self.position.get("entry_time"),
+            exit_time=bar_time,
+        )
         self.trades.append(trade)
         self.position = None
         return pnl
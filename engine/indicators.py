@@ -0,0 +1,298 @@
+from collections import deque
+
+import numpy as np
+
+# Two price averages closer than this, relative to their size, count as equal. Averages
+# of prices on a tick grid that differ at all differ by at least tick / (fast * slow),
+# about 1e-8 of the price for usual ticks and windows, while the rounding left in
+# rolling or prefix sums stays near 1e-13. Every signal path (strategies, grid and
+# walk-forward evaluators) compares through the helpers below, so they agree with each
+# other and with exact tick arithmetic, ties included.
+PRICE_TIE_REL = 1e-10
+
+
+def price_tolerance(a, b):
+    return PRICE_TIE_REL * max(abs(a), abs(b))
+
+
+def compare_prices(a, b):
+    # 1 / -1 / 0 for a > b / a < b / a == b.
+    tol = price_tolerance(a, b)
+    diff = a - b
+    return 1 if diff > tol else -1 if diff < -tol else 0
+
+
+def meets_min_diff(a, b, min_diff):
+    # abs(a - b) >= min_diff; a gap equal to min_diff passes.
+    return abs(a - b) >= min_diff - price_tolerance(a, b)
+
+
+def rsi_compare(gains, losses, level, scale):
+    # Sign of RSI - level, RSI = 100 * gains / (gains + losses) (100 without losses),
+    # decided on the sums instead of the rounded quotient. `scale` is price * period,
+    # the size of the rounding the gain / loss sums can carry.
+    if losses == 0:
+        return 1 if 100.0 > level else -1 if 100.0 < level else 0
+    diff = 100.0 * gains - level * (gains + losses)
+    tol = 100.0 * PRICE_TIE_REL * scale
+    return 1 if diff > tol else -1 if diff < -tol else 0
+
+
+def compare_price_arrays(a, b):
+    # Elementwise compare_prices as int8.
+    diff = a - b
+    tol = PRICE_TIE_REL * np.maximum(np.abs(a), np.abs(b))
+    return (diff > tol).astype(np.int8) - (diff < -tol).astype(np.int8)
+
+
+def meets_min_diff_arrays(a, b, min_diff):
+    return np.abs(a - b) >= min_diff - PRICE_TIE_REL * np.maximum(np.abs(a), np.abs(b))
+
+
+def rsi_compare_arrays(gains, losses, level, scale):
+    # Elementwise rsi_compare as int8 (0 where the inputs are NaN).
+    with np.errstate(invalid="ignore"):
+        diff = 100.0 * gains - level * (gains + losses)
+        tol = 100.0 * PRICE_TIE_REL * scale
+        out = (diff > tol).astype(np.int8) - (diff < -tol).astype(np.int8)
+    no_losses = losses == 0
+    out[no_losses] = 1 if 100.0 > level else -1 if 100.0 < level else 0
+    return out
+
+
+class RollingSum:
+    def __init__(self, window):
+        self.window = max(1, int(window))
+        self._values = deque()
+        self._sum = 0.0
+        self._nonzero = 0
+        self._since_resync = 0
+
+    def reset(self):
+        self._values.clear()
+        self._sum = 0.0
+        self._nonzero = 0
+        self._since_resync = 0
+
+    def __len__(self):
+        return len(self._values)
+
+    @property
+    def ready(self):
+        return len(self._values) >= self.window
+
+    @property
+    def value(self):
+        return self._sum
+
+    def on_bar(self, value):
+        self._values.append(value)
+        self._sum += value
+        if value != 0:
+            self._nonzero += 1
+        if len(self._values) > self.window:
+            old = self._values.popleft()
+            self._sum -= old
+            if old != 0:
+                self._nonzero -= 1
+        if self._nonzero == 0:
+            self._sum = 0.0
+        self._since_resync += 1
+        if self._since_resync >= self.window:
+            # Re-add the window once per `window` bars to keep float drift bounded.
+            self._sum = sum(self._values)
+            self._since_resync = 0
+        return self._sum
+
+    def to_dict(self):
+        # Plain-data state (session snapshots); restore() puts it back bit for bit.
+        return {"values": list(self._values), "sum": self._sum, "nonzero": self._nonzero, "since_resync": self._since_resync}
+
+    def restore(self, data):
+        self._values = deque(data["values"])
+        self._sum = data["sum"]
+        self._nonzero = data["nonzero"]
+        self._since_resync = data["since_resync"]
+
+
+class RollingMean:
+    def __init__(self, window):
+        self._sum = RollingSum(window)
+
+    @property
+    def window(self):
+        return self._sum.window
+
+    def reset(self):
+        self._sum.reset()
+
+    @property
+    def ready(self):
+        return self._sum.ready
+
+    @property
+    def value(self):
+        # Same as sum(prices[-window:]) / window, including the short-history case.
+        if not len(self._sum):
+            return None
+        return self._sum.value / self._sum.window
+
+    def on_bar(self, value):
+        self._sum.on_bar(value)
+        return self.value
+
+
+class RSI:
+    def __init__(self, period=14, method="simple"):
+        if method not in ("simple", "wilder"):
+            raise ValueError(f"Unknown RSI method: {method}")
+        self.period = max(1, int(period))
+        self.method = method
+        self.reset()
+
+    def reset(self):
+        self._prev = None
+        self._gains = RollingSum(self.period)
+        self._losses = RollingSum(self.period)
+        self._avg_gain = None
+        self._avg_loss = None
+        self._count = 0
+
+    @property
+    def ready(self):
+        return self._count >= self.period
+
+    def _sums(self):
+        if self.method == "wilder":
+            return self._avg_gain, self._avg_loss
+        return self._gains.value, self._losses.value
+
+    @property
+    def value(self):
+        if not self.ready:
+            return None
+        gains, losses = self._sums()
+        if losses == 0:
+            return 100.0
+        rs = gains / losses
+        return 100.0 - (100.0 / (1.0 + rs))
+
+    def compare(self, level, price):
+        # rsi_compare against `level`, or None before the RSI is ready.
+        if not self.ready:
+            return None
+        # Simple RSI compares rolling sums of `period` changes, Wilder's the averages.
+        gains, losses = self._sums()
+        scale = abs(price) * (self.period if self.method == "simple" else 1)
+        return rsi_compare(gains, losses, level, scale)
+
+    def on_bar(self, close):
+        prev = self._prev
+        self._prev = close
+        if prev is None:
+            return None
+        change = close - prev
+        gain = change if change >= 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        self._count += 1
+        self._gains.on_bar(gain)
+        self._losses.on_bar(loss)
+        if self.method == "wilder":
+            if self._count == self.period:
+                self._avg_gain = self._gains.value / self.period
+                self._avg_loss = self._losses.value / self.period
+            elif self._count > self.period:
+                self._avg_gain = (self._avg_gain * (self.period - 1) + gain) / self.period
+                self._avg_loss = (self._avg_loss * (self.period - 1) + loss) / self.period
+        return self.value
+
+
+class ATR:
+    def __init__(self, period=14):
+        self.period = max(1, int(period))
+        self._tr = RollingSum(self.period)
+        self._prev_close = None
+
+    def reset(self):
+        self._tr.reset()
+        self._prev_close = None
+
+    @property
+    def ready(self):
+        return self._tr.ready
+
+    @property
+    def value(self):
+        if not self.ready:
+            return None
+        return self._tr.value / self.period
+
+    def on_true_range(self, tr):
+        self._tr.on_bar(tr)
+        return self.value
+
+    def on_bar(self, high, low, close):
+        prev_close = self._prev_close
+        self._prev_close = close
+        if prev_close is None:
+            return None
+        return self.on_true_range(true_range(high, low, prev_close))
+
+    def to_dict(self):
+        return {"tr": self._tr.to_dict(), "prev_close": self._prev_close}
+
+    def restore(self, data):
+        self._tr.restore(data["tr"])
+        self._prev_close = data["prev_close"]
+
+
+def true_range(high, low, prev_close):
+    return max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+
+class MAIndicators:
+    # Incremental fast/slow/trend moving averages plus optional RSI fed one close at a time.
+    def __init__(self, fast, slow, trend_window, rsi_period=None):
+        self.fast = RollingMean(fast)
+        self.slow = RollingMean(slow)
+        self.trend = RollingMean(trend_window)
+        self.rsi = RSI(rsi_period) if rsi_period is not None else None
+        lookback = max(int(fast), int(slow), int(trend_window))
+        if rsi_period is not None:
+            lookback = max(lookback, int(rsi_period) + 1)
+        self.lookback = lookback
+        self.count = 0
+        self.last = None
+        self._source = None
+
+    def reset(self):
+        for ind in (self.fast, self.slow, self.trend, self.rsi):
+            if ind is not None:
+                ind.reset()
+        self.count = 0
+        self.last = None
+        self._source = None
+
+    def on_bar(self, close):
+        self.fast.on_bar(close)
+        self.slow.on_bar(close)
+        self.trend.on_bar(close)
+        if self.rsi is not None:
+            self.rsi.on_bar(close)
+        self.count += 1
+        self.last = close
+
+    def sync(self, prices):
+        # Feed only the closes not seen yet. The fed series is tracked by identity
+        # (a SeriesWindow by the list it views): any other series, or a shorter one,
+        # starts over from its last `lookback` closes.
+        n = len(prices)
+        source = getattr(prices, "source", prices)
+        start = self.count
+        if source is not self._source or n < self.count or (self.count and prices[self.count - 1] != self.last):
+            self.reset()
+            start = max(0, n - self.lookback)
+            self.count = start
+            self._source = source
+        for i in range(start, n):
+            self.on_bar(prices[i])
@@ -1,15 +1,208 @@
-﻿import os
+﻿import atexit
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
 from datetime import datetime
 
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARN": 30, "ERROR": 40}
+
 
 class Logger:
-    def __init__(self, path="logs/runtime.log"):
+    # Runtime log writer with a persistent buffered handle. Lines are flushed on WARN and
+    # above, once `flush_interval_sec` has passed since the last flush, and on close.
+    # - fmt="text" keeps the "[time] message" lines ("[time] [LEVEL] message" when the
+    #   level is not INFO); fmt="jsonl" writes one JSON object per line.
+    # - The file rotates when it would exceed `max_bytes` or has been open for
+    #   `rotate_interval_sec` (0 disables either); backups are path.1 .. path.N, gzipped
+    #   to path.N.gz when `compress` is set.
+    # - async_mode hands lines to a writer thread through a bounded queue, so log()
+    #   never waits on the disk; lines that do not fit in the queue are counted in
+    #   `dropped`.
+    # - After close() the logger still works: each line is appended synchronously and
+    #   the file is closed again.
+    def __init__(
+        self,
+        path="logs/runtime.log",
+        level="INFO",
+        fmt="text",
+        max_bytes=0,
+        rotate_interval_sec=0,
+        backup_count=5,
+        compress=False,
+        async_mode=False,
+        queue_size=10000,
+        flush_interval_sec=1.0,
+        echo=True,
+    ):
         self.path = path
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-
-    def log(self, msg):
-        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        line = f"[{ts}] {msg}"
-        with open(self.path, "a", encoding="utf-8") as f:
-            f.write(line + "\n")
-        print(line)
+        self.level = LEVELS.get(str(level).upper(), LEVELS["INFO"])
+        self.fmt = fmt
+        self.max_bytes = int(max_bytes or 0)
+        self.rotate_interval_sec = float(rotate_interval_sec or 0)
+        self.backup_count = max(1, int(backup_count))
+        self.compress = compress
+        self.flush_interval_sec = float(flush_interval_sec)
+        self.echo = echo
+        self.dropped = 0
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._file = None
+        self._size = 0
+        self._opened_at = 0.0
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+        self._queue = None
+        self._worker = None
+        self._closed = False
+        if async_mode:
+            self._queue = queue.Queue(maxsize=max(1, int(queue_size)))
+            self._worker = threading.Thread(target=self._run, name="logger", daemon=True)
+            self._worker.start()
+        atexit.register(self.close)
+
+    def _format(self, msg, level, fields):
+        now = datetime.now()
+        if self.fmt == "jsonl":
+            record = {"time": now.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3], "level": level, "msg": str(msg)}
+            record.update(fields)
+            return json.dumps(record, ensure_ascii=False, default=str)
+        ts = now.strftime("%Y-%m-%d %H:%M:%S")
+        if level == "INFO":
+            return f"[{ts}] {msg}"
+        return f"[{ts}] [{level}] {msg}"
+
+    def log(self, msg, level="INFO", **fields):
+        level = str(level).upper()
+        severity = LEVELS.get(level, LEVELS["INFO"])
+        if severity < self.level:
+            return
+        line = self._format(msg, level, fields)
+        if self._queue is not None:
+            try:
+                self._queue.put_nowait((line, severity))
+            except queue.Full:
+                self.dropped += 1
+            return
+        self._write(line, severity)
+
+    def debug(self, msg, **fields):
+        self.log(msg, level="DEBUG", **fields)
+
+    def info(self, msg, **fields):
+        self.log(msg, level="INFO", **fields)
+
+    def warn(self, msg, **fields):
+        self.log(msg, level="WARN", **fields)
+
+    def error(self, msg, **fields):
+        self.log(msg, level="ERROR", **fields)
+
+    def _open(self):
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+        self._opened_at = time.time()
+
+    def _backup_name(self, i):
+        return f"{self.path}.{i}.gz" if self.compress else f"{self.path}.{i}"
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        oldest = self._backup_name(self.backup_count)
+        if os.path.exists(oldest):
+            os.remove(oldest)
+        for i in range(self.backup_count - 1, 0, -1):
+            src = self._backup_name(i)
+            if os.path.exists(src):
+                os.replace(src, self._backup_name(i + 1))
+        if self.compress:
+            with open(self.path, "rb") as src, gzip.open(self._backup_name(1), "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(self.path)
+        else:
+            os.replace(self.path, self._backup_name(1))
+        self._open()
+
+    def _write(self, line, severity):
+        data = line + "\n"
+        with self._lock:
+            if self._file is None:
+                self._open()
+            now = time.time()
+            size = len(data.encode("utf-8"))
+            if self._size and (
+                (self.max_bytes and self._size + size > self.max_bytes)
+                or (self.rotate_interval_sec and now - self._opened_at >= self.rotate_interval_sec)
+            ):
+                self._rotate()
+            self._file.write(data)
+            self._size += size
+            if self._closed:
+                self._file.close()
+                self._file = None
+            elif severity >= LEVELS["WARN"] or now - self._last_flush >= self.flush_interval_sec:
+                self._file.flush()
+                self._last_flush = now
+        if self.echo:
+            print(line)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        if self._queue is not None and self._worker.is_alive():
+            self._queue.join()
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                self._last_flush = time.time()
+
+    def close(self):
+        if self._closed:
+            return
+        atexit.unregister(self.close)
+        pending = self._queue
+        if pending is not None and self._worker.is_alive():
+            pending.put(None)
+            self._worker.join()
+        # Nothing drains the queue any more: later lines are written synchronously, and
+        # lines that raced the shutdown are written here.
+        self._queue = None
+        self._closed = True
+        while pending is not None:
+            try:
+                item = pending.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                self._write(*item)
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def build_logger(cfg, async_mode=None):
+    monitor = cfg.get("monitor", {}) or {}
+    return Logger(
+        path=monitor.get("log_file", "logs/runtime.log"),
+        level=monitor.get("log_level", "INFO"),
+        fmt=monitor.get("log_format", "text"),
+        max_bytes=monitor.get("log_max_bytes", 0),
+        rotate_interval_sec=monitor.get("log_rotate_sec", 0),
+        backup_count=monitor.get("log_backup_count", 5),
+        compress=bool(monitor.get("log_compress", False)),
+        async_mode=bool(monitor.get("log_async", False)) if async_mode is None else async_mode,
+    )
@@ -1,4 +1,11 @@
-from datetime import datetime, time, timedelta
+from bisect import bisect_right
+from datetime import date, time, timedelta
+
+import numpy as np
+
+from engine.bar_store import datetime_to_minute, minute_to_datetime
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
 
 
 def parse_time_hhmm(value):
@@ -143,7 +150,7 @@ def _day_openable(day, schedule):
     return True
 
 
-def is_market_open(now, schedule):
+def _scan_is_market_open(now, schedule):
     date_str = now.strftime("%Y-%m-%d")
     if date_str in schedule.get("full_closures", set()):
         return False
@@ -171,25 +178,156 @@ def is_market_open(now, schedule):
     return not _is_in_ranges(t, closures)
 
 
-def next_market_open(now, schedule, max_days=14):
-    if is_market_open(now, schedule):
-        return now
+def _minute_of(t):
+    return t.hour * 60 + t.minute
 
-    for i in range(max_days + 1):
-        day = (now + timedelta(days=i)).date()
-        if not _day_openable(day, schedule):
-            continue
 
-        sessions = _sessions_for_date(day, schedule)
-        date_str = day.strftime("%Y-%m-%d")
-        closures = schedule.get("partial_closures", {}).get(date_str, [])
-        if sessions:
-            for start, _ in sessions:
-                dt = datetime.combine(day, start)
-                if dt > now and not _is_in_ranges(start, closures):
-                    return dt
+def _ranges_mask(ranges):
+    mask = np.zeros(1440, dtype=bool)
+    for start, end in ranges or []:
+        s, e = _minute_of(start), _minute_of(end)
+        if s <= e:
+            mask[s : e + 1] = True
         else:
-            dt = datetime.combine(day, time(0, 0))
-            if dt > now:
-                return dt
-    return None
+            mask[s:] = True
+            mask[: e + 1] = True
+    return mask
+
+
+def _day_mask(day, schedule):
+    # Minute-of-day version of _scan_is_market_open for one calendar day.
+    date_str = day.strftime("%Y-%m-%d")
+    if date_str in schedule.get("full_closures", set()):
+        return np.zeros(1440, dtype=bool)
+    current_openable = _day_openable(day, schedule)
+    sessions = list(_sessions_for_date(day, schedule)) if current_openable else []
+    prev_day = day - timedelta(days=1)
+    if _day_openable(prev_day, schedule):
+        sessions.extend((start, end) for start, end in _sessions_for_date(prev_day, schedule) if start > end)
+    if not sessions:
+        return np.full(1440, current_openable, dtype=bool)
+    mask = _ranges_mask(sessions)
+    closures = schedule.get("partial_closures", {}).get(date_str)
+    if closures:
+        mask &= ~_ranges_mask(closures)
+    return mask
+
+
+def _day_starts(day, schedule):
+    # Minutes-of-day next_market_open may return for this day: session starts outside
+    # partial closures, or midnight when the day is open without configured sessions.
+    if not _day_openable(day, schedule):
+        return []
+    sessions = _sessions_for_date(day, schedule)
+    if not sessions:
+        return [0]
+    closures = schedule.get("partial_closures", {}).get(day.strftime("%Y-%m-%d"), [])
+    return [_minute_of(start) for start, _ in sessions if not _is_in_ranges(start, closures)]
+
+
+class CompiledSchedule:
+    # Open/closed mask per (calendar day, minute of day) for one load_market_schedule()
+    # result. Rows cover day ordinals [first_day, first_day + len(mask)) and are
+    # extended lazily in chunks when a timestamp falls outside that range.
+    def __init__(self, schedule, chunk_days=366):
+        self.schedule = schedule
+        self.chunk_days = max(1, int(chunk_days))
+        self.first_day = None
+        self.mask = np.zeros((0, 1440), dtype=bool)
+        self.starts = []
+
+    def _build(self, lo, hi):
+        rows = []
+        starts = []
+        for ordinal in range(lo, hi):
+            day = date.fromordinal(ordinal)
+            rows.append(_day_mask(day, self.schedule))
+            base = (ordinal - _EPOCH_ORDINAL) * 1440
+            starts.extend(base + m for m in _day_starts(day, self.schedule))
+        return np.array(rows, dtype=bool).reshape(-1, 1440), starts
+
+    def ensure(self, lo, hi):
+        # Make sure day ordinals lo..hi-1 are compiled.
+        if self.first_day is None:
+            hi = max(hi, lo + self.chunk_days)
+            self.mask, self.starts = self._build(lo, hi)
+            self.first_day = lo
+            return
+        if lo < self.first_day:
+            new_lo = min(lo, self.first_day - self.chunk_days)
+            rows, starts = self._build(new_lo, self.first_day)
+            self.mask = np.concatenate([rows, self.mask])
+            self.starts = starts + self.starts
+            self.first_day = new_lo
+        last = self.first_day + len(self.mask)
+        if hi > last:
+            new_hi = max(hi, last + self.chunk_days)
+            rows, starts = self._build(last, new_hi)
+            self.mask = np.concatenate([self.mask, rows])
+            self.starts.extend(starts)
+
+    def is_open(self, ts):
+        day = ts // 1440 + _EPOCH_ORDINAL
+        row = day - self.first_day if self.first_day is not None else -1
+        if row < 0 or row >= len(self.mask):
+            self.ensure(day, day + 1)
+            row = day - self.first_day
+        return bool(self.mask[row, ts % 1440])
+
+    def open_mask(self, timestamps):
+        ts = np.asarray(timestamps, dtype=np.int64)
+        if not ts.size:
+            return np.zeros(ts.shape, dtype=bool)
+        days = ts // 1440 + _EPOCH_ORDINAL
+        self.ensure(int(days.min()), int(days.max()) + 1)
+        return self.mask[days - self.first_day, ts % 1440]
+
+    def count_open(self, starts, ends):
+        # Open minutes in each half-open interval [starts[i], ends[i]) of epoch minutes.
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        if not starts.size:
+            return np.zeros(0, dtype=np.int64)
+        lo = int(starts.min()) // 1440 + _EPOCH_ORDINAL
+        hi = int(ends.max()) // 1440 + _EPOCH_ORDINAL + 1
+        self.ensure(lo, hi)
+        flat = self.mask[lo - self.first_day : hi - self.first_day].ravel()
+        cum = np.zeros(flat.size + 1, dtype=np.int64)
+        np.cumsum(flat, out=cum[1:])
+        base = (lo - _EPOCH_ORDINAL) * 1440
+        return cum[ends - base] - cum[starts - base]
+
+    def next_start(self, ts, max_days=14):
+        # First session start strictly after minute ts, within max_days calendar days.
+        day = ts // 1440 + _EPOCH_ORDINAL
+        self.ensure(day, day + max_days + 1)
+        limit = (day + max_days + 1 - _EPOCH_ORDINAL) * 1440
+        i = bisect_right(self.starts, ts)
+        if i < len(self.starts) and self.starts[i] < limit:
+            return self.starts[i]
+        return None
+
+
+def compile_schedule(schedule):
+    # Cached on the schedule dict so every caller sharing a schedule shares the mask.
+    compiled = schedule.get("_compiled")
+    if compiled is None:
+        compiled = CompiledSchedule(schedule)
+        schedule["_compiled"] = compiled
+    return compiled
+
+
+def is_market_open(now, schedule):
+    if now.second or now.microsecond:
+        # The mask has minute resolution; keep exact semantics for e.g. 11:30:30.
+        return _scan_is_market_open(now, schedule)
+    return compile_schedule(schedule).is_open(datetime_to_minute(now))
+
+
+def next_market_open(now, schedule, max_days=14):
+    if is_market_open(now, schedule):
+        return now
+    ts = compile_schedule(schedule).next_start(datetime_to_minute(now), max_days=max_days)
+    if ts is None:
+        return None
+    return minute_to_datetime(ts)
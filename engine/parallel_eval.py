@@ -0,0 +1,189 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from engine.backtest_eval import run_once
+from engine.result_cache import backtest_key, hash_bars
+
+# Per-worker copy of the payload shared by every task (config, bars, prices, ...).
+_SHARED = None
+
+# How often a waiting scheduler re-checks its cancel flag, in seconds.
+CANCEL_POLL_SECONDS = 0.2
+
+
+class TaskCancelled(RuntimeError):
+    pass
+
+
+class SharedArray:
+    # A numpy array in multiprocessing.shared_memory. It pickles as (name, shape,
+    # dtype), so pool workers map the parent's buffer instead of receiving a copy of
+    # the series. The creating process owns the block and unlinks it on close().
+    def __init__(self, values, dtype=float):
+        values = np.asarray(values, dtype=dtype)
+        self.shape = values.shape
+        self.dtype = values.dtype.str
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, values.nbytes))
+        self._owner = True
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf)
+        self.array[...] = values
+
+    def __getstate__(self):
+        return {"name": self._shm.name, "shape": self.shape, "dtype": self.dtype}
+
+    def __setstate__(self, state):
+        self.shape = tuple(state["shape"])
+        self.dtype = state["dtype"]
+        self._shm = _attach_shared_memory(state["name"])
+        self._owner = False
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf)
+
+    def __len__(self):
+        return len(self.array)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self._shm is None:
+            return
+        self.array = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
+
+
+def _attach_shared_memory(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 registers attached blocks with the resource tracker, which then
+        # warns about (and unlinks) a block the parent still owns.
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+
+def resolve_workers(workers):
+    if workers is None or int(workers) <= 0:
+        return max(1, os.cpu_count() or 1)
+    return int(workers)
+
+
+def _init_worker(shared):
+    global _SHARED
+    _SHARED = shared
+
+
+def _call_chunk(func, chunk):
+    return [func(_SHARED, item) for item in chunk]
+
+
+def _is_cancelled(cancel):
+    if cancel is None:
+        return False
+    if hasattr(cancel, "is_set"):
+        return cancel.is_set()
+    return bool(cancel())
+
+
+def run_tasks(func, items, shared=None, workers=1, chunksize=None, progress=None, cancel=None):
+    # Local work scheduler behind parallel_map. Items go out in chunks; results are put
+    # back in item order whatever the completion order. `progress(done, total)` is
+    # called after each finished chunk. `cancel` (an Event or a callable) is checked
+    # while waiting: once set, pending chunks are dropped and TaskCancelled is raised.
+    items = list(items)
+    total = len(items)
+    workers = min(resolve_workers(workers), total) if items else 1
+    if chunksize is None:
+        chunksize = max(1, total // (workers * 4)) if workers > 1 else max(1, total)
+    chunks = [(start, items[start: start + chunksize]) for start in range(0, total, chunksize)]
+    results = [None] * total
+    done = 0
+
+    if workers <= 1:
+        for start, chunk in chunks:
+            if _is_cancelled(cancel):
+                raise TaskCancelled(f"cancelled after {done}/{total} tasks")
+            results[start: start + len(chunk)] = [func(shared, item) for item in chunk]
+            done += len(chunk)
+            if progress:
+                progress(done, total)
+        return results
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared,))
+    try:
+        pending = {pool.submit(_call_chunk, func, chunk): (start, len(chunk)) for start, chunk in chunks}
+        while pending:
+            if _is_cancelled(cancel):
+                raise TaskCancelled(f"cancelled after {done}/{total} tasks")
+            finished, _ = wait(pending, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in finished:
+                start, size = pending.pop(future)
+                results[start: start + size] = future.result()
+                done += size
+                if progress:
+                    progress(done, total)
+    except BaseException:
+        # Also on KeyboardInterrupt: drop queued chunks instead of running them all.
+        pool.shutdown(wait=True, cancel_futures=True)
+        raise
+    pool.shutdown(wait=True)
+    return results
+
+
+def parallel_map(func, items, shared=None, workers=1, chunksize=None, progress=None, cancel=None):
+    # Results come back in the order of `items` regardless of which worker finished first.
+    # `func(shared, item)` must be a module-level function so it can be pickled; `shared`
+    # is sent once per worker through the pool initializer instead of once per task.
+    return run_tasks(func, items, shared=shared, workers=workers, chunksize=chunksize, progress=progress, cancel=cancel)
+
+
+def print_progress(label, every=0.0):
+    # progress callback for the CLI scripts: "label: done/total", at most once per `every` seconds.
+    state = {"last": 0.0}
+
+    def report(done, total):
+        now = time.monotonic()
+        if done < total and now - state["last"] < every:
+            return
+        state["last"] = now
+        print(f"{label}: {done}/{total}", flush=True)
+
+    return report
+
+
+def _run_candidate(shared, strategy_cfg):
+    config, bars = shared
+    return run_once(config, bars, strategy_cfg)
+
+
+def evaluate_candidates(config, bars, candidates, workers=1, chunksize=None, cache=None):
+    # With a ResultCache only the candidates missing from it are run (and then stored).
+    if cache is None:
+        return parallel_map(_run_candidate, candidates, shared=(config, bars), workers=workers, chunksize=chunksize)
+    dataset_hash = hash_bars(bars)
+    keys = [backtest_key(dataset_hash, config, candidate) for candidate in candidates]
+    return cache.cached(
+        keys,
+        lambda missing: parallel_map(
+            _run_candidate,
+            [candidates[pos] for pos in missing],
+            shared=(config, bars),
+            workers=workers,
+            chunksize=chunksize,
+        ),
+    )
@@ -1,4 +1,15 @@
-﻿def evaluate_params(prices, fast, slow):
+﻿import numpy as np
+
+from engine.indicators import compare_price_arrays, compare_prices
+
+# Upper bound on candidates x bars cells materialized at once by the grid evaluator.
+GRID_CHUNK_CELLS = 4_000_000
+
+# Prefix sums in window_sums restart every this many values.
+WINDOW_SUM_BLOCK = 4096
+
+
+def evaluate_params(prices, fast, slow):
     if len(prices) < slow + 2:
         return None
     position = 0
@@ -7,7 +18,7 @@
     for i in range(slow, len(prices)):
         fast_ma = sum(prices[i - fast:i]) / fast
         slow_ma = sum(prices[i - slow:i]) / slow
-        signal = 1 if fast_ma > slow_ma else -1 if fast_ma < slow_ma else 0
+        signal = compare_prices(fast_ma, slow_ma)
         if position == 0 and signal != 0:
             position = signal
             entry = prices[i]
@@ -33,7 +44,7 @@ def evaluate_params_with_drawdown(prices, fast, slow):
     for i in range(slow, len(prices)):
         fast_ma = sum(prices[i - fast:i]) / fast
         slow_ma = sum(prices[i - slow:i]) / slow
-        signal = 1 if fast_ma > slow_ma else -1 if fast_ma < slow_ma else 0
+        signal = compare_prices(fast_ma, slow_ma)
         if position == 0 and signal != 0:
             position = signal
             entry = prices[i]
@@ -54,12 +65,115 @@ def evaluate_params_with_drawdown(prices, fast, slow):
     return {"pnl": pnl, "max_drawdown": max_dd, "trades": trades}
 
 
-def pick_best_params_scored(prices, candidates, objective="pnl", dd_penalty=0.0, min_trades=0):
-    best = None
+def window_sums(values, window, block=WINDOW_SUM_BLOCK):
+    # out[i] = sum(values[i - window:i]) for window <= i <= len(values), 0 before.
+    # Prefix sums restart every `block` values (block >= window), so a window spans at
+    # most two blocks and the rounding stays bounded by one block's sum, not by the
+    # length of the series.
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    window = max(1, int(window))
+    out = np.zeros(n + 1)
+    if window > n:
+        return out
+    block = max(int(block), window)
+    prefix = np.zeros(n + 1)
+    totals = np.zeros(n // block + 1)
+    for k, start in enumerate(range(0, n, block)):
+        part = np.cumsum(values[start: start + block])
+        # prefix[j] sums values from j's block start up to j; block starts stay 0.
+        prefix[start + 1: start + len(part)] = part[:-1]
+        if start + len(part) == n and len(part) < block:
+            prefix[n] = part[-1]
+        totals[k] = part[-1]
+    ends = np.arange(window, n + 1)
+    starts = ends - window
+    sums = prefix[ends] - prefix[starts]
+    spans = starts // block != ends // block
+    sums[spans] += totals[starts[spans] // block]
+    out[window:] = sums
+    return out
+
+
+def _ma_table(prices_arr, windows):
+    # Row per window: mean of prices[i - w:i] at column i (the bar being traded), 0 before w.
+    # Sums are taken relative to the first bar so they stay small.
+    n = len(prices_arr)
+    base = prices_arr[0] if n else 0.0
+    table = np.zeros((len(windows), n))
+    for row, w in enumerate(windows):
+        if w < n:
+            table[row, w:] = window_sums(prices_arr - base, w)[w:n] / w + base
+    return table
+
+
+def _grid_positions(ma_table, fast_rows, slow_rows, slows):
+    # Signals per candidate/bar, forward-filled into the held position (0 before the first entry).
+    # compare_price_arrays applies the same tie rule as the scalar evaluator.
+    n = ma_table.shape[1]
+    signals = compare_price_arrays(ma_table[fast_rows], ma_table[slow_rows])
+    for row, slow in enumerate(slows):
+        signals[row, :slow] = 0
+    cols = np.arange(n, dtype=np.int32)
+    last_idx = np.where(signals != 0, cols, np.int32(0))
+    np.maximum.accumulate(last_idx, axis=1, out=last_idx)
+    return np.take_along_axis(signals, last_idx, axis=1)
+
+
+def _stats_from_positions(prices_arr, positions):
+    # Entries happen where the held position changes; every entry except the first also
+    # closes the previous trade, and the last one is closed on the final bar.
+    entries = np.flatnonzero(positions[1:] != positions[:-1]) + 1
+    if not len(entries):
+        return {"pnl": 0.0, "max_drawdown": 0.0, "trades": 0}
+    exits = np.append(entries[1:], len(prices_arr) - 1)
+    trade_pnl = (prices_arr[exits] - prices_arr[entries]) * positions[entries]
+    equity = np.cumsum(trade_pnl)
+    peak = np.maximum.accumulate(np.maximum(equity, 0.0))
+    max_dd = max(0.0, float(np.max(peak - equity)))
+    return {"pnl": float(equity[-1]), "max_drawdown": max_dd, "trades": int(len(trade_pnl))}
+
+
+def evaluate_grid_with_drawdown(prices, candidates):
+    # Batch version of evaluate_params_with_drawdown; returns stats (or None) per candidate.
+    results = [None] * len(candidates)
+    n = len(prices)
+    batch = []
+    for pos, c in enumerate(candidates):
+        fast, slow = int(c["fast"]), int(c["slow"])
+        if n < slow + 2:
+            continue
+        if fast < 1 or fast > slow:
+            # Slices that reach before bar 0 behave differently; keep the scalar path for them.
+            results[pos] = evaluate_params_with_drawdown(prices, fast, slow)
+            continue
+        batch.append((pos, fast, slow))
+    if not batch:
+        return results
+
+    prices_arr = np.asarray(prices, dtype=float)
+    windows = sorted({w for _, f, s in batch for w in (f, s)})
+    row_of = {w: i for i, w in enumerate(windows)}
+    table = _ma_table(prices_arr, windows)
+    chunk = max(1, GRID_CHUNK_CELLS // max(1, n))
+    for start in range(0, len(batch), chunk):
+        part = batch[start: start + chunk]
+        positions = _grid_positions(
+            table,
+            np.array([row_of[f] for _, f, _ in part]),
+            np.array([row_of[s] for _, _, s in part]),
+            [s for _, _, s in part],
+        )
+        for row, (pos, _, _) in enumerate(part):
+            results[pos] = _stats_from_positions(prices_arr, positions[row])
+    return results
+
+
+def pick_scored_index(stats_list, objective="pnl", dd_penalty=0.0, min_trades=0):
+    # Position and score of the best stats dict (first one wins ties), or (None, None).
+    best_pos = None
     best_score = None
-    best_stats = None
-    for c in candidates:
-        stats = evaluate_params_with_drawdown(prices, c["fast"], c["slow"])
+    for pos, stats in enumerate(stats_list):
         if stats is None:
             continue
         if stats["trades"] < min_trades:
@@ -67,18 +181,25 @@ def pick_best_params_scored(prices, candidates, objective="pnl", dd_penalty=0.0,
         score = stats["pnl"] - dd_penalty * stats["max_drawdown"] if objective == "pnl_dd" else stats["pnl"]
         if best_score is None or score > best_score:
             best_score = score
-            best = c
-            best_stats = stats
-    return best, best_score, best_stats
+            best_pos = pos
+    return best_pos, best_score
+
+
+def pick_best_params_scored(prices, candidates, objective="pnl", dd_penalty=0.0, min_trades=0):
+    stats_list = evaluate_grid_with_drawdown(prices, candidates)
+    pos, score = pick_scored_index(stats_list, objective=objective, dd_penalty=dd_penalty, min_trades=min_trades)
+    if pos is None:
+        return None, None, None
+    return candidates[pos], score, stats_list[pos]
 
 
 def pick_best_params(prices, candidates):
     best = None
     best_score = None
-    for c in candidates:
-        score = evaluate_params(prices, c["fast"], c["slow"])
-        if score is None:
+    for c, stats in zip(candidates, evaluate_grid_with_drawdown(prices, candidates)):
+        if stats is None:
             continue
+        score = stats["pnl"]
         if best_score is None or score > best_score:
             best_score = score
             best = c
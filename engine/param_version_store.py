@@ -3,13 +3,23 @@ import os
 import uuid
 from datetime import datetime
 
+from engine.state_db import read_json, write_json_atomic
 from engine.strategy_state import StrategyState
 
 
 class ParamVersionStore:
-    def __init__(self, path="state/param_versions.json"):
+    # Parameter version history. With a StateDB, versions are rows of the indexed
+    # param_versions table (append is one INSERT, get/list_versions are index lookups)
+    # and state/param_versions.json is rewritten only when export_json is set.
+    def __init__(self, path="state/param_versions.json", db=None, export_json=True):
         self.path = path
+        self.db = db
+        self.export_json = export_json or db is None
         os.makedirs(os.path.dirname(path), exist_ok=True)
+        if db is not None and not db.count_versions():
+            old = read_json(path)
+            if isinstance(old, dict) and isinstance(old.get("versions"), list) and old["versions"]:
+                db.insert_versions(old["versions"])
 
     def _load_all(self):
         if not os.path.exists(self.path):
@@ -24,11 +34,9 @@ class ParamVersionStore:
         return {"versions": versions}
 
     def _save_all(self, payload):
-        with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
+        write_json_atomic(self.path, payload)
 
     def append(self, symbol, params, source, metrics=None, note=""):
-        payload = self._load_all()
         version = {
             "version_id": uuid.uuid4().hex[:12],
             "symbol": symbol,
@@ -38,11 +46,19 @@ class ParamVersionStore:
             "note": note,
             "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         }
+        if self.db is not None:
+            self.db.insert_versions([version])
+            if self.export_json:
+                self._save_all({"versions": self.db.all_versions()})
+            return version
+        payload = self._load_all()
         payload["versions"].append(version)
         self._save_all(payload)
         return version
 
     def list_versions(self, symbol=None, limit=20):
+        if self.db is not None:
+            return self.db.list_versions(symbol=symbol, limit=limit)
         payload = self._load_all()
         versions = payload["versions"]
         if symbol:
@@ -51,6 +67,8 @@ class ParamVersionStore:
         return versions[:limit]
 
     def get(self, version_id):
+        if self.db is not None:
+            return self.db.get_version(version_id)
         payload = self._load_all()
         for item in payload["versions"]:
             if item.get("version_id") == version_id:
@@ -70,7 +88,7 @@ class ParamVersionStore:
         with open(config_path, "w", encoding="utf-8") as f:
             json.dump(cfg, f, ensure_ascii=False, indent=2)
 
-        StrategyState(strategy_state_path).save_params(
+        StrategyState(strategy_state_path, db=self.db, export_json=self.export_json).save_params(
             {
                 "fast": cfg["strategy"].get("fast"),
                 "slow": cfg["strategy"].get("slow"),
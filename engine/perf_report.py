@@ -37,20 +37,27 @@ def _month_drawdown(equities):
     return max_dd
 
 
+def _column_pairs(rows, key_field, value_field):
+    # (key, float value) pairs; recorders hand over just the two columns asked for.
+    if hasattr(rows, "column"):
+        return zip(rows.column(key_field), map(float, rows.column(value_field)))
+    return ((row.get(key_field), float(row.get(value_field, 0.0))) for row in rows)
+
+
 def build_monthly_metrics(equity_rows, trade_rows):
     monthly_equity = defaultdict(list)
-    for row in equity_rows:
-        month = _month_key(row.get("datetime"))
+    for key, value in _column_pairs(equity_rows, "datetime", "equity"):
+        month = _month_key(key)
         if not month:
             continue
-        monthly_equity[month].append(float(row.get("equity", 0.0)))
+        monthly_equity[month].append(value)
 
     monthly_trades = defaultdict(list)
-    for trade in trade_rows:
-        month = _month_key(trade.get("exit_time"))
+    for key, value in _column_pairs(trade_rows, "exit_time", "pnl"):
+        month = _month_key(key)
         if not month:
             continue
-        monthly_trades[month].append(float(trade.get("pnl", 0.0)))
+        monthly_trades[month].append(value)
 
     all_months = sorted(set(monthly_equity.keys()) | set(monthly_trades.keys()))
     rows = []
@@ -85,18 +92,18 @@ def build_monthly_metrics(equity_rows, trade_rows):
 
 def build_weekly_metrics(equity_rows, trade_rows):
     weekly_equity = defaultdict(list)
-    for row in equity_rows:
-        week = _week_key(row.get("datetime"))
+    for key, value in _column_pairs(equity_rows, "datetime", "equity"):
+        week = _week_key(key)
         if not week:
             continue
-        weekly_equity[week].append(float(row.get("equity", 0.0)))
+        weekly_equity[week].append(value)
 
     weekly_trades = defaultdict(list)
-    for trade in trade_rows:
-        week = _week_key(trade.get("exit_time"))
+    for key, value in _column_pairs(trade_rows, "exit_time", "pnl"):
+        week = _week_key(key)
         if not week:
             continue
-        weekly_trades[week].append(float(trade.get("pnl", 0.0)))
+        weekly_trades[week].append(value)
 
     all_weeks = sorted(set(weekly_equity.keys()) | set(weekly_trades.keys()))
     rows = []
@@ -0,0 +1,262 @@
+import csv
+import os
+from collections.abc import Sequence
+
+import numpy as np
+
+EQUITY_FIELDS = ("step", "cash", "unrealized", "equity", "drawdown", "datetime")
+TRADE_FIELDS = (
+    "direction",
+    "entry_price",
+    "exit_price",
+    "requested_size",
+    "fill_ratio",
+    "size",
+    "contract_multiplier",
+    "cost_profile",
+    "gross_pnl",
+    "commission",
+    "pnl",
+    "entry_time",
+    "exit_time",
+)
+_TRADE_TEXT = ("direction", "cost_profile", "entry_time", "exit_time")
+_ITER_CHUNK = 4096
+_NUMERIC = ("_step", "_cash", "_unrealized", "_equity", "_drawdown")
+
+
+def _text(value):
+    return "" if value is None else str(value)
+
+
+def read_csv_prefix(path, fields, limit):
+    # The first `limit` rows of a file written by write_csv / append_csv, parsed as
+    # strings, plus the byte offset right after them (where append_csv would go on).
+    # None when the file is missing, has another header or holds fewer rows.
+    if not os.path.exists(path):
+        return None
+    rows = []
+    with open(path, "rb") as f:
+        header = f.readline()
+        if next(csv.reader([header.decode("utf-8-sig")]), None) != list(fields):
+            return None
+        offset = len(header)
+        while len(rows) < limit:
+            line = f.readline()
+            if not line.endswith(b"\n"):
+                return None
+            offset += len(line)
+            rows.append(next(csv.reader([line.decode("utf-8")])))
+    return rows, offset
+
+
+class EquityRecorder(Sequence):
+    # Equity curve kept as growable numpy columns (capacity doubles when full) instead of
+    # one dict per bar. Indexing and iteration still yield the usual row dicts, so code
+    # written against the list of dicts keeps working.
+    __slots__ = ("_n", "_step", "_cash", "_unrealized", "_equity", "_drawdown", "_times")
+
+    def __init__(self, capacity=1024):
+        capacity = max(1, int(capacity))
+        self._n = 0
+        self._step = np.empty(capacity, dtype=np.int64)
+        self._cash = np.empty(capacity, dtype=np.float64)
+        self._unrealized = np.empty(capacity, dtype=np.float64)
+        self._equity = np.empty(capacity, dtype=np.float64)
+        self._drawdown = np.empty(capacity, dtype=np.float64)
+        self._times = []
+
+    def _grow(self):
+        capacity = len(self._step) * 2
+        for name in _NUMERIC:
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[: self._n] = old[: self._n]
+            setattr(self, name, new)
+
+    def append(self, step, cash, unrealized, equity, drawdown, bar_time):
+        i = self._n
+        if i == len(self._step):
+            self._grow()
+        self._step[i] = step
+        self._cash[i] = cash
+        self._unrealized[i] = unrealized
+        self._equity[i] = equity
+        self._drawdown[i] = drawdown
+        self._times.append(bar_time)
+        self._n = i + 1
+
+    def __len__(self):
+        return self._n
+
+    def __getstate__(self):
+        # Pickle only the filled part of the columns, not the spare capacity.
+        return (self._n,) + tuple(getattr(self, name)[: self._n].copy() for name in _NUMERIC) + (self._times,)
+
+    def __setstate__(self, state):
+        self._n = state[0]
+        for name, column in zip(_NUMERIC, state[1:-1]):
+            setattr(self, name, column if len(column) else np.empty(1, dtype=column.dtype))
+        self._times = state[-1]
+
+    def _row(self, i):
+        return {
+            "step": int(self._step[i]),
+            "cash": float(self._cash[i]),
+            "unrealized": float(self._unrealized[i]),
+            "equity": float(self._equity[i]),
+            "drawdown": float(self._drawdown[i]),
+            "datetime": self._times[i],
+        }
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(self._n))]
+        if index < 0:
+            index += self._n
+        if index < 0 or index >= self._n:
+            raise IndexError("EquityRecorder index out of range")
+        return self._row(index)
+
+    def _columns(self, start=0, stop=None):
+        # Python-level column lists for rows [start, stop), in EQUITY_FIELDS order.
+        stop = self._n if stop is None else min(stop, self._n)
+        return (
+            self._step[start:stop].tolist(),
+            self._cash[start:stop].tolist(),
+            self._unrealized[start:stop].tolist(),
+            self._equity[start:stop].tolist(),
+            self._drawdown[start:stop].tolist(),
+            self._times[start:stop],
+        )
+
+    def __iter__(self):
+        for start in range(0, self._n, _ITER_CHUNK):
+            for values in zip(*self._columns(start, start + _ITER_CHUNK)):
+                yield dict(zip(EQUITY_FIELDS, values))
+
+    def __repr__(self):
+        return f"EquityRecorder(len={self._n})"
+
+    def column(self, name):
+        # One field as a Python list, without building the other columns.
+        if name == "datetime":
+            return list(self._times)
+        if name not in EQUITY_FIELDS:
+            raise KeyError(name)
+        return getattr(self, f"_{name}")[: self._n].tolist()
+
+    def to_numpy(self):
+        # Numeric columns are views into the recorder (no copy); datetime is a str array.
+        return {
+            "step": self._step[: self._n],
+            "cash": self._cash[: self._n],
+            "unrealized": self._unrealized[: self._n],
+            "equity": self._equity[: self._n],
+            "drawdown": self._drawdown[: self._n],
+            "datetime": np.array([_text(t) for t in self._times], dtype=str),
+        }
+
+    def write_csv(self, path):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(EQUITY_FIELDS)
+            writer.writerows(zip(*self._columns()))
+
+    def append_csv(self, path, start):
+        # Appends rows [start:] to a file previously written by write_csv.
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(zip(*self._columns(start)))
+
+    def write_binary(self, path):
+        np.savez(path, **self.to_numpy())
+
+    @classmethod
+    def from_csv_rows(cls, rows):
+        recorder = cls(capacity=len(rows) + 1024)
+        for step, cash, unrealized, equity, drawdown, bar_time in rows:
+            recorder.append(int(step), float(cash), float(unrealized), float(equity), float(drawdown), bar_time)
+        return recorder
+
+
+class TradeRecord:
+    # One closed trade. Slots instead of a 13-key dict; the mapping methods cover what
+    # callers used on the dict (t["pnl"], t.get(...), keys() for csv.DictWriter).
+    __slots__ = TRADE_FIELDS
+
+    def __init__(self, **fields):
+        for name in TRADE_FIELDS:
+            setattr(self, name, fields.get(name))
+
+    def __getitem__(self, key):
+        if key not in TRADE_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in TRADE_FIELDS
+
+    def __eq__(self, other):
+        if isinstance(other, (TradeRecord, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self):
+        return f"TradeRecord({self.to_dict()!r})"
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in TRADE_FIELDS else default
+
+    def keys(self):
+        return list(TRADE_FIELDS)
+
+    def values(self):
+        return [getattr(self, name) for name in TRADE_FIELDS]
+
+    def items(self):
+        return list(zip(TRADE_FIELDS, self.values()))
+
+    def to_dict(self):
+        return dict(self.items())
+
+    @classmethod
+    def from_csv_row(cls, row):
+        # Inverse of write_csv: "" back to None, numeric columns as float.
+        fields = {}
+        for name, value in zip(TRADE_FIELDS, row):
+            if value == "":
+                fields[name] = None
+            else:
+                fields[name] = value if name in _TRADE_TEXT else float(value)
+        return cls(**fields)
+
+
+class TradeRecorder(list):
+    # List of TradeRecord with columnar export.
+    def column(self, name):
+        if name not in TRADE_FIELDS:
+            raise KeyError(name)
+        return [getattr(record, name) for record in self]
+
+    def to_numpy(self):
+        columns = {}
+        for name in TRADE_FIELDS:
+            values = self.column(name)
+            if name in _TRADE_TEXT:
+                columns[name] = np.array([_text(v) for v in values], dtype=str)
+            else:
+                columns[name] = np.array(values, dtype=np.float64)
+        return columns
+
+    def write_csv(self, path):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(TRADE_FIELDS)
+            writer.writerows(record.values() for record in self)
+
+    def append_csv(self, path, start):
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(record.values() for record in self[start:])
+
+    def write_binary(self, path):
+        np.savez(path, **self.to_numpy())
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from engine.backtest_eval import run_once
+from engine.bar_store import BarSeries
+
+# Bump to drop every cached result, e.g. after a change to the stored value format.
+CACHE_VERSION = 1
+
+# Top-level config keys run_once reads, all part of the key. The symbol counts too:
+# SimExecution seeds its fill-ratio and reject draws with it. The strategy comes from
+# the candidate strategy_cfg, keyed separately, not from config["strategy"].
+CONFIG_SECTIONS = ("symbol", "contract", "risk", "cost_model", "market_hours", "schedule", "backtest")
+
+DEFAULT_PATH = "cache/backtest_cache.db"
+DEFAULT_MAX_ENTRIES = 200000
+
+# SQLite host-parameter limit is 999 on older builds.
+_SQL_BATCH = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    last_used REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_results_last_used ON results (last_used);
+"""
+
+_code_fingerprint = None
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def code_fingerprint():
+    # Hash of the engine sources, part of every key: editing the backtest engine,
+    # risk, execution or a strategy starts a fresh key space instead of serving
+    # results computed by the old code.
+    global _code_fingerprint
+    if _code_fingerprint is None:
+        digest = hashlib.sha256(str(CACHE_VERSION).encode())
+        folder = os.path.dirname(os.path.abspath(__file__))
+        for name in sorted(os.listdir(folder)):
+            if name.endswith(".py"):
+                with open(os.path.join(folder, name), "rb") as f:
+                    digest.update(name.encode())
+                    digest.update(f.read())
+        _code_fingerprint = digest.hexdigest()
+    return _code_fingerprint
+
+
+def hash_bars(bars):
+    # Content hash of the columns the backtest reads. Plain bar lists are converted
+    # first, so a list and a BarSeries holding the same bars share their keys.
+    if not isinstance(bars, BarSeries):
+        bars = BarSeries.from_bars(bars)
+    digest = hashlib.sha256()
+    for column in (bars.times, bars.opens, bars.highs, bars.lows, bars.closes):
+        digest.update(np.ascontiguousarray(column).tobytes())
+    return f"bars:{len(bars)}:{digest.hexdigest()}"
+
+
+def hash_prices(prices):
+    values = np.ascontiguousarray(prices, dtype=float)
+    return f"prices:{len(values)}:{hashlib.sha256(values.tobytes()).hexdigest()}"
+
+
+def make_key(kind, dataset_hash, payload):
+    text = _dumps([kind, code_fingerprint(), dataset_hash, payload])
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def backtest_key(dataset_hash, config, strategy_cfg):
+    sections = {name: config.get(name) for name in CONFIG_SECTIONS}
+    return make_key("run_once", dataset_hash, [sections, strategy_cfg])
+
+
+class ResultCache:
+    # Content-addressed store for backtest results (stdlib sqlite3, WAL journal).
+    # Keys come from make_key / backtest_key, values are JSON. Hits refresh
+    # last_used; once the table holds more than max_entries rows the least recently
+    # used ones are deleted. hits / misses / stores / evictions count this instance.
+    def __init__(self, path=DEFAULT_PATH, max_entries=DEFAULT_MAX_ENTRIES, timeout=5.0):
+        self.path = path
+        self.max_entries = max(1, int(max_entries))
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def get_many(self, keys):
+        # {key: value} for the keys present in the cache.
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), _SQL_BATCH):
+                batch = keys[start: start + _SQL_BATCH]
+                marks = ",".join("?" * len(batch))
+                rows = self._conn.execute(f"SELECT key, value FROM results WHERE key IN ({marks})", batch).fetchall()
+                found.update((key, json.loads(value)) for key, value in rows)
+            if found:
+                now = time.time()
+                hit_keys = list(found)
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    for start in range(0, len(hit_keys), _SQL_BATCH):
+                        batch = hit_keys[start: start + _SQL_BATCH]
+                        marks = ",".join("?" * len(batch))
+                        self._conn.execute(f"UPDATE results SET last_used = ? WHERE key IN ({marks})", [now] + batch)
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def put_many(self, items):
+        if not items:
+            return
+        now = time.time()
+        rows = [(key, json.dumps(value, ensure_ascii=False), now) for key, value in items.items()]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany("INSERT OR REPLACE INTO results (key, value, last_used) VALUES (?, ?, ?)", rows)
+                excess = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0] - self.max_entries
+                if excess > 0:
+                    self._conn.execute(
+                        "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_used LIMIT ?)",
+                        (excess,),
+                    )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            self.stores += len(rows)
+            self.evictions += max(0, excess)
+
+    def put(self, key, value):
+        self.put_many({key: value})
+
+    def cached(self, keys, compute_missing):
+        # Values for `keys` in order. compute_missing(positions) gets the positions
+        # of the keys not in the cache and returns their values in the same order;
+        # they are stored before returning. Repeated keys are computed once.
+        found = self.get_many(keys)
+        missing = []
+        seen = set()
+        for pos, key in enumerate(keys):
+            if key not in found and key not in seen:
+                seen.add(key)
+                missing.append(pos)
+        if missing:
+            fresh = {keys[pos]: value for pos, value in zip(missing, compute_missing(missing))}
+            self.put_many(fresh)
+            found.update(fresh)
+        return [found[key] for key in keys]
+
+    def entries(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def metrics(self):
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "entries": self.entries(),
+            "max_entries": self.max_entries,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_result_cache(config, enabled=True):
+    # ResultCache from config["backtest_cache"] ({"enabled", "path", "max_entries"}),
+    # or None when turned off there or by the caller (the scripts' --no-cache).
+    cache_cfg = (config or {}).get("backtest_cache") or {}
+    if not enabled or not cache_cfg.get("enabled", True):
+        return None
+    return ResultCache(
+        path=cache_cfg.get("path", DEFAULT_PATH),
+        max_entries=cache_cfg.get("max_entries", DEFAULT_MAX_ENTRIES),
+    )
+
+
+def run_once_cached(config, bars, strategy_cfg, cache=None, dataset_hash=None):
+    if cache is None:
+        return run_once(config, bars, strategy_cfg)
+    key = backtest_key(dataset_hash or hash_bars(bars), config, strategy_cfg)
+    return cache.cached([key], lambda missing: [run_once(config, bars, strategy_cfg)])[0]
+
+
+def describe_cache(cache):
+    if cache is None:
+        return "backtest_cache=off"
+    m = cache.metrics()
+    return (
+        f"backtest_cache hits={m['hits']} misses={m['misses']} hit_rate={m['hit_rate']:.1%} "
+        f"stores={m['stores']} evictions={m['evictions']} entries={m['entries']}/{m['max_entries']}"
+    )
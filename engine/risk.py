@@ -1,4 +1,7 @@
-﻿class RiskManager:
+﻿from engine.indicators import ATR, true_range
+
+
+class RiskManager:
     def __init__(
         self,
         stop_loss_percentage=0.02,
@@ -55,7 +58,7 @@
         self.trading_halted = False
         self.volatility_paused = False
         self.halt_reason = None
-        self._atr_values = []
+        self._atr = ATR(atr_period)
         self.orders_today = 0
         self.last_order_ts = None
         self.connection_ok = True
@@ -154,18 +157,10 @@
         if len(bars) < 2:
             return None
         current = bars[-1]
-        prev_close = bars[-2]["close"]
-        tr = max(
-            current["high"] - current["low"],
-            abs(current["high"] - prev_close),
-            abs(current["low"] - prev_close),
-        )
-        self._atr_values.append(tr)
-        if len(self._atr_values) > self.atr_period:
-            self._atr_values.pop(0)
-        if len(self._atr_values) < self.atr_period:
-            return None
-        return sum(self._atr_values) / len(self._atr_values)
+        return self.update_true_range(true_range(current["high"], current["low"], bars[-2]["close"]))
+
+    def update_true_range(self, tr):
+        return self._atr.on_true_range(tr)
 
     def update_volatility_pause(self, atr):
         if self.volatility_halt_atr is None:
@@ -203,6 +198,17 @@
             self.trigger_halt("MAX_DRAWDOWN_PCT")
         return drawdown
 
+    def to_dict(self):
+        # Settings and running counters as plain data, for session snapshots.
+        data = {name: value for name, value in vars(self).items() if name != "_atr"}
+        data["atr"] = self._atr.to_dict()
+        return data
+
+    def restore(self, data):
+        data = dict(data)
+        self._atr.restore(data.pop("atr"))
+        vars(self).update(data)
+
     def update_after_trade(self, pnl, equity):
         self.daily_pnl += pnl
         if pnl < 0:
@@ -1,100 +1,385 @@
-from engine.strategy import RSIMAStrategy
-from engine.walk_forward import build_windows
+import numpy as np
 
+from engine.indicators import compare_price_arrays, meets_min_diff_arrays, rsi_compare_arrays
+from engine.param_optimizer import GRID_CHUNK_CELLS, _stats_from_positions, window_sums
+from engine.walk_forward import SharedWalkForward, build_windows, chunk_items, run_price_tasks, shared_values
+
+
+def _rsi_ma_settings(params):
+    return {
+        "fast": int(params.get("fast", 5)),
+        "slow": int(params.get("slow", 20)),
+        "rsi_period": max(1, int(params.get("rsi_period", 14))),
+        "rsi_overbought": float(params.get("rsi_overbought", 70)),
+        "rsi_oversold": float(params.get("rsi_oversold", 30)),
+        "min_diff": float(params.get("min_diff", 0.0)),
+        "cooldown_bars": int(params.get("cooldown_bars", 0) or 0),
+        "max_consecutive_losses": params.get("max_consecutive_losses"),
+        "trend_filter": bool(params.get("trend_filter", False)),
+        "trend_window": int(params.get("trend_window", 50)),
+    }
+
+
+def _rolling_mean_table(prices_arr, windows):
+    # Row per window: the RollingMean value after bar i, sum(prices[: i + 1][-w:]) / w,
+    # including the short-history case. Sums run on prices relative to the first bar.
+    n = len(prices_arr)
+    base = prices_arr[0]
+    rel = prices_arr - base
+    hi = np.arange(1, n + 1)
+    table = np.empty((len(windows), n))
+    for row, w in enumerate(windows):
+        w = max(1, int(w))
+        sums = window_sums(rel, w)[1:]
+        short = min(w - 1, n)
+        sums[:short] = np.cumsum(rel[:short])
+        table[row] = (sums + np.minimum(hi, w) * base) / w
+    return table
+
+
+def _window_sum(values, period):
+    # sum(values[j - period + 1: j + 1]) per j, forced to exactly 0 when every term is 0
+    # (RollingSum does the same, so "no losses" still gives RSI 100).
+    n = len(values)
+    out = window_sums(values, period)[1:]
+    counts = window_sums(values != 0, period)[1:]
+    short = min(period - 1, n)
+    out[:short] = np.cumsum(values[:short])
+    counts[:short] = np.cumsum(values[:short] != 0)
+    out[counts == 0] = 0.0
+    return out
+
+
+def _rsi_sums(prices_arr, period):
+    # Gain and loss sums of the simple RSI after bar i (RSI.compare reads the same
+    # sums), NaN until `period` changes are available.
+    n = len(prices_arr)
+    gains = np.full(n, np.nan)
+    losses = np.full(n, np.nan)
+    if n <= period:
+        return gains, losses
+    change = np.diff(prices_arr)
+    gains[period:] = _window_sum(np.where(change >= 0, change, 0.0), period)[period - 1:]
+    losses[period:] = _window_sum(np.where(change < 0, -change, 0.0), period)[period - 1:]
+    return gains, losses
+
+
+class RSIMAArrays:
+    # Indicator arrays for one price series, built once and shared by every parameter
+    # set evaluated on it: one MA row per distinct window, RSI gain / loss sums per period.
+    def __init__(self, prices, mas=(), rsi_periods=()):
+        self.prices = np.asarray(prices, dtype=float)
+        self._ma = {}
+        self._rsi = {}
+        self.add(mas, rsi_periods)
+
+    def add(self, mas=(), rsi_periods=()):
+        missing = sorted({max(1, int(w)) for w in mas} - set(self._ma))
+        if missing and len(self.prices):
+            for w, row in zip(missing, _rolling_mean_table(self.prices, missing)):
+                self._ma[w] = row
+        for period in rsi_periods:
+            period = max(1, int(period))
+            if period not in self._rsi:
+                self._rsi[period] = _rsi_sums(self.prices, period)
+
+    def ma(self, window):
+        window = max(1, int(window))
+        if window not in self._ma:
+            self.add(mas=[window])
+        return self._ma[window]
+
+    def rsi_sums(self, period):
+        period = max(1, int(period))
+        if period not in self._rsi:
+            self.add(rsi_periods=[period])
+        return self._rsi[period]
+
+
+def rsi_ma_signal_rows(arrays, settings, fasts, slows):
+    # RSIMAStrategy.generate_signal for every bar, one int8 row per (fast, slow) pair
+    # sharing the other settings, before the cooldown / loss-streak gate (that part
+    # depends on trade results). Comparisons use the strategy's tie rule.
+    n = len(arrays.prices)
+    period = settings["rsi_period"]
+    fast_ma = np.array([arrays.ma(w) for w in fasts])
+    slow_ma = np.array([arrays.ma(w) for w in slows])
+    gains, losses = arrays.rsi_sums(period)
+    scale = np.abs(arrays.prices) * period
+    cross = compare_price_arrays(fast_ma, slow_ma)
+    diff_ok = meets_min_diff_arrays(fast_ma, slow_ma, settings["min_diff"])
+    oversold = rsi_compare_arrays(gains, losses, settings["rsi_oversold"], scale) <= 0
+    overbought = rsi_compare_arrays(gains, losses, settings["rsi_overbought"], scale) >= 0
+    long_ = (cross == 1) & oversold & diff_ok
+    short = (cross == -1) & overbought & diff_ok
+    if settings["trend_filter"]:
+        trend_dir = compare_price_arrays(arrays.prices, arrays.ma(settings["trend_window"]))
+        long_ &= trend_dir == 1
+        short &= trend_dir == -1
+    signals = long_.astype(np.int8) - short.astype(np.int8)
+    min_start = settings["rsi_period"]
+    if settings["trend_filter"]:
+        min_start = max(min_start, settings["trend_window"] - 1)
+    for row, slow in enumerate(slows):
+        signals[row, : min(max(slow - 1, min_start), n)] = 0
+    return signals
 
-def evaluate_rsi_ma_params_with_drawdown(prices, params):
-    slow = int(params.get("slow", 20))
-    rsi_period = int(params.get("rsi_period", 14))
-    min_required = max(slow, rsi_period + 1)
-    if len(prices) < min_required:
-        return None
-
-    strategy = RSIMAStrategy(
-        rsi_period=rsi_period,
-        rsi_overbought=float(params.get("rsi_overbought", 70)),
-        rsi_oversold=float(params.get("rsi_oversold", 30)),
-        fast=int(params.get("fast", 5)),
-        slow=slow,
-        min_diff=float(params.get("min_diff", 0.0)),
-        cooldown_bars=int(params.get("cooldown_bars", 0)),
-        max_consecutive_losses=params.get("max_consecutive_losses"),
-        trend_filter=bool(params.get("trend_filter", False)),
-        trend_window=int(params.get("trend_window", 50)),
-    )
 
+def rsi_ma_signals(arrays, settings):
+    return rsi_ma_signal_rows(arrays, settings, [settings["fast"]], [settings["slow"]])[0]
+
+
+def _stats_with_gate(prices_arr, signals, cooldown_bars, max_losses):
+    # Same position loop as the strategy-driven evaluator, but only visiting bars with
+    # a signal: every other bar leaves the position and the gate state unchanged.
     position = 0
     entry = 0.0
     pnl = 0.0
     peak = 0.0
     max_dd = 0.0
     trades = 0
-
-    for i in range(min_required - 1, len(prices)):
-        signal = strategy.generate_signal(prices[: i + 1], step=i)
-        price = prices[i]
-
-        if position == 0 and signal != 0:
-            position = signal
-            entry = price
+    loss_streak = 0
+    cooldown_until = -1
+    for i in np.flatnonzero(signals).tolist():
+        if i <= cooldown_until:
             continue
-
-        if position != 0 and signal != 0 and signal != position:
-            trade_pnl = (price - entry) * position
-            pnl += trade_pnl
-            peak = max(peak, pnl)
-            max_dd = max(max_dd, peak - pnl)
-            trades += 1
-            strategy.on_trade_close(trade_pnl, i)
-
+        signal = int(signals[i])
+        price = float(prices_arr[i])
+        if position == 0:
             position = signal
             entry = price
+            continue
+        if signal == position:
+            continue
+        trade_pnl = (price - entry) * position
+        pnl += trade_pnl
+        peak = max(peak, pnl)
+        max_dd = max(max_dd, peak - pnl)
+        trades += 1
+        position = signal
+        entry = price
+        if trade_pnl < 0:
+            loss_streak += 1
+            if cooldown_bars:
+                cooldown_until = max(cooldown_until, i + cooldown_bars)
+        else:
+            loss_streak = 0
+        if max_losses is not None and loss_streak >= max_losses:
+            break
 
     if position != 0:
-        trade_pnl = (prices[-1] - entry) * position
+        trade_pnl = (float(prices_arr[-1]) - entry) * position
         pnl += trade_pnl
         peak = max(peak, pnl)
         max_dd = max(max_dd, peak - pnl)
         trades += 1
-
     return {"pnl": pnl, "max_drawdown": max_dd, "trades": trades}
 
 
-def evaluate_candidate_walk_forward(
+def _stats_from_signal_rows(prices_arr, signals, settings):
+    if not settings["cooldown_bars"] and settings["max_consecutive_losses"] is None:
+        # No gate: the held position is just the last non-zero signal.
+        cols = np.arange(signals.shape[1], dtype=np.int32)
+        last_idx = np.where(signals != 0, cols, np.int32(0))
+        np.maximum.accumulate(last_idx, axis=1, out=last_idx)
+        positions = np.take_along_axis(signals, last_idx, axis=1)
+        return [_stats_from_positions(prices_arr, row) for row in positions]
+    return [
+        _stats_with_gate(prices_arr, row, settings["cooldown_bars"], settings["max_consecutive_losses"])
+        for row in signals
+    ]
+
+
+def evaluate_rsi_ma_grid_with_drawdown(prices, params_list, arrays=None):
+    # Batch evaluator: stats (or None when the series is too short) per params dict.
+    # Every parameter set shares the MA / RSI arrays of `prices`, and sets that only
+    # differ in fast / slow get their signals from one matrix operation.
+    results = [None] * len(params_list)
+    n = len(prices)
+    groups = {}
+    for pos, params in enumerate(params_list):
+        s = _rsi_ma_settings(params)
+        if n < max(s["slow"], s["rsi_period"] + 1):
+            continue
+        key = tuple(sorted((k, v) for k, v in s.items() if k not in ("fast", "slow")))
+        groups.setdefault(key, (s, []))[1].append((pos, s["fast"], s["slow"]))
+    if not groups:
+        return results
+    if arrays is None:
+        arrays = RSIMAArrays(prices)
+    mas = set()
+    for s, members in groups.values():
+        for _, fast, slow in members:
+            mas.update((fast, slow))
+        if s["trend_filter"]:
+            mas.add(s["trend_window"])
+    arrays.add(mas=mas, rsi_periods={s["rsi_period"] for s, _ in groups.values()})
+
+    chunk = max(1, GRID_CHUNK_CELLS // max(1, n))
+    for s, members in groups.values():
+        for start in range(0, len(members), chunk):
+            part = members[start: start + chunk]
+            signals = rsi_ma_signal_rows(arrays, s, [m[1] for m in part], [m[2] for m in part])
+            for (pos, _, _), stats in zip(part, _stats_from_signal_rows(arrays.prices, signals, s)):
+                results[pos] = stats
+    return results
+
+
+def evaluate_rsi_ma_params_with_drawdown(prices, params):
+    return evaluate_rsi_ma_grid_with_drawdown(prices, [params])[0]
+
+
+class RSIMAWalkForward:
+    # evaluate_rsi_ma_params_with_drawdown(prices[start:end], params) for every params
+    # dict and window, with indicators and signals computed once over the full series.
+    def __init__(self, prices, params_list):
+        self.prices = prices
+        self.params_list = params_list
+        self.settings = [_rsi_ma_settings(p) for p in params_list]
+        self._where = {}
+        self._blocks = []
+        groups = {}
+        for pos, s in enumerate(self.settings):
+            if 1 <= s["fast"] <= s["slow"]:
+                # A longer fast window is still filling up at the slice start; those
+                # keep the per-slice path.
+                key = tuple(sorted((k, v) for k, v in s.items() if k not in ("fast", "slow")))
+                groups.setdefault(key, (s, []))[1].append(pos)
+        if not groups or not len(prices):
+            return
+        arrays = RSIMAArrays(prices)
+        for s, members in groups.values():
+            fasts = [self.settings[pos]["fast"] for pos in members]
+            slows = [self.settings[pos]["slow"] for pos in members]
+            signals = rsi_ma_signal_rows(arrays, s, fasts, slows)
+            min_start = s["rsi_period"]
+            if s["trend_filter"]:
+                min_start = max(min_start, s["trend_window"] - 1)
+            warmups = [max(slow - 1, min_start) for slow in slows]
+            gated = bool(s["cooldown_bars"]) or s["max_consecutive_losses"] is not None
+            block = (s, signals, warmups, None if gated else SharedWalkForward(arrays.prices, signals, warmups))
+            for row, pos in enumerate(members):
+                self._where[pos] = (len(self._blocks), row)
+            self._blocks.append(block)
+        self._prices_arr = arrays.prices
+
+    def _gated_stats(self, block, row, start, end):
+        s, signals, warmups, _ = block
+        window = signals[row, start:end].copy()
+        window[: warmups[row]] = 0
+        return _stats_with_gate(self._prices_arr[start:end], window, s["cooldown_bars"], s["max_consecutive_losses"])
+
+    def window_stats(self, start, end, positions=None):
+        if positions is None:
+            positions = range(len(self.params_list))
+        out = {}
+        shared = {}
+        for pos in positions:
+            s = self.settings[pos]
+            if end - start < max(s["slow"], s["rsi_period"] + 1):
+                out[pos] = None
+            elif pos not in self._where:
+                out[pos] = evaluate_rsi_ma_params_with_drawdown(self.prices[start:end], self.params_list[pos])
+            else:
+                block_id, row = self._where[pos]
+                block = self._blocks[block_id]
+                if block[3] is None:
+                    out[pos] = self._gated_stats(block, row, start, end)
+                else:
+                    shared.setdefault(block_id, []).append((pos, row))
+        for block_id, members in shared.items():
+            stats = self._blocks[block_id][3].window_stats(start, end, [row for _, row in members])
+            out.update(zip([pos for pos, _ in members], stats))
+        return [out[pos] for pos in positions]
+
+
+def _summarize_chunk(prices, candidates, train_size, test_size, step_size, base_params, min_trades):
+    windows = build_windows(len(prices), train_size, test_size, step_size=step_size)
+    merged = []
+    for candidate in candidates:
+        params = dict(base_params)
+        params["fast"] = candidate["fast"]
+        params["slow"] = candidate["slow"]
+        merged.append(params)
+    engine = RSIMAWalkForward(prices, merged)
+
+    test_pnls = [[] for _ in candidates]
+    test_drawdowns = [[] for _ in candidates]
+    for window in windows:
+        train_stats = engine.window_stats(window["train_start"], window["train_end"])
+        keep = [i for i, stats in enumerate(train_stats) if stats and stats["trades"] >= min_trades]
+        if not keep:
+            continue
+        test_stats = engine.window_stats(window["test_start"], window["test_end"], keep)
+        for i, stats in zip(keep, test_stats):
+            if not stats:
+                continue
+            test_pnls[i].append(float(stats["pnl"]))
+            test_drawdowns[i].append(float(stats["max_drawdown"]))
+
+    summaries = []
+    for pnls, drawdowns in zip(test_pnls, test_drawdowns):
+        summaries.append(
+            {
+                "windows_total": len(windows),
+                "windows_valid": len(pnls),
+                "windows_positive": sum(1 for value in pnls if value > 0),
+                "test_total_pnl": sum(pnls),
+                "test_avg_pnl": (sum(pnls) / len(pnls)) if pnls else 0.0,
+                "test_avg_drawdown": (sum(drawdowns) / len(drawdowns)) if drawdowns else 0.0,
+            }
+        )
+    return summaries
+
+
+def _summary_task(shared, candidates):
+    prices, train_size, test_size, step_size, base_params, min_trades = shared
+    return _summarize_chunk(shared_values(prices), candidates, train_size, test_size, step_size, base_params, min_trades)
+
+
+def evaluate_candidates_walk_forward(
     prices,
-    candidate,
+    candidates,
     train_size,
     test_size,
     step_size,
     base_params,
     min_trades=0,
+    workers=1,
+    progress=None,
+    cancel=None,
 ):
-    windows = build_windows(len(prices), train_size, test_size, step_size=step_size)
-    test_pnls = []
-    test_drawdowns = []
-    windows_valid = 0
+    # evaluate_candidate_walk_forward for many candidates in one pass over the windows;
+    # signals come from RSIMAWalkForward, so no window recomputes RSI / MA. With
+    # workers > 1 the candidates are split into chunks; progress counts finished chunks.
+    chunks = run_price_tasks(
+        _summary_task,
+        chunk_items(candidates, workers),
+        prices,
+        (train_size, test_size, step_size, base_params, min_trades),
+        workers=workers,
+        chunksize=1,
+        progress=progress,
+        cancel=cancel,
+    )
+    return [summary for chunk in chunks for summary in chunk]
 
-    merged = dict(base_params)
-    merged["fast"] = candidate["fast"]
-    merged["slow"] = candidate["slow"]
 
-    for window in windows:
-        train_prices = prices[window["train_start"]: window["train_end"]]
-        test_prices = prices[window["test_start"]: window["test_end"]]
-        train_stats = evaluate_rsi_ma_params_with_drawdown(train_prices, merged)
-        if not train_stats or train_stats["trades"] < min_trades:
-            continue
-        test_stats = evaluate_rsi_ma_params_with_drawdown(test_prices, merged)
-        if not test_stats:
-            continue
-        windows_valid += 1
-        test_pnls.append(float(test_stats["pnl"]))
-        test_drawdowns.append(float(test_stats["max_drawdown"]))
-
-    return {
-        "windows_total": len(windows),
-        "windows_valid": windows_valid,
-        "windows_positive": sum(1 for value in test_pnls if value > 0),
-        "test_total_pnl": sum(test_pnls),
-        "test_avg_pnl": (sum(test_pnls) / len(test_pnls)) if test_pnls else 0.0,
-        "test_avg_drawdown": (sum(test_drawdowns) / len(test_drawdowns)) if test_drawdowns else 0.0,
-    }
+def evaluate_candidate_walk_forward(
+    prices,
+    candidate,
+    train_size,
+    test_size,
+    step_size,
+    base_params,
+    min_trades=0,
+):
+    return evaluate_candidates_walk_forward(
+        prices,
+        [candidate],
+        train_size,
+        test_size,
+        step_size,
+        base_params,
+        min_trades=min_trades,
+    )[0]
@@ -0,0 +1,109 @@
+import math
+
+
+class RunningStats:
+    # Trade and equity statistics accumulated one trade / one equity point at a time.
+    # Sums are folded in the same order as the list-based helpers in main.py, so the
+    # results are identical to rescanning trades and the equity curve.
+    def __init__(self):
+        self.trades = 0
+        self.wins = 0
+        self.losses = 0
+        self.pnl_sum = 0.0
+        self.win_sum = 0.0
+        self.loss_sum = 0.0
+
+        self.points = 0
+        self.peak = None
+        self.max_drawdown = 0.0
+        self.last_equity = None
+
+        self.returns = 0
+        self.return_sum = 0.0
+        self.downside = 0
+        self.downside_sq_sum = 0.0
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    def restore(self, data):
+        vars(self).update(data)
+
+    def add_trade(self, pnl):
+        self.trades += 1
+        self.pnl_sum += pnl
+        if pnl > 0:
+            self.wins += 1
+            self.win_sum += pnl
+        else:
+            self.losses += 1
+            self.loss_sum += pnl
+
+    def sync_trades(self, trades):
+        # Folds in trades appended to `trades` since the last call.
+        for trade in trades[self.trades :]:
+            self.add_trade(float(trade.get("pnl", 0.0)))
+
+    def add_equity(self, equity):
+        # Returns the drawdown from the running peak at this point.
+        equity = float(equity)
+        prev = self.last_equity
+        if prev is not None and prev != 0:
+            ret = (equity - prev) / prev
+            self.returns += 1
+            self.return_sum += ret
+            if ret < 0:
+                self.downside += 1
+                self.downside_sq_sum += ret * ret
+        self.last_equity = equity
+        self.points += 1
+        if self.peak is None or equity > self.peak:
+            self.peak = equity
+        drawdown = self.peak - equity
+        if drawdown > self.max_drawdown:
+            self.max_drawdown = drawdown
+        return drawdown
+
+    @property
+    def win_rate(self):
+        return (self.wins / self.trades * 100.0) if self.trades else 0.0
+
+    @property
+    def avg_win(self):
+        return self.win_sum / self.wins if self.wins else 0
+
+    @property
+    def avg_loss(self):
+        return self.loss_sum / self.losses if self.losses else 0
+
+    @property
+    def profit_factor(self):
+        if not self.losses or self.loss_sum == 0:
+            return 0.0
+        return self.win_sum / abs(self.loss_sum)
+
+    @property
+    def expectancy(self):
+        return (self.pnl_sum / self.trades) if self.trades else 0.0
+
+    @property
+    def sortino(self):
+        if not self.returns or not self.downside:
+            return 0.0
+        downside_var = self.downside_sq_sum / self.downside
+        downside_std = math.sqrt(downside_var) if downside_var > 0 else 0.0
+        if downside_std == 0:
+            return 0.0
+        return (self.return_sum / self.returns) / downside_std
+
+    def trade_summary(self):
+        # (trades, total pnl, win rate %, avg win, avg loss, profit factor, expectancy).
+        return (
+            self.trades,
+            self.pnl_sum,
+            self.win_rate,
+            self.avg_win,
+            self.avg_loss,
+            self.profit_factor,
+            self.expectancy,
+        )
@@ -1,29 +1,139 @@
 ﻿import json
 import os
+import sqlite3
+import time
+from collections import deque
 from datetime import datetime
 
+from engine.state_db import namespace_for, write_json_atomic
+
+# Per-bar chatter that may be coalesced; every other event is written out immediately.
+LOW_PRIORITY_EVENTS = (None, "tick", "gate_block", "new_day")
+
 
 class RuntimeState:
-    def __init__(self, path="state/runtime_state.json"):
+    # In-memory runtime snapshot published to state/runtime_state.json. Low-priority
+    # updates are merged in memory and written at most every `flush_interval` seconds;
+    # the file is replaced atomically so readers never see a half-written JSON.
+    # With a StateDB a flush upserts only the keys changed since the last flush and
+    # appends the new events to the SQLite ring, all in one transaction; the JSON file
+    # is then written only when export_json is set.
+    # An optional `feed` (FeedPublisher) gets the state plus the events added since the
+    # previous flush, so a dashboard can follow the run without reading the file.
+    def __init__(
+        self,
+        path="state/runtime_state.json",
+        flush_interval=0.0,
+        max_events=200,
+        db=None,
+        export_json=True,
+        feed=None,
+    ):
         self.path = path
+        self.db = db
+        self.feed = feed
+        self.export_json = export_json or db is None
+        self.ns = namespace_for(path)
+        self.flush_interval = max(0.0, float(flush_interval or 0.0))
+        self.max_events = max(0, int(max_events))
+        self._state = None
+        self._events = deque(maxlen=self.max_events or None)
+        self._seq = 0
+        self._dirty = False
+        self._last_flush = None
+        self._dirty_keys = set()
+        self._pending_events = []
+        self._reset_db = False
         os.makedirs(os.path.dirname(path), exist_ok=True)
 
+    def _read_file(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                old = json.load(f)
+            return old if isinstance(old, dict) else {}
+        except Exception:
+            return {}
+
+    def _read_db(self):
+        state = self.db.load(self.ns)
+        state.pop("recent_events", None)
+        return state
+
     def update(self, data: dict, replace=False):
-        payload = {}
-        if not replace and os.path.exists(self.path):
-            try:
-                with open(self.path, "r", encoding="utf-8") as f:
-                    old = json.load(f)
-                    if isinstance(old, dict):
-                        payload.update(old)
-            except Exception:
-                pass
-        payload.update(dict(data))
-        payload["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
+        if replace or self._state is None:
+            if replace:
+                self._state = {}
+            else:
+                self._state = self._read_db() if self.db is not None else self._read_file()
+            self._state.pop("recent_events", None)
+            # A new run restarts the event sequence: the in-memory ring, the seq counter
+            # and (on the next flush) the SQLite ring all start over.
+            self._events.clear()
+            self._seq = 0
+            self._reset_db = True
+            self._dirty_keys = set(self._state)
+            self._pending_events = []
+        data = dict(data)
+        self._state.update(data)
+        self._state["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._dirty_keys.update(data)
+        self._dirty_keys.add("updated_at")
+        event = data.get("event")
+        if event is not None and event != "tick" and self.max_events:
+            self._seq += 1
+            item = dict(data, seq=self._seq, updated_at=self._state["updated_at"])
+            self._events.append(item)
+            self._pending_events.append(item)
+            if len(self._pending_events) > self.max_events:
+                del self._pending_events[0]
+        self._dirty = True
+        now = time.monotonic()
+        if (
+            event not in LOW_PRIORITY_EVENTS
+            or self._last_flush is None
+            or now - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def _flush_db(self):
+        with self.db.transaction():
+            self.db.upsert(self.ns, {k: self._state[k] for k in self._dirty_keys}, replace=self._reset_db)
+            if self._reset_db:
+                self.db.clear_events(self.ns)
+            self.db.append_events(self.ns, self._pending_events, keep=self.max_events)
+        self._dirty_keys = set()
+        self._reset_db = False
+
+    def flush(self):
+        if not self._dirty or self._state is None:
+            return
+        try:
+            if self.db is not None and (self._dirty_keys or self._reset_db):
+                self._flush_db()
+            if self.export_json:
+                payload = dict(self._state)
+                payload["recent_events"] = list(self._events)
+                write_json_atomic(self.path, payload)
+        except (OSError, sqlite3.Error):
+            # e.g. a reader holding the file open on Windows or a busy database; retry on
+            # the next flush.
+            return
+        if self.feed is not None:
+            self.feed.publish(dict(self._state, recent_events=list(self._pending_events)))
+        self._pending_events = []
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+    def recent_events(self):
+        return list(self._events)
 
     def load(self):
+        if self._state is not None:
+            return dict(self._state, recent_events=list(self._events))
+        if self.db is not None:
+            return dict(self._read_db(), recent_events=self.db.events(self.ns))
         if not os.path.exists(self.path):
             return {}
         with open(self.path, "r", encoding="utf-8") as f:
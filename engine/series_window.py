@@ -0,0 +1,55 @@
+from collections.abc import Sequence
+from itertools import islice
+
+
+class SeriesWindow(Sequence):
+    # Read-only prefix view over a list: behaves like data[:end] without copying.
+    __slots__ = ("_data", "_end")
+
+    def __init__(self, data, end=None):
+        self._data = data
+        self._end = len(data) if end is None else max(0, min(int(end), len(data)))
+
+    @property
+    def source(self):
+        # The list being viewed; windows over the same growing list share it.
+        return self._data
+
+    def __len__(self):
+        return self._end
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._end)
+            return self._data[start:stop:step]
+        if index < 0:
+            index += self._end
+        if index < 0 or index >= self._end:
+            raise IndexError("SeriesWindow index out of range")
+        return self._data[index]
+
+    def __iter__(self):
+        return islice(self._data, self._end)
+
+    def __repr__(self):
+        return f"SeriesWindow(len={self._end})"
+
+
+class CloseBuffer:
+    # Growing close-price history shared by the backtest and sim_live bar loops.
+    def __init__(self):
+        self.closes = []
+
+    def __len__(self):
+        return len(self.closes)
+
+    def sync(self, bars, start_idx):
+        # Rebuild when the caller's bar list does not continue the buffered history.
+        if len(self.closes) != start_idx or (start_idx and self.closes[-1] != bars[start_idx - 1]["close"]):
+            self.closes = [b["close"] for b in bars[:start_idx]]
+
+    def append(self, price):
+        self.closes.append(price)
+
+    def window(self, end=None):
+        return SeriesWindow(self.closes, end)
@@ -0,0 +1,77 @@
+import json
+import os
+
+SNAPSHOT_VERSION = 2
+
+
+class SessionStore:
+    # Crash-safe persistence for a long-running paper session:
+    # - snapshot.json: plain-data session state (counters, position, risk / strategy
+    #   state), replaced atomically (tmp + os.replace). Trades and the equity curve
+    #   are not in it; the session rebuilds them from its output CSVs;
+    # - journal.jsonl: one small append-only line per checkpoint since the last
+    #   snapshot. Saving a snapshot starts the journal over.
+    # Every snapshot and journal entry carries a sequence number, so journal lines
+    # that a snapshot already covers are simply ignored on load.
+    def __init__(self, folder="state/sim_live"):
+        self.folder = folder
+        self.snapshot_path = os.path.join(folder, "snapshot.json")
+        self.journal_path = os.path.join(folder, "journal.jsonl")
+
+    def save_snapshot(self, state):
+        os.makedirs(self.folder, exist_ok=True)
+        tmp = f"{self.snapshot_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(dict(state, version=SNAPSHOT_VERSION), f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        # The snapshot now covers every journal line; start the journal over.
+        with open(self.journal_path, "w", encoding="utf-8"):
+            pass
+
+    def append_journal(self, entry):
+        os.makedirs(self.folder, exist_ok=True)
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def load_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return None
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except Exception:
+            return None
+        if not isinstance(state, dict) or state.get("version") != SNAPSHOT_VERSION:
+            return None
+        return state
+
+    def load_journal(self, after_seq=0):
+        entries = []
+        if not os.path.exists(self.journal_path):
+            return entries
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn last line from a crash mid-write.
+                    break
+                if int(entry.get("seq", 0)) > after_seq:
+                    entries.append(entry)
+        return entries
+
+    def load(self):
+        # Returns (snapshot or None, journal entries written after that snapshot).
+        snapshot = self.load_snapshot()
+        if snapshot is None:
+            return None, []
+        return snapshot, self.load_journal(after_seq=int(snapshot.get("seq", 0)))
+
+    def clear(self):
+        for path in (self.snapshot_path, self.journal_path):
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,254 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    ns TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (ns, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS events (
+    ns TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (ns, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS param_versions (
+    version_id TEXT PRIMARY KEY,
+    symbol TEXT,
+    source TEXT,
+    params TEXT NOT NULL,
+    metrics TEXT NOT NULL,
+    note TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_param_versions_symbol_created ON param_versions (symbol, created_at);
+CREATE INDEX IF NOT EXISTS idx_param_versions_created ON param_versions (created_at);
+"""
+
+_VERSION_COLUMNS = ("version_id", "symbol", "source", "params", "metrics", "note", "created_at")
+
+_open_dbs = {}
+_open_lock = threading.Lock()
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False)
+
+
+def namespace_for(path):
+    # "state/ctp_state.json" -> "ctp_state"; the JSON file name doubles as the key space.
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def write_json_atomic(path, payload):
+    # tmp + os.replace, so a reader sees either the old or the new file, never half of one.
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def read_json(path, default=None):
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, "r", encoding="utf-8-sig") as f:
+            return json.load(f)
+    except Exception:
+        return default
+
+
+class StateDB:
+    # SQLite state backend (stdlib sqlite3, WAL journal) shared by StateStore,
+    # StrategyState, RuntimeState and ParamVersionStore:
+    # - kv: one row per (namespace, top-level key); updates upsert only the given keys;
+    # - events: the runtime event ring, keyed by (namespace, seq);
+    # - param_versions: version history indexed by (symbol, created_at).
+    # WAL lets the dashboard read while a runner writes, and a reader only ever sees
+    # committed transactions. Writes nest: an outer transaction() groups every write
+    # inside it into one commit.
+    def __init__(self, path="state/state.db", timeout=5.0):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.RLock()
+        self._depth = 0
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield self
+                finally:
+                    self._depth -= 1
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._depth = 1
+            try:
+                yield self
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._conn.execute("COMMIT")
+            finally:
+                self._depth = 0
+
+    def _query(self, sql, args=()):
+        with self._lock:
+            return self._conn.execute(sql, args).fetchall()
+
+    def data_version(self):
+        # Changes whenever another connection commits; a cheap "anything new?" check.
+        return self._query("PRAGMA data_version")[0][0]
+
+    # --- key/value namespaces -------------------------------------------------------
+
+    def load(self, ns):
+        return {key: json.loads(value) for key, value in self._query("SELECT key, value FROM kv WHERE ns = ?", (ns,))}
+
+    def get(self, ns, key, default=None):
+        rows = self._query("SELECT value FROM kv WHERE ns = ? AND key = ?", (ns, key))
+        return json.loads(rows[0][0]) if rows else default
+
+    def has(self, ns):
+        return bool(self._query("SELECT 1 FROM kv WHERE ns = ? LIMIT 1", (ns,)))
+
+    def upsert(self, ns, fields, replace=False):
+        rows = [(ns, str(key), _dumps(value)) for key, value in fields.items()]
+        with self.transaction():
+            if replace:
+                self._conn.execute("DELETE FROM kv WHERE ns = ?", (ns,))
+            self._conn.executemany(
+                "INSERT INTO kv (ns, key, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (ns, key) DO UPDATE SET value = excluded.value",
+                rows,
+            )
+
+    def update_many(self, changes):
+        # {namespace: fields} written in a single transaction.
+        with self.transaction():
+            for ns, fields in changes.items():
+                self.upsert(ns, fields)
+
+    def delete(self, ns, keys=None):
+        with self.transaction():
+            if keys is None:
+                self._conn.execute("DELETE FROM kv WHERE ns = ?", (ns,))
+            else:
+                self._conn.executemany("DELETE FROM kv WHERE ns = ? AND key = ?", [(ns, str(k)) for k in keys])
+
+    # --- event ring -----------------------------------------------------------------
+
+    def append_events(self, ns, events, keep=0):
+        # Events carry their own "seq"; rows older than the newest `keep` are pruned.
+        if not events:
+            return
+        with self.transaction():
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO events (ns, seq, payload) VALUES (?, ?, ?)",
+                [(ns, int(e["seq"]), _dumps(e)) for e in events],
+            )
+            if keep:
+                last = max(int(e["seq"]) for e in events)
+                self._conn.execute("DELETE FROM events WHERE ns = ? AND seq <= ?", (ns, last - keep))
+
+    def clear_events(self, ns):
+        with self.transaction():
+            self._conn.execute("DELETE FROM events WHERE ns = ?", (ns,))
+
+    def events(self, ns, after_seq=0):
+        rows = self._query("SELECT payload FROM events WHERE ns = ? AND seq > ? ORDER BY seq", (ns, int(after_seq)))
+        return [json.loads(payload) for (payload,) in rows]
+
+    # --- parameter versions ---------------------------------------------------------
+
+    def insert_versions(self, versions):
+        rows = [
+            (
+                v["version_id"],
+                v.get("symbol"),
+                v.get("source"),
+                _dumps(v.get("params")),
+                _dumps(v.get("metrics") or {}),
+                v.get("note", ""),
+                v.get("created_at", ""),
+            )
+            for v in versions
+        ]
+        with self.transaction():
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO param_versions ({', '.join(_VERSION_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def _versions(self, where="", args=(), order="rowid", limit=None):
+        sql = f"SELECT {', '.join(_VERSION_COLUMNS)} FROM param_versions {where} ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args = tuple(args) + (int(limit),)
+        out = []
+        for row in self._query(sql, args):
+            item = dict(zip(_VERSION_COLUMNS, row))
+            item["params"] = json.loads(item["params"])
+            item["metrics"] = json.loads(item["metrics"])
+            out.append(item)
+        return out
+
+    def get_version(self, version_id):
+        rows = self._versions("WHERE version_id = ?", (version_id,))
+        return rows[0] if rows else None
+
+    def list_versions(self, symbol=None, limit=20):
+        # Newest first; equal timestamps keep insertion order, like the JSON store.
+        if symbol:
+            return self._versions("WHERE symbol = ?", (symbol,), "created_at DESC, rowid", limit)
+        return self._versions("", (), "created_at DESC, rowid", limit)
+
+    def all_versions(self):
+        return self._versions()
+
+    def count_versions(self):
+        return self._query("SELECT COUNT(*) FROM param_versions")[0][0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+        with _open_lock:
+            if _open_dbs.get(os.path.abspath(self.path)) is self:
+                del _open_dbs[os.path.abspath(self.path)]
+
+
+def open_state_db(path="state/state.db"):
+    # One connection per database file and process, shared by every store using it.
+    key = os.path.abspath(path)
+    with _open_lock:
+        db = _open_dbs.get(key)
+        if db is None:
+            db = _open_dbs[key] = StateDB(path)
+        return db
+
+
+def state_options(cfg):
+    # Keyword arguments for the state classes from cfg["state"]:
+    # backend "json" (default) keeps the JSON files; "sqlite" stores into db_path and
+    # writes the JSON files as well only when export_json is true.
+    state = (cfg or {}).get("state", {}) or {}
+    if state.get("backend", "json") != "sqlite":
+        return {"db": None, "export_json": True}
+    return {
+        "db": open_state_db(state.get("db_path", "state/state.db")),
+        "export_json": bool(state.get("export_json", False)),
+    }
@@ -2,21 +2,40 @@
 import os
 from datetime import datetime
 
+from engine.state_db import namespace_for, read_json, write_json_atomic
+
 
 class StateStore:
-    def __init__(self, path):
+    # Key/value state (e.g. state/ctp_state.json). With a StateDB the keys live in
+    # SQLite and update() upserts only the given fields in one transaction; the JSON
+    # file is then written only when export_json is set.
+    def __init__(self, path, db=None, export_json=True):
         self.path = path
+        self.db = db
+        self.export_json = export_json or db is None
+        self.ns = namespace_for(path)
         os.makedirs(os.path.dirname(path), exist_ok=True)
+        if db is not None and not db.has(self.ns):
+            old = read_json(path)
+            if isinstance(old, dict) and old:
+                db.upsert(self.ns, old)
 
     def load(self):
+        if self.db is not None:
+            return self.db.load(self.ns)
         if not os.path.exists(self.path):
             return {}
         with open(self.path, "r", encoding="utf-8") as f:
             return json.load(f)
 
     def update(self, fields: dict):
+        fields = dict(fields)
+        fields["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if self.db is not None:
+            self.db.upsert(self.ns, fields)
+            if self.export_json:
+                write_json_atomic(self.path, self.db.load(self.ns))
+            return
         state = self.load()
         state.update(fields)
-        state["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(state, f, ensure_ascii=False, indent=2)
+        write_json_atomic(self.path, state)
@@ -1,5 +1,7 @@
 ﻿from typing import List
 
+from engine.indicators import MAIndicators, compare_prices, meets_min_diff
+
 
 def _calc_rsi(prices: List[float], period: int):
     if len(prices) < period + 1:
@@ -41,45 +43,61 @@ class Strategy:
         self._cooldown_until = -1
         self._loss_streak = 0
         self._disabled = False
+        self._indicators = None
+
+    def _sync_indicators(self, prices):
+        if self._indicators is None:
+            self._indicators = MAIndicators(self.fast, self.slow, self.trend_window)
+        self._indicators.sync(prices)
+        return self._indicators
+
+    def on_bar(self, close):
+        if self._indicators is None:
+            self._indicators = MAIndicators(self.fast, self.slow, self.trend_window)
+        self._indicators.on_bar(close)
+
+    def is_paused(self, step=None):
+        # Loss-streak / cooldown gate: the only part of generate_signal that depends on
+        # trade results rather than on prices.
+        return self._disabled or (step is not None and step <= self._cooldown_until)
 
     def generate_signal(self, prices, step=None):
-        if self._disabled:
-            return 0
-        if step is not None and step <= self._cooldown_until:
+        if self.is_paused(step):
             return 0
         if len(prices) < self.slow:
             return 0
         if self.trend_filter and len(prices) < self.trend_window:
             return 0
 
-        fast_ma = sum(prices[-self.fast:]) / self.fast
-        slow_ma = sum(prices[-self.slow:]) / self.slow
-        diff = fast_ma - slow_ma
+        ind = self._sync_indicators(prices)
+        fast_ma = ind.fast.value
+        slow_ma = ind.slow.value
+        # Ties are decided by compare_prices, as in the grid / walk-forward evaluators.
+        cross = compare_prices(fast_ma, slow_ma)
 
         trend_dir = 0
         if self.trend_filter:
-            trend_ma = sum(prices[-self.trend_window:]) / self.trend_window
-            trend_dir = 1 if prices[-1] > trend_ma else -1 if prices[-1] < trend_ma else 0
+            trend_dir = compare_prices(ind.last, ind.trend.value)
 
-        if abs(diff) < self.min_diff:
+        if not meets_min_diff(fast_ma, slow_ma, self.min_diff):
             return 0
 
         if self.mode == "trend":
-            if fast_ma > slow_ma:
+            if cross == 1:
                 if self.trend_filter and trend_dir != 1:
                     return 0
                 return 1
-            if fast_ma < slow_ma:
+            if cross == -1:
                 if self.trend_filter and trend_dir != -1:
                     return 0
                 return -1
             return 0
 
-        if fast_ma > slow_ma:
+        if cross == 1:
             if self.trend_filter and trend_dir != -1:
                 return 0
             return -1
-        if fast_ma < slow_ma:
+        if cross == -1:
             if self.trend_filter and trend_dir != 1:
                 return 0
             return 1
@@ -109,6 +127,8 @@ class Strategy:
             self.trend_filter = trend_filter
         if trend_window is not None:
             self.trend_window = trend_window
+        if fast is not None or slow is not None or trend_window is not None:
+            self._indicators = None
 
     def on_trade_close(self, pnl, step):
         if pnl < 0:
@@ -125,6 +145,14 @@ class Strategy:
         self._disabled = False
         self._cooldown_until = -1
 
+    def to_dict(self):
+        # Parameters and loss-streak state; indicators are rebuilt from the closes.
+        return {name: value for name, value in vars(self).items() if name != "_indicators"}
+
+    def restore(self, data):
+        vars(self).update(data)
+        self._indicators = None
+
 
 class StrategyComposite:
     def __init__(self, members, weights=None, threshold=0.0):
@@ -146,6 +174,11 @@ class StrategyComposite:
         for member in self.members:
             member.set_params(**kwargs)
 
+    def on_bar(self, close):
+        for member in self.members:
+            if hasattr(member, "on_bar"):
+                member.on_bar(close)
+
     def on_trade_close(self, pnl, step):
         for member in self.members:
             member.on_trade_close(pnl, step)
@@ -154,6 +187,15 @@ class StrategyComposite:
         for member in self.members:
             member.on_new_day()
 
+    def to_dict(self):
+        return {"members": [member.to_dict() for member in self.members], "weights": self.weights, "threshold": self.threshold}
+
+    def restore(self, data):
+        for member, state in zip(self.members, data["members"]):
+            member.restore(state)
+        self.weights = data["weights"]
+        self.threshold = data["threshold"]
+
 
 class RSIMAStrategy:
     def __init__(
@@ -183,36 +225,55 @@ class RSIMAStrategy:
         self._cooldown_until = -1
         self._loss_streak = 0
         self._disabled = False
+        self._indicators = None
+
+    def _build_indicators(self):
+        return MAIndicators(self.fast, self.slow, self.trend_window, rsi_period=self.rsi_period)
+
+    def _sync_indicators(self, prices):
+        if self._indicators is None:
+            self._indicators = self._build_indicators()
+        self._indicators.sync(prices)
+        return self._indicators
+
+    def on_bar(self, close):
+        if self._indicators is None:
+            self._indicators = self._build_indicators()
+        self._indicators.on_bar(close)
+
+    def is_paused(self, step=None):
+        # Loss-streak / cooldown gate: the only part of generate_signal that depends on
+        # trade results rather than on prices.
+        return self._disabled or (step is not None and step <= self._cooldown_until)
 
     def generate_signal(self, prices, step=None):
-        if self._disabled:
-            return 0
-        if step is not None and step <= self._cooldown_until:
+        if self.is_paused(step):
             return 0
         if len(prices) < max(self.slow, self.rsi_period + 1):
             return 0
         if self.trend_filter and len(prices) < self.trend_window:
             return 0
 
-        rsi = _calc_rsi(prices, self.rsi_period)
-        if rsi is None:
+        ind = self._sync_indicators(prices)
+        if not ind.rsi.ready:
             return 0
 
-        fast_ma = sum(prices[-self.fast:]) / self.fast
-        slow_ma = sum(prices[-self.slow:]) / self.slow
-        diff = fast_ma - slow_ma
-        if abs(diff) < self.min_diff:
+        fast_ma = ind.fast.value
+        slow_ma = ind.slow.value
+        if not meets_min_diff(fast_ma, slow_ma, self.min_diff):
             return 0
+        cross = compare_prices(fast_ma, slow_ma)
 
         trend_dir = 0
         if self.trend_filter:
-            trend_ma = sum(prices[-self.trend_window:]) / self.trend_window
-            trend_dir = 1 if prices[-1] > trend_ma else -1 if prices[-1] < trend_ma else 0
+            trend_dir = compare_prices(ind.last, ind.trend.value)
 
+        # RSI thresholds are compared on the gain / loss sums (RSI.compare), so a
+        # reading exactly on a level does not depend on rounding.
         signal = 0
-        if rsi <= self.rsi_oversold and fast_ma > slow_ma:
+        if cross == 1 and ind.rsi.compare(self.rsi_oversold, ind.last) <= 0:
             signal = 1
-        elif rsi >= self.rsi_overbought and fast_ma < slow_ma:
+        elif cross == -1 and ind.rsi.compare(self.rsi_overbought, ind.last) >= 0:
             signal = -1
 
         if self.trend_filter and signal != 0:
@@ -253,6 +314,8 @@ class RSIMAStrategy:
             self.trend_filter = trend_filter
         if trend_window is not None:
             self.trend_window = trend_window
+        if fast is not None or slow is not None or rsi_period is not None or trend_window is not None:
+            self._indicators = None
 
     def on_trade_close(self, pnl, step):
         if pnl < 0:
@@ -268,3 +331,11 @@ class RSIMAStrategy:
         self._loss_streak = 0
         self._disabled = False
         self._cooldown_until = -1
+
+    def to_dict(self):
+        # Parameters and loss-streak state; indicators are rebuilt from the closes.
+        return {name: value for name, value in vars(self).items() if name != "_indicators"}
+
+    def restore(self, data):
+        vars(self).update(data)
+        self._indicators = None
@@ -2,13 +2,24 @@
 import os
 from datetime import datetime
 
+from engine.state_db import namespace_for, read_json, write_json_atomic
+
 
 class StrategyState:
-    def __init__(self, path="state/strategy_state.json"):
+    def __init__(self, path="state/strategy_state.json", db=None, export_json=True):
         self.path = path
+        self.db = db
+        self.export_json = export_json or db is None
+        self.ns = namespace_for(path)
         os.makedirs(os.path.dirname(path), exist_ok=True)
+        if db is not None and not db.has(self.ns):
+            old = read_json(path)
+            if isinstance(old, dict) and old:
+                db.upsert(self.ns, old)
 
     def load(self):
+        if self.db is not None:
+            return self.db.load(self.ns)
         if not os.path.exists(self.path):
             return {}
         with open(self.path, "r", encoding="utf-8") as f:
@@ -16,5 +27,7 @@ class StrategyState:
 
     def save_params(self, params: dict):
         payload = {"params": params, "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-        with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
+        if self.db is not None:
+            self.db.upsert(self.ns, payload, replace=True)
+        if self.export_json:
+            write_json_atomic(self.path, payload)
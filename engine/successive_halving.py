@@ -0,0 +1,117 @@
+import math
+
+from engine.parallel_eval import evaluate_candidates
+
+# Shortest data prefix a rung is allowed to score candidates on.
+MIN_RUNG_BARS = 240
+
+SEARCH_MODES = ("grid", "halving")
+
+
+def score_stats(stats, dd_penalty):
+    return float(stats["pnl"]) - float(dd_penalty) * float(stats["max_drawdown"])
+
+
+def plan_rungs(total_bars, candidate_count, eta=3, keep=1, min_bars=MIN_RUNG_BARS):
+    # [(bars, candidates)] per rung. Each rung keeps 1/eta of the candidates (never
+    # fewer than `keep`) and gives them eta times more bars; the last rung is the full
+    # series. The first rung is never shorter than min_bars, which caps the rung count.
+    eta = max(2, int(eta))
+    keep = max(1, int(keep))
+    sizes = [candidate_count]
+    while sizes[-1] > keep:
+        sizes.append(max(keep, math.ceil(sizes[-1] / eta)))
+    max_rungs = 1
+    while total_bars / eta ** max_rungs >= min_bars:
+        max_rungs += 1
+    sizes = sizes[:max_rungs]
+    last = len(sizes) - 1
+    return [(math.ceil(total_bars / eta ** (last - r)), size) for r, size in enumerate(sizes)]
+
+
+def successive_halving(
+    config,
+    bars,
+    candidates,
+    dd_penalty=0.4,
+    min_trades=0,
+    eta=3,
+    keep=1,
+    min_bars=MIN_RUNG_BARS,
+    workers=1,
+    cache=None,
+):
+    # Budgeted replacement for evaluating every candidate on all bars: candidates are
+    # scored on growing prefixes of `bars` and the bottom (1 - 1/eta) is dropped at
+    # each rung. Returns ([(candidate, stats on all bars)] for the finalists, in
+    # candidate order, info) where info records the rungs and the compute spent.
+    total = len(bars)
+    rungs = plan_rungs(total, len(candidates), eta=eta, keep=keep, min_bars=min_bars)
+    alive = list(range(len(candidates)))
+    spent = 0
+    rung_info = []
+    stats = []
+    for r, (rung_bars, _) in enumerate(rungs):
+        if r:
+            # Rank on the previous rung: candidates short of the trade floor (scaled to
+            # the prefix length) go last, then by score; ties keep candidate order.
+            floor = min_trades * rungs[r - 1][0] / total if total else 0
+            order = sorted(
+                range(len(alive)),
+                key=lambda i: (stats[i]["trades"] < floor, -score_stats(stats[i], dd_penalty), i),
+            )
+            alive = sorted(alive[i] for i in order[: rungs[r][1]])
+        stats = evaluate_candidates(
+            config, bars[:rung_bars], [candidates[i] for i in alive], workers=workers, cache=cache
+        )
+        spent += rung_bars * len(alive)
+        rung_info.append({"bars": rung_bars, "candidates": len(alive)})
+
+    full = total * len(candidates)
+    info = {
+        "mode": "halving",
+        "eta": max(2, int(eta)),
+        "rungs": rung_info,
+        "bar_evaluations": spent,
+        "full_grid_bar_evaluations": full,
+        "saved_ratio": (1.0 - spent / full) if full else 0.0,
+    }
+    return [(candidates[i], s) for i, s in zip(alive, stats)], info
+
+
+def run_search(
+    config, bars, candidates, search="grid", dd_penalty=0.4, min_trades=0, eta=3, keep=1, workers=1, cache=None
+):
+    # [(candidate, stats on all bars)] plus search info; "grid" evaluates every candidate.
+    if search == "halving":
+        return successive_halving(
+            config,
+            bars,
+            candidates,
+            dd_penalty=dd_penalty,
+            min_trades=min_trades,
+            eta=eta,
+            keep=keep,
+            workers=workers,
+            cache=cache,
+        )
+    if search != "grid":
+        raise ValueError(f"Unknown search mode: {search}")
+    results = evaluate_candidates(config, bars, candidates, workers=workers, cache=cache)
+    full = len(bars) * len(candidates)
+    info = {
+        "mode": "grid",
+        "rungs": [{"bars": len(bars), "candidates": len(candidates)}],
+        "bar_evaluations": full,
+        "full_grid_bar_evaluations": full,
+        "saved_ratio": 0.0,
+    }
+    return list(zip(candidates, results)), info
+
+
+def describe_search(info):
+    return (
+        f"search={info['mode']} rungs={[(r['bars'], r['candidates']) for r in info['rungs']]} "
+        f"bar_evaluations={info['bar_evaluations']}/{info['full_grid_bar_evaluations']} "
+        f"saved={info['saved_ratio']:.1%}"
+    )
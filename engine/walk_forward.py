@@ -1,4 +1,15 @@
-from engine.param_optimizer import evaluate_params_with_drawdown, pick_best_params_scored
+import numpy as np
+
+from engine.indicators import compare_price_arrays
+from engine.param_optimizer import (
+    _ma_table,
+    evaluate_params_with_drawdown,
+    pick_scored_index,
+)
+from engine.parallel_eval import SharedArray, resolve_workers, run_tasks
+
+# Walk-forward engine built in this process from the current task payload (see _engine_for).
+_ENGINE = None
 
 
 def build_windows(total_size, train_size, test_size, step_size=None):
@@ -30,84 +41,295 @@ def build_windows(total_size, train_size, test_size, step_size=None):
     return windows
 
 
-def run_walk_forward(
+class SharedWalkForward:
+    # Window stats for many candidates from signal rows computed once over the full
+    # series. A slice evaluated from scratch produces the same signals as the full
+    # series from `start + warmups[row]` on (once its indicators have enough history),
+    # so a window only slices the signal matrix; positions and trades for all rows
+    # then come out of a few array operations.
+    def __init__(self, prices, signals, warmups):
+        self.prices = np.asarray(prices, dtype=float)
+        self.signals = signals
+        self.warmups = np.asarray(warmups, dtype=np.int64)
+
+    def window_stats(self, start, end, rows=None):
+        # Same result as _stats_from_positions on the slice for each row: enter on the
+        # first signal, reverse on each opposite one, close on the last bar.
+        rows = np.arange(len(self.signals)) if rows is None else np.asarray(rows, dtype=np.int64)
+        width = end - start
+        if not len(rows) or width <= 0:
+            return [{"pnl": 0.0, "max_drawdown": 0.0, "trades": 0} for _ in rows]
+        signals = self.signals[rows, start:end].copy()
+        cols = np.arange(width)
+        signals[cols[None, :] < self.warmups[rows][:, None]] = 0
+        last_idx = np.where(signals != 0, cols.astype(np.int32), np.int32(0))
+        np.maximum.accumulate(last_idx, axis=1, out=last_idx)
+        positions = np.take_along_axis(signals, last_idx, axis=1)
+
+        changed = np.empty(positions.shape, dtype=bool)
+        changed[:, 0] = positions[:, 0] != 0
+        changed[:, 1:] = positions[:, 1:] != positions[:, :-1]
+        trades = changed.sum(axis=1)
+        out = [{"pnl": 0.0, "max_drawdown": 0.0, "trades": 0} for _ in rows]
+        if not trades.any():
+            return out
+
+        # Trade k of a row enters at its k-th change and exits at the next one (or the
+        # last bar); padding slots repeat the last bar and add 0 to the equity.
+        hit_row, hit_col = np.nonzero(changed)
+        row_start = np.concatenate(([0], np.cumsum(trades)[:-1]))
+        rank = np.arange(len(hit_row)) - row_start[hit_row]
+        entries = np.full((len(rows), int(trades.max()) + 1), width - 1)
+        entries[hit_row, rank] = hit_col
+        exits = entries[:, 1:]
+        entries = entries[:, :-1]
+        dirs = np.take_along_axis(positions, entries, axis=1)
+        prices = self.prices[start:end]
+        trade_pnl = (prices[exits] - prices[entries]) * dirs
+        equity = np.cumsum(trade_pnl, axis=1)
+        peak = np.maximum.accumulate(np.maximum(equity, 0.0), axis=1)
+        drawdown = np.maximum(np.max(peak - equity, axis=1), 0.0)
+        for i in np.flatnonzero(trades):
+            out[i] = {"pnl": float(equity[i, -1]), "max_drawdown": float(drawdown[i]), "trades": int(trades[i])}
+        return out
+
+
+class MAWalkForward:
+    # evaluate_params_with_drawdown(prices[start:end], fast, slow) for every candidate
+    # and window, with the moving averages computed once for the whole series.
+    def __init__(self, prices, candidates):
+        self.prices = prices
+        self.candidates = candidates
+        self._row = {}
+        shared = []
+        for pos, c in enumerate(candidates):
+            fast, slow = int(c["fast"]), int(c["slow"])
+            if 1 <= fast <= slow:
+                # Other pairs slice before the window start; they keep the scalar path.
+                self._row[pos] = len(shared)
+                shared.append((fast, slow))
+        self._shared = None
+        if shared and len(prices):
+            prices_arr = np.asarray(prices, dtype=float)
+            windows = sorted({w for pair in shared for w in pair})
+            row_of = {w: i for i, w in enumerate(windows)}
+            table = _ma_table(prices_arr, windows)
+            # Same tie rule as evaluate_params_with_drawdown, so a signal does not depend
+            # on whether its averages came from the full series or from a slice.
+            signals = compare_price_arrays(
+                table[[row_of[f] for f, _ in shared]], table[[row_of[s] for _, s in shared]]
+            )
+            for row, (_, slow) in enumerate(shared):
+                signals[row, :slow] = 0
+            self._shared = SharedWalkForward(prices_arr, signals, [slow for _, slow in shared])
+
+    def window_stats(self, start, end, positions=None):
+        if positions is None:
+            positions = range(len(self.candidates))
+        out = {}
+        shared = []
+        for pos in positions:
+            c = self.candidates[pos]
+            if end - start < int(c["slow"]) + 2:
+                out[pos] = None
+            elif pos in self._row:
+                shared.append(pos)
+            else:
+                out[pos] = evaluate_params_with_drawdown(self.prices[start:end], int(c["fast"]), int(c["slow"]))
+        if shared:
+            stats = self._shared.window_stats(start, end, [self._row[pos] for pos in shared])
+            out.update(zip(shared, stats))
+        return [out[pos] for pos in positions]
+
+
+def _summarize_test_stats(total_windows, test_stats):
+    test_pnls = [float(stats["pnl"]) for stats in test_stats]
+    test_drawdowns = [float(stats["max_drawdown"]) for stats in test_stats]
+    return {
+        "windows_total": total_windows,
+        "windows_valid": len(test_stats),
+        "windows_positive": sum(1 for value in test_pnls if value > 0),
+        "test_total_pnl": sum(test_pnls),
+        "test_avg_pnl": (sum(test_pnls) / len(test_pnls)) if test_pnls else 0.0,
+        "test_avg_drawdown": (sum(test_drawdowns) / len(test_drawdowns)) if test_drawdowns else 0.0,
+    }
+
+
+def shared_values(prices):
+    # Task payloads carry prices either as-is (serial) or as a SharedArray (pool workers).
+    return prices.array if isinstance(prices, SharedArray) else prices
+
+
+def chunk_items(items, workers):
+    # About four chunks per worker, so a slow chunk does not hold up the whole pool.
+    items = list(items)
+    workers = resolve_workers(workers)
+    if workers <= 1 or len(items) <= 1:
+        return [items] if items else []
+    size = max(1, -(-len(items) // (workers * 4)))
+    return [items[i: i + size] for i in range(0, len(items), size)]
+
+
+def run_price_tasks(func, items, prices, payload=(), workers=1, chunksize=None, progress=None, cancel=None):
+    # run_tasks with `(prices,) + payload` as the shared payload. With more than one
+    # worker the prices go through shared memory, so every worker maps one copy of the
+    # series instead of unpickling its own.
+    global _ENGINE
+    items = list(items)
+    if resolve_workers(workers) <= 1 or len(items) <= 1:
+        try:
+            return run_tasks(func, items, shared=(prices,) + tuple(payload), workers=1, progress=progress, cancel=cancel)
+        finally:
+            _ENGINE = None
+    with SharedArray(prices) as shared_prices:
+        return run_tasks(
+            func,
+            items,
+            shared=(shared_prices,) + tuple(payload),
+            workers=workers,
+            chunksize=chunksize,
+            progress=progress,
+            cancel=cancel,
+        )
+
+
+def _summarize_chunk(prices, candidates, train_size, test_size, step_size, min_trades):
+    windows = build_windows(len(prices), train_size, test_size, step_size=step_size)
+    engine = MAWalkForward(prices, candidates)
+    valid = [[] for _ in candidates]
+    for window in windows:
+        train_stats = engine.window_stats(window["train_start"], window["train_end"])
+        keep = [pos for pos, stats in enumerate(train_stats) if stats is not None and stats["trades"] >= min_trades]
+        if not keep:
+            continue
+        for pos, stats in zip(keep, engine.window_stats(window["test_start"], window["test_end"], keep)):
+            valid[pos].append(stats or {"pnl": 0.0, "max_drawdown": 0.0, "trades": 0})
+    return [_summarize_test_stats(len(windows), test_stats) for test_stats in valid]
+
+
+def _summary_task(shared, candidates):
+    prices, train_size, test_size, step_size, min_trades = shared
+    return _summarize_chunk(shared_values(prices), candidates, train_size, test_size, step_size, min_trades)
+
+
+def summarize_candidates_walk_forward(
     prices,
     candidates,
     train_size,
     test_size,
     step_size=None,
-    objective="pnl",
-    dd_penalty=0.0,
     min_trades=0,
+    workers=1,
+    progress=None,
+    cancel=None,
 ):
-    windows = build_windows(len(prices), train_size, test_size, step_size=step_size)
-    rows = []
-    for idx, window in enumerate(windows, start=1):
-        train_prices = prices[window["train_start"]: window["train_end"]]
-        test_prices = prices[window["test_start"]: window["test_end"]]
-
-        best, train_score, train_stats = pick_best_params_scored(
-            train_prices,
-            candidates,
-            objective=objective,
-            dd_penalty=dd_penalty,
-            min_trades=min_trades,
-        )
+    # run_walk_forward(prices, [candidate], ...)["summary"] for every candidate, in one
+    # pass over the windows that shares the moving averages. With workers > 1 the
+    # candidates are split into chunks; progress counts finished chunks.
+    chunks = run_price_tasks(
+        _summary_task,
+        chunk_items(candidates, workers),
+        prices,
+        (train_size, test_size, step_size, min_trades),
+        workers=workers,
+        chunksize=1,
+        progress=progress,
+        cancel=cancel,
+    )
+    return [summary for chunk in chunks for summary in chunk]
 
-        if not best or not train_stats:
-            rows.append(
-                {
-                    "window": idx,
-                    "train_start": window["train_start"],
-                    "train_end": window["train_end"],
-                    "test_start": window["test_start"],
-                    "test_end": window["test_end"],
-                    "best_fast": "",
-                    "best_slow": "",
-                    "train_score": "",
-                    "train_pnl": "",
-                    "train_max_drawdown": "",
-                    "train_trades": "",
-                    "test_pnl": "",
-                    "test_max_drawdown": "",
-                    "test_trades": "",
-                }
-            )
-            continue
 
-        test_stats = evaluate_params_with_drawdown(test_prices, best["fast"], best["slow"])
-        if not test_stats:
-            test_stats = {"pnl": 0.0, "max_drawdown": 0.0, "trades": 0}
+def _window_row(engine, idx, window, candidates, objective, dd_penalty, min_trades):
+    window_stats = engine.window_stats(window["train_start"], window["train_end"])
+    best_pos, train_score = pick_scored_index(
+        window_stats,
+        objective=objective,
+        dd_penalty=dd_penalty,
+        min_trades=min_trades,
+    )
 
-        rows.append(
-            {
-                "window": idx,
-                "train_start": window["train_start"],
-                "train_end": window["train_end"],
-                "test_start": window["test_start"],
-                "test_end": window["test_end"],
-                "best_fast": best["fast"],
-                "best_slow": best["slow"],
-                "train_score": train_score,
-                "train_pnl": train_stats["pnl"],
-                "train_max_drawdown": train_stats["max_drawdown"],
-                "train_trades": train_stats["trades"],
-                "test_pnl": test_stats["pnl"],
-                "test_max_drawdown": test_stats["max_drawdown"],
-                "test_trades": test_stats["trades"],
-            }
-        )
+    if best_pos is None:
+        return {
+            "window": idx,
+            "train_start": window["train_start"],
+            "train_end": window["train_end"],
+            "test_start": window["test_start"],
+            "test_end": window["test_end"],
+            "best_fast": "",
+            "best_slow": "",
+            "train_score": "",
+            "train_pnl": "",
+            "train_max_drawdown": "",
+            "train_trades": "",
+            "test_pnl": "",
+            "test_max_drawdown": "",
+            "test_trades": "",
+        }
 
-    valid_rows = [row for row in rows if row["best_fast"] != ""]
-    test_pnls = [float(row["test_pnl"]) for row in valid_rows]
-    test_drawdowns = [float(row["test_max_drawdown"]) for row in valid_rows]
+    best = candidates[best_pos]
+    train_stats = window_stats[best_pos]
+    test_stats = engine.window_stats(window["test_start"], window["test_end"], [best_pos])[0]
+    if not test_stats:
+        test_stats = {"pnl": 0.0, "max_drawdown": 0.0, "trades": 0}
 
-    summary = {
-        "windows_total": len(rows),
-        "windows_valid": len(valid_rows),
-        "windows_positive": sum(1 for value in test_pnls if value > 0),
-        "test_total_pnl": sum(test_pnls),
-        "test_avg_pnl": (sum(test_pnls) / len(test_pnls)) if test_pnls else 0.0,
-        "test_avg_drawdown": (sum(test_drawdowns) / len(test_drawdowns)) if test_drawdowns else 0.0,
+    return {
+        "window": idx,
+        "train_start": window["train_start"],
+        "train_end": window["train_end"],
+        "test_start": window["test_start"],
+        "test_end": window["test_end"],
+        "best_fast": best["fast"],
+        "best_slow": best["slow"],
+        "train_score": train_score,
+        "train_pnl": train_stats["pnl"],
+        "train_max_drawdown": train_stats["max_drawdown"],
+        "train_trades": train_stats["trades"],
+        "test_pnl": test_stats["pnl"],
+        "test_max_drawdown": test_stats["max_drawdown"],
+        "test_trades": test_stats["trades"],
     }
-    return {"rows": rows, "summary": summary}
+
+
+def _engine_for(shared):
+    # Every window task of one run shares the payload object, so the engine (and its
+    # full-series signal matrix) is built once per process.
+    global _ENGINE
+    if _ENGINE is None or _ENGINE[0] is not shared:
+        _ENGINE = (shared, MAWalkForward(shared_values(shared[0]), shared[1]))
+    return _ENGINE[1]
+
+
+def _window_task(shared, item):
+    _, candidates, objective, dd_penalty, min_trades = shared
+    idx, window = item
+    return _window_row(_engine_for(shared), idx, window, candidates, objective, dd_penalty, min_trades)
+
+
+def run_walk_forward(
+    prices,
+    candidates,
+    train_size,
+    test_size,
+    step_size=None,
+    objective="pnl",
+    dd_penalty=0.0,
+    min_trades=0,
+    workers=1,
+    progress=None,
+    cancel=None,
+):
+    # With workers > 1 the windows are spread over a process pool; rows still come
+    # back in window order. progress(done, total) counts finished windows.
+    windows = build_windows(len(prices), train_size, test_size, step_size=step_size)
+    rows = run_price_tasks(
+        _window_task,
+        list(enumerate(windows, start=1)),
+        prices,
+        (candidates, objective, dd_penalty, min_trades),
+        workers=workers,
+        progress=progress,
+        cancel=cancel,
+    )
+    valid_rows = [row for row in rows if row["best_fast"] != ""]
+    test_stats = [{"pnl": row["test_pnl"], "max_drawdown": row["test_max_drawdown"]} for row in valid_rows]
+    return {"rows": rows, "summary": _summarize_test_stats(len(rows), test_stats)}
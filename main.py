@@ -1,23 +1,24 @@
 ﻿import argparse
 import csv
 import json
-import math
 import os
 from datetime import time
 
-from engine.alert_manager import AlertManager
+from engine.alert_manager import build_alert_manager
 from engine.backtest_engine import run_backtest
+from engine.change_feed import build_feed_publisher
 from engine.config_validator import report_validation, validate_config
 from engine.cost_model import build_cost_model
 from engine.data_engine import DataEngine
 from engine.data_quality_gate import evaluate_data_quality
 from engine.execution_sim import SimExecution
-from engine.logger import Logger
+from engine.logger import build_logger
 from engine.market_scheduler import is_market_open, load_market_schedule
 from engine.perf_report import build_monthly_metrics, build_return_distribution, build_weekly_metrics
 from engine.risk import RiskManager
 from engine.runtime_state import RuntimeState
 from engine.strategy_factory import create_strategy
+from engine.state_db import state_options
 from engine.strategy_state import StrategyState
 from paper_consistency_check import build_report as build_paper_check_report
 from paper_consistency_check import check_trades
@@ -44,58 +45,6 @@ def schedule_allows(dt, schedule):
     return is_market_open(dt, schedule)
 
 
-def compute_stats(trades):
-    total_trades = len(trades)
-    total_pnl = sum(t["pnl"] for t in trades)
-    win_trades = [t for t in trades if t["pnl"] > 0]
-    loss_trades = [t for t in trades if t["pnl"] <= 0]
-    win_rate = (len(win_trades) / total_trades * 100) if total_trades else 0
-    avg_win = sum(t["pnl"] for t in win_trades) / len(win_trades) if win_trades else 0
-    avg_loss = sum(t["pnl"] for t in loss_trades) / len(loss_trades) if loss_trades else 0
-    profit_factor = (sum(t["pnl"] for t in win_trades) / abs(sum(t["pnl"] for t in loss_trades))) if loss_trades else 0.0
-    expectancy = (total_pnl / total_trades) if total_trades else 0.0
-    return total_trades, total_pnl, win_rate, avg_win, avg_loss, profit_factor, expectancy
-
-
-def compute_max_drawdown(equity_curve):
-    peak = None
-    max_drawdown = 0.0
-    for row in equity_curve:
-        equity = float(row.get("equity", row.get("cash", 0.0)))
-        if peak is None or equity > peak:
-            peak = equity
-        drawdown = peak - equity
-        row["drawdown"] = drawdown
-        if drawdown > max_drawdown:
-            max_drawdown = drawdown
-    return max_drawdown
-
-
-def compute_return_series(equity_curve):
-    returns = []
-    prev = None
-    for row in equity_curve:
-        equity = float(row.get("equity", row.get("cash", 0.0)))
-        if prev is not None and prev != 0:
-            returns.append((equity - prev) / prev)
-        prev = equity
-    return returns
-
-
-def compute_sortino(returns):
-    if not returns:
-        return 0.0
-    mean_ret = sum(returns) / len(returns)
-    downside = [r for r in returns if r < 0]
-    if not downside:
-        return 0.0
-    downside_var = sum(r * r for r in downside) / len(downside)
-    downside_std = math.sqrt(downside_var) if downside_var > 0 else 0.0
-    if downside_std == 0:
-        return 0.0
-    return mean_ret / downside_std
-
-
 def write_rows_csv(path, rows, fallback_headers):
     with open(path, "w", newline="", encoding="utf-8") as f:
         if rows:
@@ -107,7 +56,10 @@ def write_rows_csv(path, rows, fallback_headers):
             writer.writerow(fallback_headers)
 
 
-def main(symbol_override=None, output_dir="output"):
+def main(symbol_override=None, output_dir="output", runtime=None, logger=None):
+    # `runtime` / `logger`: a RuntimeState and Logger the caller already writes through
+    # (sim_live runs this in-process), so both share one snapshot, one event sequence
+    # and one log handle. A passed-in logger is left open.
     config = load_config()
     errors, warnings = validate_config(config, mode="paper")
     report_validation(errors, warnings)
@@ -116,258 +68,259 @@ def main(symbol_override=None, output_dir="output"):
 
     data = DataEngine()
     os.makedirs(output_dir, exist_ok=True)
-    logger = Logger(config.get("monitor", {}).get("log_file", "logs/runtime.log"))
-    alert = AlertManager(
-        config.get("monitor", {}).get("alert_file", "logs/alerts.log"),
-        config.get("monitor", {}).get("webhook_url", ""),
-    )
-    schedule = load_market_schedule(config)
-
-    bars = data.get_bars(symbol)
-    data_report = data.validate_bars(bars, schedule=schedule)
-    data.write_data_report(data_report, os.path.join(output_dir, "data_quality_report.txt"))
-    ok, dq_errors, dq_warnings = evaluate_data_quality(data_report, config.get("data_quality", {}))
-    for w in dq_warnings:
-        print(f"[WARN] {w}")
-        logger.log(f"[WARN] {w}")
-        alert.send_event(
-            event="data_quality_warn",
-            level="WARN",
-            message=f"symbol={symbol} {w}",
-            data={"report": data_report},
-        )
-    if not ok:
-        for e in dq_errors:
-            print(f"[ERROR] {e}")
-            logger.log(f"[ERROR] {e}")
-        alert.send_event(
-            event="data_quality_block",
-            level="ERROR",
-            message=f"symbol={symbol} data quality gate blocked run",
-            data={"errors": dq_errors, "report": data_report},
+    own_logger = logger is None
+    if own_logger:
+        logger = build_logger(config)
+    alert = build_alert_manager(config)
+    try:
+        schedule = load_market_schedule(config)
+
+        bars = data.get_bars(symbol)
+        data_report = data.validate_bars(bars, schedule=schedule)
+        data.write_data_report(data_report, os.path.join(output_dir, "data_quality_report.txt"))
+        ok, dq_errors, dq_warnings = evaluate_data_quality(data_report, config.get("data_quality", {}))
+        for w in dq_warnings:
+            print(f"[WARN] {w}")
+            logger.warn(w)
+            alert.send_event(
+                event="data_quality_warn",
+                level="WARN",
+                message=f"symbol={symbol} {w}",
+                data={"report": data_report},
+            )
+        if not ok:
+            for e in dq_errors:
+                print(f"[ERROR] {e}")
+                logger.error(e)
+            alert.send_event(
+                event="data_quality_block",
+                level="ERROR",
+                message=f"symbol={symbol} data quality gate blocked run",
+                data={"errors": dq_errors, "report": data_report},
+            )
+            raise SystemExit("Data quality gate blocked run.")
+
+        strategy_cfg = config["strategy"]
+        strategy = create_strategy(strategy_cfg)
+
+        state_store = StrategyState("state/strategy_state.json", **state_options(config))
+        last_state = state_store.load()
+        if last_state.get("params"):
+            params = last_state["params"]
+            strategy.set_params(
+                fast=params.get("fast"),
+                slow=params.get("slow"),
+                mode=params.get("mode"),
+                min_diff=params.get("min_diff"),
+                trend_filter=params.get("trend_filter"),
+                trend_window=params.get("trend_window"),
+                rsi_period=params.get("rsi_period"),
+                rsi_overbought=params.get("rsi_overbought"),
+                rsi_oversold=params.get("rsi_oversold"),
+            )
+        else:
+            state_store.save_params(
+                {
+                    "fast": getattr(strategy, "fast", None),
+                    "slow": getattr(strategy, "slow", None),
+                    "mode": getattr(strategy, "mode", None),
+                    "min_diff": getattr(strategy, "min_diff", None),
+                }
+            )
+
+        trade_start = parse_time(strategy_cfg.get("trade_start", ""))
+        trade_end = parse_time(strategy_cfg.get("trade_end", ""))
+
+        risk_cfg = config["risk"]
+        risk = RiskManager(
+            stop_loss_percentage=risk_cfg["stop_loss_percentage"],
+            daily_loss_limit=risk_cfg["daily_loss_limit"],
+            max_drawdown=risk_cfg["max_drawdown"],
+            max_drawdown_pct=risk_cfg.get("max_drawdown_pct"),
+            max_consecutive_losses=risk_cfg["max_consecutive_losses"],
+            risk_per_trade=risk_cfg["risk_per_trade"],
+            atr_period=risk_cfg["atr_period"],
+            atr_multiplier=risk_cfg["atr_multiplier"],
+            take_profit_multiplier=risk_cfg["take_profit_multiplier"],
+            max_orders_per_day=risk_cfg.get("max_orders_per_day"),
+            loss_streak_reduce_ratio=risk_cfg.get("loss_streak_reduce_ratio", 0.0),
+            loss_streak_min_multiplier=risk_cfg.get("loss_streak_min_multiplier", 0.2),
+            volatility_halt_atr=risk_cfg.get("volatility_halt_atr"),
+            volatility_resume_atr=risk_cfg.get("volatility_resume_atr"),
         )
-        raise SystemExit("Data quality gate blocked run.")
-
-    strategy_cfg = config["strategy"]
-    strategy = create_strategy(strategy_cfg)
-
-    state_store = StrategyState("state/strategy_state.json")
-    last_state = state_store.load()
-    if last_state.get("params"):
-        params = last_state["params"]
-        strategy.set_params(
-            fast=params.get("fast"),
-            slow=params.get("slow"),
-            mode=params.get("mode"),
-            min_diff=params.get("min_diff"),
-            trend_filter=params.get("trend_filter"),
-            trend_window=params.get("trend_window"),
-            rsi_period=params.get("rsi_period"),
-            rsi_overbought=params.get("rsi_overbought"),
-            rsi_oversold=params.get("rsi_oversold"),
+
+        execution = SimExecution(
+            slippage=config["contract"]["slippage"],
+            contract_multiplier=config["contract"].get("multiplier", 1),
+            commission_per_contract=config["contract"].get("commission_per_contract", 0.0),
+            commission_min=config["contract"].get("commission_min", 0.0),
+            fill_ratio_min=config["contract"].get("fill_ratio_min", 1.0),
+            fill_ratio_max=config["contract"].get("fill_ratio_max", 1.0),
+            cost_model=build_cost_model(config),
         )
-    else:
-        state_store.save_params(
-            {
-                "fast": getattr(strategy, "fast", None),
-                "slow": getattr(strategy, "slow", None),
-                "mode": getattr(strategy, "mode", None),
-                "min_diff": getattr(strategy, "min_diff", None),
+
+        if runtime is None:
+            runtime = RuntimeState(
+                "state/runtime_state.json",
+                flush_interval=config.get("monitor", {}).get("runtime_flush_sec", 1.0),
+                feed=build_feed_publisher(config),
+                **state_options(config),
+            )
+
+        initial_capital = config["backtest"]["initial_capital"]
+        capital = initial_capital
+        max_trades_per_day = config["backtest"]["max_trades_per_day"]
+
+        def update_runtime(extra=None):
+            strategy_params = {
+                "name": getattr(strategy, "name", strategy_cfg.get("name")),
+                "fast": getattr(strategy, "fast", strategy_cfg.get("fast")),
+                "slow": getattr(strategy, "slow", strategy_cfg.get("slow")),
+                "mode": getattr(strategy, "mode", strategy_cfg.get("mode")),
+                "min_diff": getattr(strategy, "min_diff", strategy_cfg.get("min_diff")),
             }
+            payload = {
+                "symbol": symbol,
+                "capital": capital,
+                "position": execution.position,
+                "trades": len(execution.trades),
+                "halt_reason": risk.halt_reason,
+                "strategy_params": strategy_params,
+            }
+            if extra:
+                payload.update(extra)
+            runtime.update(payload)
+
+        result = run_backtest(
+            bars=bars,
+            strategy=strategy,
+            risk=risk,
+            execution=execution,
+            strategy_cfg=strategy_cfg,
+            symbol=symbol,
+            max_trades_per_day=max_trades_per_day,
+            trade_start=trade_start,
+            trade_end=trade_end,
+            schedule=schedule,
+            initial_capital=initial_capital,
+            schedule_checker=is_market_open,
+            runtime_update=update_runtime,
+            safety_cfg=config.get("safety", {}),
         )
-
-    trade_start = parse_time(strategy_cfg.get("trade_start", ""))
-    trade_end = parse_time(strategy_cfg.get("trade_end", ""))
-
-    risk_cfg = config["risk"]
-    risk = RiskManager(
-        stop_loss_percentage=risk_cfg["stop_loss_percentage"],
-        daily_loss_limit=risk_cfg["daily_loss_limit"],
-        max_drawdown=risk_cfg["max_drawdown"],
-        max_drawdown_pct=risk_cfg.get("max_drawdown_pct"),
-        max_consecutive_losses=risk_cfg["max_consecutive_losses"],
-        risk_per_trade=risk_cfg["risk_per_trade"],
-        atr_period=risk_cfg["atr_period"],
-        atr_multiplier=risk_cfg["atr_multiplier"],
-        take_profit_multiplier=risk_cfg["take_profit_multiplier"],
-        max_orders_per_day=risk_cfg.get("max_orders_per_day"),
-        loss_streak_reduce_ratio=risk_cfg.get("loss_streak_reduce_ratio", 0.0),
-        loss_streak_min_multiplier=risk_cfg.get("loss_streak_min_multiplier", 0.2),
-        volatility_halt_atr=risk_cfg.get("volatility_halt_atr"),
-        volatility_resume_atr=risk_cfg.get("volatility_resume_atr"),
-    )
-
-    execution = SimExecution(
-        slippage=config["contract"]["slippage"],
-        contract_multiplier=config["contract"].get("multiplier", 1),
-        commission_per_contract=config["contract"].get("commission_per_contract", 0.0),
-        commission_min=config["contract"].get("commission_min", 0.0),
-        fill_ratio_min=config["contract"].get("fill_ratio_min", 1.0),
-        fill_ratio_max=config["contract"].get("fill_ratio_max", 1.0),
-        cost_model=build_cost_model(config),
-    )
-
-    runtime = RuntimeState("state/runtime_state.json")
-
-    initial_capital = config["backtest"]["initial_capital"]
-    capital = initial_capital
-    max_trades_per_day = config["backtest"]["max_trades_per_day"]
-
-    def update_runtime(extra=None):
-        strategy_params = {
-            "name": getattr(strategy, "name", strategy_cfg.get("name")),
-            "fast": getattr(strategy, "fast", strategy_cfg.get("fast")),
-            "slow": getattr(strategy, "slow", strategy_cfg.get("slow")),
-            "mode": getattr(strategy, "mode", strategy_cfg.get("mode")),
-            "min_diff": getattr(strategy, "min_diff", strategy_cfg.get("min_diff")),
-        }
-        payload = {
-            "symbol": symbol,
-            "capital": capital,
-            "position": execution.position,
-            "trades": len(execution.trades),
-            "halt_reason": risk.halt_reason,
-            "strategy_params": strategy_params,
-        }
-        if extra:
-            payload.update(extra)
-        runtime.update(payload)
-
-    result = run_backtest(
-        bars=bars,
-        strategy=strategy,
-        risk=risk,
-        execution=execution,
-        strategy_cfg=strategy_cfg,
-        symbol=symbol,
-        max_trades_per_day=max_trades_per_day,
-        trade_start=trade_start,
-        trade_end=trade_end,
-        schedule=schedule,
-        initial_capital=initial_capital,
-        schedule_checker=is_market_open,
-        runtime_update=update_runtime,
-        safety_cfg=config.get("safety", {}),
-    )
-    capital = result["capital"]
-    equity_curve = result["equity_curve"]
-
-    total_trades, total_pnl, win_rate, avg_win, avg_loss, profit_factor, expectancy = compute_stats(execution.trades)
-    final_capital = initial_capital + total_pnl
-    max_drawdown = compute_max_drawdown(equity_curve)
-    max_drawdown_pct = (max_drawdown / initial_capital) if initial_capital else 0.0
-    total_return_pct = ((final_capital - initial_capital) / initial_capital * 100.0) if initial_capital else 0.0
-    calmar = (total_return_pct / (max_drawdown_pct * 100.0)) if max_drawdown_pct > 0 else 0.0
-    sortino = compute_sortino(compute_return_series(equity_curve))
-    monthly_rows = build_monthly_metrics(equity_curve, execution.trades)
-    weekly_rows = build_weekly_metrics(equity_curve, execution.trades)
-    monthly_dist = build_return_distribution(monthly_rows)
-    weekly_dist = build_return_distribution(weekly_rows)
-
-    with open(os.path.join(output_dir, "equity_curve.csv"), "w", newline="", encoding="utf-8") as f:
-        fieldnames = ["step", "cash", "unrealized", "equity", "drawdown", "datetime"]
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in equity_curve:
-            writer.writerow(row)
-
-    with open(os.path.join(output_dir, "trades.csv"), "w", newline="", encoding="utf-8") as f:
-        if execution.trades:
-            fieldnames = list(execution.trades[0].keys())
-        else:
-            fieldnames = ["direction", "entry_price", "exit_price", "size", "pnl"]
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for t in execution.trades:
-            writer.writerow(t)
-
-    write_rows_csv(
-        os.path.join(output_dir, "monthly_report.csv"),
-        monthly_rows,
-        fallback_headers=["month", "start_equity", "end_equity", "return_pct", "max_drawdown", "trade_count", "win_rate", "pnl"],
-    )
-    write_rows_csv(
-        os.path.join(output_dir, "weekly_report.csv"),
-        weekly_rows,
-        fallback_headers=["week", "start_equity", "end_equity", "return_pct", "max_drawdown", "trade_count", "win_rate", "pnl"],
-    )
-
-    performance = {
-        "initial_capital": initial_capital,
-        "final_capital": final_capital,
-        "total_trades": total_trades,
-        "win_rate": win_rate,
-        "total_pnl": total_pnl,
-        "max_drawdown": max_drawdown,
-        "profit_factor": profit_factor,
-        "sharpe": 0.0,
-        "calmar": calmar,
-        "sortino": sortino,
-        "avg_win": avg_win,
-        "avg_loss": avg_loss,
-        "expectancy": expectancy,
-        "r_multiple_avg": 0.0,
-        "r_multiple_sum": 0.0,
-        "weekly_distribution": weekly_dist,
-        "monthly_distribution": monthly_dist,
-    }
-    with open(os.path.join(output_dir, "performance.json"), "w", encoding="utf-8") as f:
-        json.dump(performance, f, ensure_ascii=False, indent=2)
-
-    with open(os.path.join(output_dir, "period_distribution.json"), "w", encoding="utf-8") as f:
-        json.dump(
-            {
-                "weekly": {"rows": weekly_rows, "distribution": weekly_dist},
-                "monthly": {"rows": monthly_rows, "distribution": monthly_dist},
-            },
-            f,
-            ensure_ascii=False,
-            indent=2,
+        capital = result["capital"]
+        equity_curve = result["equity_curve"]
+        run_stats = result["stats"]
+
+        total_trades, total_pnl, win_rate, avg_win, avg_loss, profit_factor, expectancy = run_stats.trade_summary()
+        final_capital = initial_capital + total_pnl
+        max_drawdown = run_stats.max_drawdown
+        max_drawdown_pct = (max_drawdown / initial_capital) if initial_capital else 0.0
+        total_return_pct = ((final_capital - initial_capital) / initial_capital * 100.0) if initial_capital else 0.0
+        calmar = (total_return_pct / (max_drawdown_pct * 100.0)) if max_drawdown_pct > 0 else 0.0
+        sortino = run_stats.sortino
+        monthly_rows = build_monthly_metrics(equity_curve, execution.trades)
+        weekly_rows = build_weekly_metrics(equity_curve, execution.trades)
+        monthly_dist = build_return_distribution(monthly_rows)
+        weekly_dist = build_return_distribution(weekly_rows)
+
+        equity_curve.write_csv(os.path.join(output_dir, "equity_curve.csv"))
+        execution.trades.write_csv(os.path.join(output_dir, "trades.csv"))
+        if config["backtest"].get("binary_outputs", False):
+            equity_curve.write_binary(os.path.join(output_dir, "equity_curve.npz"))
+            execution.trades.write_binary(os.path.join(output_dir, "trades.npz"))
+
+        write_rows_csv(
+            os.path.join(output_dir, "monthly_report.csv"),
+            monthly_rows,
+            fallback_headers=["month", "start_equity", "end_equity", "return_pct", "max_drawdown", "trade_count", "win_rate", "pnl"],
         )
-
-    paper_check_cfg = config.get("paper_check", {})
-    if paper_check_cfg.get("enabled", True):
-        trades_path = os.path.join(output_dir, "trades.csv")
-        paper_errors = check_trades(trades_path)
-        paper_report_path = os.path.join(output_dir, "paper_check_report.json")
-        write_paper_check_report(
-            paper_report_path,
-            build_paper_check_report(trades_path, paper_errors),
+        write_rows_csv(
+            os.path.join(output_dir, "weekly_report.csv"),
+            weekly_rows,
+            fallback_headers=["week", "start_equity", "end_equity", "return_pct", "max_drawdown", "trade_count", "win_rate", "pnl"],
         )
-        if paper_errors:
-            for err in paper_errors:
-                logger.log(f"[PAPER_CHECK][ERROR] {err}")
-            alert.send_event(
-                event="paper_consistency_failed",
-                level="ERROR",
-                message=f"symbol={symbol} paper consistency check failed",
-                data={"errors": paper_errors},
+
+        performance = {
+            "initial_capital": initial_capital,
+            "final_capital": final_capital,
+            "total_trades": total_trades,
+            "win_rate": win_rate,
+            "total_pnl": total_pnl,
+            "max_drawdown": max_drawdown,
+            "profit_factor": profit_factor,
+            "sharpe": 0.0,
+            "calmar": calmar,
+            "sortino": sortino,
+            "avg_win": avg_win,
+            "avg_loss": avg_loss,
+            "expectancy": expectancy,
+            "r_multiple_avg": 0.0,
+            "r_multiple_sum": 0.0,
+            "weekly_distribution": weekly_dist,
+            "monthly_distribution": monthly_dist,
+        }
+        with open(os.path.join(output_dir, "performance.json"), "w", encoding="utf-8") as f:
+            json.dump(performance, f, ensure_ascii=False, indent=2)
+
+        with open(os.path.join(output_dir, "period_distribution.json"), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "weekly": {"rows": weekly_rows, "distribution": weekly_dist},
+                    "monthly": {"rows": monthly_rows, "distribution": monthly_dist},
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
             )
-            if paper_check_cfg.get("strict", False):
-                raise SystemExit("Paper consistency check failed.")
-        else:
-            logger.log("[PAPER_CHECK] PASSED")
 
-    dd_alert_threshold = config.get("monitor", {}).get("drawdown_alert_threshold")
-    if dd_alert_threshold is not None:
-        try:
-            threshold = float(dd_alert_threshold)
-            if max_drawdown >= threshold:
+        paper_check_cfg = config.get("paper_check", {})
+        if paper_check_cfg.get("enabled", True):
+            trades_path = os.path.join(output_dir, "trades.csv")
+            paper_errors = check_trades(trades_path)
+            paper_report_path = os.path.join(output_dir, "paper_check_report.json")
+            write_paper_check_report(
+                paper_report_path,
+                build_paper_check_report(trades_path, paper_errors),
+            )
+            if paper_errors:
+                for err in paper_errors:
+                    logger.error(f"[PAPER_CHECK] {err}")
                 alert.send_event(
-                    event="max_drawdown_threshold_reached",
-                    level="WARN",
-                    message=f"symbol={symbol} drawdown={max_drawdown:.2f} threshold={threshold:.2f}",
-                    data={"max_drawdown": max_drawdown, "threshold": threshold, "total_pnl": total_pnl},
+                    event="paper_consistency_failed",
+                    level="ERROR",
+                    message=f"symbol={symbol} paper consistency check failed",
+                    data={"errors": paper_errors},
                 )
-        except Exception:
-            logger.log("invalid monitor.drawdown_alert_threshold")
-
-    print("\n===== PERFORMANCE =====")
-    print(f"Initial Capital: {initial_capital}")
-    print(f"Final Capital: {final_capital}")
-    print(f"Total Trades: {total_trades}")
-    print(f"Win Rate: {win_rate:.2f}%")
-    print(f"Total PnL: {total_pnl}")
+                if paper_check_cfg.get("strict", False):
+                    raise SystemExit("Paper consistency check failed.")
+            else:
+                logger.log("[PAPER_CHECK] PASSED")
+
+        dd_alert_threshold = config.get("monitor", {}).get("drawdown_alert_threshold")
+        if dd_alert_threshold is not None:
+            try:
+                threshold = float(dd_alert_threshold)
+                if max_drawdown >= threshold:
+                    alert.send_event(
+                        event="max_drawdown_threshold_reached",
+                        level="WARN",
+                        message=f"symbol={symbol} drawdown={max_drawdown:.2f} threshold={threshold:.2f}",
+                        data={"max_drawdown": max_drawdown, "threshold": threshold, "total_pnl": total_pnl},
+                    )
+            except Exception:
+                logger.warn("invalid monitor.drawdown_alert_threshold")
+
+        print("\n===== PERFORMANCE =====")
+        print(f"Initial Capital: {initial_capital}")
+        print(f"Final Capital: {final_capital}")
+        print(f"Total Trades: {total_trades}")
+        print(f"Win Rate: {win_rate:.2f}%")
+        print(f"Total PnL: {total_pnl}")
+    finally:
+        # Also on the SystemExit raised by the data-quality and paper-check gates.
+        if own_logger:
+            logger.close()
+        alert.close()
 
 
 if __name__ == "__main__":
@@ -4,8 +4,10 @@ from copy import deepcopy
 from datetime import datetime
 
 from engine.data_engine import DataEngine
-from engine.backtest_eval import run_once
 from engine.param_version_store import ParamVersionStore
+from engine.result_cache import describe_cache, open_result_cache, run_once_cached
+from engine.state_db import state_options
+from engine.successive_halving import SEARCH_MODES, describe_search, run_search
 from engine.strategy_state import StrategyState
 
 
@@ -36,6 +38,10 @@ def main():
     parser.add_argument("--top-k", type=int, default=8)
     parser.add_argument("--apply", action="store_true", default=True)
     parser.add_argument("--no-apply", action="store_true")
+    parser.add_argument("--workers", type=int, default=1, help="candidate evaluation processes, 0 means all cores")
+    parser.add_argument("--search", choices=SEARCH_MODES, default="grid", help="grid: every candidate on all bars")
+    parser.add_argument("--eta", type=int, default=3, help="successive halving: keep 1/eta per rung")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the backtest result cache")
     args = parser.parse_args()
 
     config = load_config()
@@ -49,9 +55,10 @@ def main():
         raise SystemExit(f"Only rsi_ma/rsi supported in this optimizer, got: {strategy_name}")
 
     penalty = args.score_dd_penalty
+    cache = open_result_cache(config, enabled=not args.no_cache)
     min_trades = max(0, int(args.min_trades))
 
-    stage1_results = []
+    stage1_candidates = []
     for fast in range(3, 10):
         for slow in range(20, 71, 4):
             if slow <= fast:
@@ -61,11 +68,26 @@ def main():
                 cfg["fast"] = fast
                 cfg["slow"] = slow
                 cfg["min_diff"] = float(min_diff)
-                stats = run_once(config, bars, cfg)
-                if stats["trades"] < min_trades:
-                    continue
-                score = stats["pnl"] - penalty * stats["max_drawdown"]
-                stage1_results.append((score, cfg, stats))
+                stage1_candidates.append(cfg)
+
+    stage1_evaluated, stage1_search = run_search(
+        config,
+        bars,
+        stage1_candidates,
+        search=args.search,
+        dd_penalty=penalty,
+        min_trades=min_trades,
+        eta=args.eta,
+        keep=max(1, int(args.top_k)),
+        workers=args.workers,
+        cache=cache,
+    )
+    stage1_results = []
+    for cfg, stats in stage1_evaluated:
+        if stats["trades"] < min_trades:
+            continue
+        score = stats["pnl"] - penalty * stats["max_drawdown"]
+        stage1_results.append((score, cfg, stats))
 
     if not stage1_results:
         raise SystemExit("No candidate passed stage-1 constraints.")
@@ -73,7 +95,7 @@ def main():
     stage1_results.sort(key=lambda x: x[0], reverse=True)
     top_stage1 = stage1_results[: max(1, int(args.top_k))]
 
-    stage2_results = []
+    stage2_candidates = []
     for _, cfg0, _ in top_stage1:
         for rsi_period in [10, 12, 14, 16]:
             for rsi_overbought in [58, 60, 62, 65]:
@@ -84,11 +106,25 @@ def main():
                     cfg["rsi_period"] = rsi_period
                     cfg["rsi_overbought"] = rsi_overbought
                     cfg["rsi_oversold"] = rsi_oversold
-                    stats = run_once(config, bars, cfg)
-                    if stats["trades"] < min_trades:
-                        continue
-                    score = stats["pnl"] - penalty * stats["max_drawdown"]
-                    stage2_results.append((score, cfg, stats))
+                    stage2_candidates.append(cfg)
+
+    stage2_evaluated, stage2_search = run_search(
+        config,
+        bars,
+        stage2_candidates,
+        search=args.search,
+        dd_penalty=penalty,
+        min_trades=min_trades,
+        eta=args.eta,
+        workers=args.workers,
+        cache=cache,
+    )
+    stage2_results = []
+    for cfg, stats in stage2_evaluated:
+        if stats["trades"] < min_trades:
+            continue
+        score = stats["pnl"] - penalty * stats["max_drawdown"]
+        stage2_results.append((score, cfg, stats))
 
     if not stage2_results:
         raise SystemExit("No candidate passed stage-2 constraints.")
@@ -96,7 +132,7 @@ def main():
     stage2_results.sort(key=lambda x: x[0], reverse=True)
     best_score, best_cfg, best_stats = stage2_results[0]
 
-    baseline_stats = run_once(config, bars, base_strategy)
+    baseline_stats = run_once_cached(config, bars, base_strategy, cache=cache)
     baseline_score = baseline_stats["pnl"] - penalty * baseline_stats["max_drawdown"]
 
     report = {
@@ -117,7 +153,10 @@ def main():
             "stage2_candidates": len(stage2_results),
             "dd_penalty": penalty,
             "min_trades": min_trades,
+            "stage1_compute": stage1_search,
+            "stage2_compute": stage2_search,
         },
+        "cache": cache.metrics() if cache else None,
     }
 
     with open("output/strategy_optimization.json", "w", encoding="utf-8") as f:
@@ -136,7 +175,7 @@ def main():
             }
         )
         save_config(config, "config.json")
-        StrategyState("state/strategy_state.json").save_params(
+        StrategyState("state/strategy_state.json", **state_options(config)).save_params(
             {
                 "fast": best_cfg["fast"],
                 "slow": best_cfg["slow"],
@@ -149,7 +188,7 @@ def main():
                 "rsi_oversold": best_cfg["rsi_oversold"],
             }
         )
-        version = ParamVersionStore("state/param_versions.json").append(
+        version = ParamVersionStore("state/param_versions.json", **state_options(config)).append(
             symbol=config["symbol"],
             params={
                 "fast": best_cfg["fast"],
@@ -175,6 +214,9 @@ def main():
         version = None
 
     print("Optimization completed")
+    print(f"stage1 {describe_search(stage1_search)}")
+    print(f"stage2 {describe_search(stage2_search)}")
+    print(describe_cache(cache))
     print(f"baseline_score={baseline_score}")
     print(f"baseline_stats={baseline_stats}")
     print(f"best_score={best_score}")
@@ -183,6 +225,8 @@ def main():
     print(f"applied={apply}")
     if version:
         print(f"version_id={version['version_id']}")
+    if cache:
+        cache.close()
 
 
 if __name__ == "__main__":
@@ -5,6 +5,8 @@ import os
 import json
 from datetime import datetime
 
+from engine.bar_store import CsvTailReader
+
 
 REQUIRED_FIELDS = [
     "direction",
@@ -32,10 +34,19 @@ def check_trades(path, eps=1e-6):
     errors = []
     if not rows:
         return errors
-    for field in REQUIRED_FIELDS:
-        if field not in rows[0]:
-            errors.append(f"missing field: {field}")
-    for i, row in enumerate(rows, start=1):
+    errors.extend(check_fields(rows[0]))
+    errors.extend(check_trade_rows(rows, eps=eps))
+    return errors
+
+
+def check_fields(row):
+    return [f"missing field: {field}" for field in REQUIRED_FIELDS if field not in row]
+
+
+def check_trade_rows(rows, start=1, eps=1e-6):
+    # Per-row checks; `start` is the 1-based row number of rows[0] in the trade file.
+    errors = []
+    for i, row in enumerate(rows, start=start):
         size = _to_float(row.get("size"))
         if size is None or size <= 0:
             errors.append(f"row {i}: invalid size={row.get('size')}")
@@ -55,6 +66,51 @@ def check_trades(path, eps=1e-6):
     return errors
 
 
+class TradeCsvTail(CsvTailReader):
+    # CsvTailReader over a trades CSV: new rows are collected as header-keyed dicts.
+    def reset(self):
+        super().reset()
+        self.rows = []
+
+    def _parse_header(self, row):
+        return [name.replace("\ufeff", "").strip() for name in row]
+
+    def _parse_row(self, row):
+        self.rows.append(dict(zip(self._columns, row)))
+
+
+class IncrementalTradeCheck:
+    # Cumulative check_trades for a trades CSV that only grows (sim_live): each update
+    # validates just the rows appended to the file since the previous call and keeps
+    # the errors. A rewritten or truncated file is checked again from the top.
+    def __init__(self, trades_path, eps=1e-6):
+        self.trades_path = trades_path
+        self.eps = eps
+        self.checked = 0
+        self.errors = []
+        self._tail = TradeCsvTail(trades_path)
+
+    def update(self):
+        if not os.path.exists(self.trades_path):
+            self._tail.reset()
+            self.checked = 0
+            self.errors = [f"missing file: {self.trades_path}"]
+            return list(self.errors)
+        self._tail.poll()
+        if self._tail.reloaded:
+            self.checked = 0
+            self.errors = []
+        new_rows, self._tail.rows = self._tail.rows, []
+        if new_rows and self.checked == 0:
+            self.errors.extend(check_fields(new_rows[0]))
+        self.errors.extend(check_trade_rows(new_rows, start=self.checked + 1, eps=self.eps))
+        self.checked += len(new_rows)
+        return list(self.errors)
+
+    def report(self):
+        return dict(build_report(self.trades_path, self.errors), checked_trades=self.checked)
+
+
 def build_report(trades_path, errors):
     return {
         "ok": len(errors) == 0,
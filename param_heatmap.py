@@ -5,7 +5,9 @@ import json
 import os
 
 from engine.backtest_eval import run_once
+from engine.cost_sweep import apply_cost_scenario, build_cost_scenarios, record_signal_timeline, replay_costs
 from engine.data_engine import DataEngine
+from engine.result_cache import backtest_key, describe_cache, hash_bars, open_result_cache
 
 
 def load_config(path="config.json"):
@@ -46,6 +48,39 @@ def build_windows(bars, window_bars, window_step):
     return windows
 
 
+def evaluate_windows(cfg, windows, strategies, scenarios=(), cache=None):
+    # out[c][w] = [stats, stats per cost scenario...] for strategies[c] on windows[w].
+    # Cost scenarios share one signal timeline per (strategy, window) and only replay
+    # execution and risk. With a cache only the cells missing from it are computed.
+    configs = [cfg] + [apply_cost_scenario(cfg, scenario) for scenario in scenarios]
+    width = len(configs)
+    jobs = [(c, w) for c in range(len(strategies)) for w in range(len(windows))]
+
+    def compute(positions):
+        needed = {}
+        for pos in positions:
+            needed.setdefault(pos // width, []).append(pos % width)
+        values = {}
+        for job, columns in needed.items():
+            c, w = jobs[job]
+            if scenarios:
+                timeline = record_signal_timeline(cfg, windows[w], strategies[c])
+                for k in columns:
+                    values[job * width + k] = replay_costs(cfg, timeline, scenarios[k - 1] if k else None)
+            else:
+                values[job * width] = run_once(cfg, windows[w], strategies[c])
+        return [values[pos] for pos in positions]
+
+    if cache is None:
+        flat = compute(range(len(jobs) * width))
+    else:
+        hashes = [hash_bars(wb) for wb in windows]
+        keys = [backtest_key(hashes[w], configs[k], strategies[c]) for c, w in jobs for k in range(width)]
+        flat = cache.cached(keys, compute)
+    cells = [flat[job * width: (job + 1) * width] for job in range(len(jobs))]
+    return [cells[c * len(windows): (c + 1) * len(windows)] for c in range(len(strategies))]
+
+
 def _color(score, min_score, max_score):
     if max_score <= min_score:
         return "#f0f0f0"
@@ -70,6 +105,8 @@ def main():
     parser.add_argument("--window-step", type=int, default=0, help="0 means same as window-bars")
     parser.add_argument("--stability-penalty", type=float, default=0.5)
     parser.add_argument("--out-dir", default="output")
+    parser.add_argument("--cost-stress", action="store_true", help="add avg pnl per slippage/commission scenario")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the backtest result cache")
     args = parser.parse_args()
 
     cfg = load_config()
@@ -78,8 +115,9 @@ def main():
     cfg["symbol"] = symbol
     bars = DataEngine().get_bars(symbol)
     windows = build_windows(bars, args.window_bars, args.window_step)
+    scenarios = build_cost_scenarios(cfg) if args.cost_stress else []
 
-    rows = []
+    strategies = []
     for fast in range(args.fast_min, args.fast_max + 1):
         for slow in range(args.slow_min, args.slow_max + 1, args.slow_step):
             if slow <= fast:
@@ -87,33 +125,44 @@ def main():
             strategy_cfg = copy.deepcopy(cfg["strategy"])
             strategy_cfg["fast"] = fast
             strategy_cfg["slow"] = slow
-            window_scores = []
-            window_pnls = []
-            window_drawdowns = []
-            window_trades = []
-            for wb in windows:
-                stats = run_once(cfg, wb, strategy_cfg)
-                window_scores.append(score_of(stats, args.dd_penalty))
-                window_pnls.append(float(stats["pnl"]))
-                window_drawdowns.append(float(stats["max_drawdown"]))
-                window_trades.append(float(stats["trades"]))
-            avg_score, std_score, stable_score = stability_of(window_scores, args.stability_penalty)
-            positive_windows = sum(1 for s in window_scores if s > 0)
-            rows.append(
-                {
-                    "fast": fast,
-                    "slow": slow,
-                    "score": stable_score,
-                    "avg_score": avg_score,
-                    "std_score": std_score,
-                    "stable_score": stable_score,
-                    "window_count": len(window_scores),
-                    "positive_window_ratio": (positive_windows / len(window_scores) * 100.0) if window_scores else 0.0,
-                    "avg_pnl": (sum(window_pnls) / len(window_pnls)) if window_pnls else 0.0,
-                    "avg_max_drawdown": (sum(window_drawdowns) / len(window_drawdowns)) if window_drawdowns else 0.0,
-                    "avg_trades": (sum(window_trades) / len(window_trades)) if window_trades else 0.0,
-                }
-            )
+            strategies.append(strategy_cfg)
+    cache = open_result_cache(cfg, enabled=not args.no_cache)
+    results = evaluate_windows(cfg, windows, strategies, scenarios, cache=cache)
+
+    rows = []
+    for strategy_cfg, cells in zip(strategies, results):
+        fast = strategy_cfg["fast"]
+        slow = strategy_cfg["slow"]
+        window_scores = []
+        window_pnls = []
+        window_drawdowns = []
+        window_trades = []
+        stress_pnls = [[] for _ in scenarios]
+        for stats, *stressed in cells:
+            window_scores.append(score_of(stats, args.dd_penalty))
+            window_pnls.append(float(stats["pnl"]))
+            window_drawdowns.append(float(stats["max_drawdown"]))
+            window_trades.append(float(stats["trades"]))
+            for out, scenario_stats in zip(stress_pnls, stressed):
+                out.append(scenario_stats["pnl"])
+        avg_score, std_score, stable_score = stability_of(window_scores, args.stability_penalty)
+        positive_windows = sum(1 for s in window_scores if s > 0)
+        row = {
+            "fast": fast,
+            "slow": slow,
+            "score": stable_score,
+            "avg_score": avg_score,
+            "std_score": std_score,
+            "stable_score": stable_score,
+            "window_count": len(window_scores),
+            "positive_window_ratio": (positive_windows / len(window_scores) * 100.0) if window_scores else 0.0,
+            "avg_pnl": (sum(window_pnls) / len(window_pnls)) if window_pnls else 0.0,
+            "avg_max_drawdown": (sum(window_drawdowns) / len(window_drawdowns)) if window_drawdowns else 0.0,
+            "avg_trades": (sum(window_trades) / len(window_trades)) if window_trades else 0.0,
+        }
+        for scenario, pnls in zip(scenarios, stress_pnls):
+            row[f"pnl[{scenario['name']}]"] = sum(pnls) / len(pnls) if pnls else 0.0
+        rows.append(row)
 
     os.makedirs(args.out_dir, exist_ok=True)
     csv_path = os.path.join(args.out_dir, f"param_heatmap_{symbol}.csv")
@@ -134,13 +183,16 @@ def main():
 
     min_score = min(r["score"] for r in rows)
     max_score = max(r["score"] for r in rows)
+    stress_names = [scenario["name"] for scenario in scenarios]
     table_rows = []
     for row in rows:
         color = _color(row["score"], min_score, max_score)
         table_rows.append(
             f"<tr style='background:{color}'><td>{row['fast']}</td><td>{row['slow']}</td><td>{row['score']:.2f}</td>"
             f"<td>{row['avg_score']:.2f}</td><td>{row['std_score']:.2f}</td><td>{row['positive_window_ratio']:.1f}%</td>"
-            f"<td>{row['avg_pnl']:.2f}</td><td>{row['avg_max_drawdown']:.2f}</td><td>{row['avg_trades']:.1f}</td></tr>"
+            f"<td>{row['avg_pnl']:.2f}</td><td>{row['avg_max_drawdown']:.2f}</td><td>{row['avg_trades']:.1f}</td>"
+            + "".join(f"<td>{row[f'pnl[{sc}]']:.2f}</td>" for sc in stress_names)
+            + "</tr>"
         )
     html = (
         "<!doctype html><html><head><meta charset='utf-8'><title>Param Heatmap</title></head><body>"
@@ -148,7 +200,9 @@ def main():
         f"<div>window_count={len(windows)} stability_penalty={args.stability_penalty}</div>"
         "<table border='1' cellspacing='0' cellpadding='4'>"
         "<tr><th>fast</th><th>slow</th><th>stable_score</th><th>avg_score</th><th>std_score</th><th>positive_ratio</th>"
-        "<th>avg_pnl</th><th>avg_max_drawdown</th><th>avg_trades</th></tr>"
+        "<th>avg_pnl</th><th>avg_max_drawdown</th><th>avg_trades</th>"
+        + "".join(f"<th>pnl {name}</th>" for name in stress_names)
+        + "</tr>"
         + "".join(table_rows)
         + "</table></body></html>"
     )
@@ -161,6 +215,9 @@ def main():
     print(f"rows={len(rows)}")
     print(f"csv={csv_path}")
     print(f"html={html_path}")
+    print(describe_cache(cache))
+    if cache:
+        cache.close()
 
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 import argparse
 
 from engine.param_version_store import ParamVersionStore
+from engine.state_db import read_json, state_options
 
 
 def main():
@@ -12,7 +13,7 @@ def main():
     parser.add_argument("--limit", type=int, default=20)
     args = parser.parse_args()
 
-    store = ParamVersionStore("state/param_versions.json")
+    store = ParamVersionStore("state/param_versions.json", **state_options(read_json("config.json", {})))
 
     if args.list:
         versions = store.list_versions(symbol=args.symbol, limit=max(1, int(args.limit)))
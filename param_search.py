@@ -2,6 +2,7 @@
 
 from engine.param_optimizer import pick_best_params_scored
 from engine.data_engine import DataEngine
+from engine.state_db import state_options
 from engine.strategy_state import StrategyState
 
 
@@ -29,7 +30,7 @@ def main():
     with open("config.json", "w", encoding="utf-8") as f:
         json.dump(cfg, f, ensure_ascii=False, indent=2)
 
-    StrategyState("state/strategy_state.json").save_params({
+    StrategyState("state/strategy_state.json", **state_options(cfg)).save_params({
         "fast": best["fast"],
         "slow": best["slow"],
         "mode": cfg["strategy"].get("mode"),
@@ -39,6 +39,8 @@ def main():
     parser.add_argument("--require-positive-holdout", action="store_true")
     parser.add_argument("--no-apply-best", action="store_true")
     parser.add_argument("--skip-backtest", action="store_true")
+    parser.add_argument("--workers", type=int, default=None, help="strict OOS evaluation processes, 0 means all cores")
+    parser.add_argument("--search", choices=("grid", "halving"), default=None, help="strict OOS candidate search mode")
     args = parser.parse_args()
 
     cfg = load_config()
@@ -69,6 +71,9 @@ def main():
     require_positive_holdout = bool(
         args.require_positive_holdout or cycle_cfg.get("require_positive_holdout", False)
     )
+    workers = args.workers if args.workers is not None else int(cycle_cfg.get("workers", 1))
+    search = args.search or str(cycle_cfg.get("search", "grid"))
+    halving_eta = int(cycle_cfg.get("halving_eta", 3))
     apply_best = bool(cycle_cfg.get("apply_best", True)) and not args.no_apply_best
     run_backtest_after = bool(cycle_cfg.get("run_backtest_after", True)) and not args.skip_backtest
 
@@ -85,6 +90,9 @@ def main():
             "min_trades": min_trades,
             "min_holdout_trades": min_holdout_trades,
             "min_score_improve": min_score_improve,
+            "workers": workers,
+            "search": search,
+            "halving_eta": halving_eta,
             "require_positive_holdout": require_positive_holdout,
             "apply_best": apply_best,
             "run_backtest_after": run_backtest_after,
@@ -163,6 +171,12 @@ def main():
         str(min_holdout_trades),
         "--min-score-improve",
         str(min_score_improve),
+        "--workers",
+        str(workers),
+        "--search",
+        search,
+        "--eta",
+        str(halving_eta),
     ]
     if require_positive_holdout:
         cmd_oos.append("--require-positive-holdout")
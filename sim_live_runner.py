@@ -1,25 +1,33 @@
 import argparse
-import csv
 import json
 import os
 import subprocess
 import sys
 import time
-from datetime import datetime
+from bisect import bisect_left
+from datetime import date, datetime
 
-from engine.alert_manager import AlertManager
+from engine.alert_manager import build_alert_manager
+from engine.bar_store import CsvTailReader, bar_minute, minute_to_datetime
+from engine.change_feed import build_feed_publisher
 from engine.config_validator import report_validation, validate_config
 from engine.cost_model import build_cost_model
-from engine.data_engine import DataEngine
+from engine.data_engine import BarQualityTracker, DataEngine
+from engine.data_merge import MinuteMergeService, build_minute_source
 from engine.data_quality_gate import evaluate_data_quality
 from engine.execution_sim import SimExecution
+from engine.logger import build_logger
 from engine.market_scheduler import is_market_open, load_market_schedule, next_market_open
+from engine.recorders import EQUITY_FIELDS, TRADE_FIELDS, EquityRecorder, TradeRecord, TradeRecorder, read_csv_prefix
 from engine.risk import RiskManager
 from engine.runtime_state import RuntimeState
+from engine.running_stats import RunningStats
+from engine.series_window import CloseBuffer, SeriesWindow
+from engine.session_store import SessionStore
+from engine.state_db import state_options
 from engine.strategy_factory import create_strategy
 from main import main as backtest_main
-from paper_consistency_check import build_report as build_paper_check_report
-from paper_consistency_check import check_trades
+from paper_consistency_check import IncrementalTradeCheck
 from paper_consistency_check import write_report as write_paper_check_report
 
 
@@ -64,54 +72,6 @@ def market_hours_signature(cfg):
         return str(market_hours)
 
 
-def _run_fetch(symbol, out_path, source):
-    cmd = [
-        sys.executable,
-        "data_update_merge.py",
-        "--symbol",
-        symbol,
-        "--out",
-        out_path,
-        "--source",
-        source,
-    ]
-    return subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8")
-
-
-def _read_latest_bar_time(path):
-    if not os.path.exists(path):
-        return ""
-    try:
-        with open(path, "r", encoding="utf-8-sig") as f:
-            lines = [line.strip() for line in f if line.strip()]
-        if len(lines) <= 1:
-            return ""
-        # csv: datetime,open,high,low,close
-        return lines[-1].split(",")[0]
-    except Exception:
-        return ""
-
-
-def _read_bars(path):
-    if not os.path.exists(path):
-        return []
-    bars = []
-    with open(path, "r", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            normalized = {(k or "").replace("\ufeff", ""): v for k, v in row.items()}
-            bars.append(
-                {
-                    "datetime": normalized["datetime"],
-                    "open": float(normalized["open"]),
-                    "high": float(normalized["high"]),
-                    "low": float(normalized["low"]),
-                    "close": float(normalized["close"]),
-                }
-            )
-    return bars
-
-
 def _parse_hhmm(value):
     if not value:
         return None
@@ -163,6 +123,21 @@ def compute_runtime_metrics(initial_capital, capital, trades, equity_curve):
     }
 
 
+# Plain session attributes carried by a snapshot; risk, strategy and stats are stored
+# through their to_dict(), trades and equity rows come from the output CSVs.
+_SNAPSHOT_FIELDS = ("capital", "daily_trade_count", "last_gate_reason")
+
+
+def _find_bar(bars, ts):
+    # Index of the bar at epoch minute `ts` in a time-sorted bar list, or None.
+    if ts is None:
+        return None
+    idx = bisect_left(bars, ts, key=bar_minute)
+    if idx < len(bars) and bar_minute(bars[idx]) == ts:
+        return idx
+    return None
+
+
 class ContinuousPaperSession:
     def __init__(self, cfg, symbol, output_dir):
         self.cfg = cfg
@@ -214,39 +189,40 @@ class ContinuousPaperSession:
         self.current_date = None
         self.daily_trade_count = 0
         self.last_gate_reason = None
-        self.equity_curve = []
+        self.equity_curve = EquityRecorder()
+        self.stats = RunningStats()
         self.last_processed_idx = -1
+        self.close_buffer = CloseBuffer()
         self.trade_start = _parse_hhmm(self.strategy_cfg.get("trade_start", ""))
         self.trade_end = _parse_hhmm(self.strategy_cfg.get("trade_end", ""))
         safety_cfg = cfg.get("safety", {}) or {}
         self.kill_switch_file = safety_cfg.get("kill_switch_file", "")
         self.safety_max_daily_loss = safety_cfg.get("max_daily_loss")
+        self._flush_marks = {}
+        self.paper_check = IncrementalTradeCheck(os.path.join(output_dir, "trades.csv"))
+        self.last_ts = None
+        self.last_bar_time = None
+        self.journal_seq = 0
 
     def _append_equity(self, idx, bar):
-        self.equity_curve.append(
-            {
-                "step": idx,
-                "cash": self.capital,
-                "unrealized": 0.0,
-                "equity": self.capital,
-                "drawdown": 0.0,
-                "datetime": bar["datetime"],
-            }
-        )
+        self.equity_curve.append(idx, self.capital, 0.0, self.capital, self.stats.add_equity(self.capital), bar["datetime"])
 
     def _runtime_metrics(self):
-        return compute_runtime_metrics(
-            initial_capital=self.initial_capital,
-            capital=self.capital,
-            trades=self.execution.trades,
-            equity_curve=self.equity_curve,
-        )
+        # Same numbers as compute_runtime_metrics, without rescanning trades and equity.
+        self.stats.sync_trades(self.execution.trades)
+        return {
+            "total_pnl": float(self.capital) - float(self.initial_capital),
+            "win_rate": self.stats.win_rate,
+            "runtime_drawdown": self.stats.max_drawdown,
+        }
 
     def process_bars(self, bars, start_idx, runtime):
         processed = 0
+        self.close_buffer.sync(bars, start_idx)
         for idx in range(start_idx, len(bars)):
             bar = bars[idx]
-            bar_dt = datetime.strptime(bar["datetime"], "%Y-%m-%d %H:%M")
+            self.close_buffer.append(bar["close"])
+            bar_dt = minute_to_datetime(bar_minute(bar))
             bar_date = bar_dt.date()
             price = bar["close"]
             processed += 1
@@ -269,7 +245,7 @@ class ContinuousPaperSession:
                     }
                 )
 
-            atr = self.risk.update_atr(bars[: idx + 1])
+            atr = self.risk.update_atr(SeriesWindow(bars, idx + 1))
             if hasattr(self.risk, "update_volatility_pause"):
                 self.risk.update_volatility_pause(atr)
             metrics = self._runtime_metrics()
@@ -330,7 +306,7 @@ class ContinuousPaperSession:
                         "capital": self.capital,
                         "position": self.execution.position,
                         "trades": len(self.execution.trades),
-                        "last_trade": self.execution.trades[-1] if self.execution.trades else None,
+                        "last_trade": self.execution.trades[-1].to_dict() if self.execution.trades else None,
                         "halt_reason": self.risk.halt_reason,
                         "total_pnl": metrics["total_pnl"],
                         "win_rate": metrics["win_rate"],
@@ -359,7 +335,7 @@ class ContinuousPaperSession:
                             "capital": self.capital,
                             "position": self.execution.position,
                             "trades": len(self.execution.trades),
-                            "last_trade": self.execution.trades[-1] if self.execution.trades else None,
+                            "last_trade": self.execution.trades[-1].to_dict() if self.execution.trades else None,
                             "halt_reason": self.risk.halt_reason,
                             "total_pnl": metrics["total_pnl"],
                             "win_rate": metrics["win_rate"],
@@ -389,8 +365,7 @@ class ContinuousPaperSession:
                 self._append_equity(idx, bar)
                 continue
 
-            prices = [b["close"] for b in bars[: idx + 1]]
-            signal = self.strategy.generate_signal(prices, step=idx)
+            signal = self.strategy.generate_signal(self.close_buffer.window(), step=idx)
             if signal == 0:
                 self.last_gate_reason = "NO_SIGNAL"
                 self._append_equity(idx, bar)
@@ -444,65 +419,164 @@ class ContinuousPaperSession:
             self._append_equity(idx, bar)
 
         self.last_processed_idx = len(bars) - 1
+        if processed:
+            self.last_ts = bar_minute(bars[-1])
+            self.last_bar_time = bars[-1]["datetime"]
         return processed
 
-    def _compute_max_drawdown(self):
-        peak = None
-        max_dd = 0.0
-        for row in self.equity_curve:
-            eq = float(row.get("equity", row.get("cash", 0.0)))
-            if peak is None or eq > peak:
-                peak = eq
-            dd = peak - eq
-            row["drawdown"] = dd
-            if dd > max_dd:
-                max_dd = dd
-        return max_dd
+    def state_signature(self):
+        # Config sections that shape session state; a snapshot taken under different
+        # settings is not resumed.
+        sections = {k: self.cfg.get(k) for k in ("strategy", "risk", "contract", "backtest", "cost_model", "safety")}
+        return json.dumps([self.symbol, sections], ensure_ascii=False, sort_keys=True, default=str)
+
+    def snapshot_state(self):
+        return {
+            "seq": self.journal_seq,
+            "signature": self.state_signature(),
+            "last_ts": self.last_ts,
+            "last_bar_time": self.last_bar_time,
+            "trades": len(self.execution.trades),
+            "equity_rows": len(self.equity_curve),
+            # Last rows, to check the output CSVs the history is rebuilt from.
+            "last_trade": self.execution.trades[-1].to_dict() if self.execution.trades else None,
+            "last_equity": [self.equity_curve[-1][k] for k in EQUITY_FIELDS] if len(self.equity_curve) else None,
+            "session": {name: getattr(self, name) for name in _SNAPSHOT_FIELDS},
+            "current_date": self.current_date.isoformat() if self.current_date else None,
+            "position": self.execution.position,
+            "risk": self.risk.to_dict(),
+            "strategy": self.strategy.to_dict(),
+            "stats": self.stats.to_dict(),
+        }
+
+    def checkpoint(self, store, snapshot=False):
+        # Journal line every call; a snapshot (which starts the journal over) on request.
+        self.journal_seq += 1
+        store.append_journal(
+            {
+                "seq": self.journal_seq,
+                "last_ts": self.last_ts,
+                "last_bar_time": self.last_bar_time,
+                "capital": self.capital,
+                "trades": len(self.execution.trades),
+                "position": self.execution.position is not None,
+            }
+        )
+        if snapshot:
+            # The snapshot counts rows in the output CSVs; make sure they hold them.
+            os.makedirs(self.output_dir, exist_ok=True)
+            self._sync_csv(self.equity_curve, "equity_curve.csv")
+            self._sync_csv(self.execution.trades, "trades.csv")
+            store.save_snapshot(self.snapshot_state())
+
+    def _read_history(self, snapshot):
+        # Trades and equity rows as of the snapshot, from the output CSVs the session
+        # flushed; None unless both files hold at least those rows, ending as recorded.
+        equity = read_csv_prefix(os.path.join(self.output_dir, "equity_curve.csv"), EQUITY_FIELDS, snapshot["equity_rows"])
+        trades = read_csv_prefix(os.path.join(self.output_dir, "trades.csv"), TRADE_FIELDS, snapshot["trades"])
+        if equity is None or trades is None:
+            return None
+        equity_curve = EquityRecorder.from_csv_rows(equity[0])
+        records = TradeRecorder(TradeRecord.from_csv_row(row) for row in trades[0])
+        last_equity = dict(zip(EQUITY_FIELDS, snapshot["last_equity"])) if snapshot["last_equity"] else None
+        if (equity_curve[-1] if len(equity_curve) else None) != last_equity:
+            return None
+        if (records[-1].to_dict() if records else None) != snapshot["last_trade"]:
+            return None
+        return equity_curve, records, {"equity_curve.csv": equity[1], "trades.csv": trades[1]}
+
+    def resume(self, store, bars, runtime):
+        # Restores the last snapshot, rebuilds trades and the equity curve from the
+        # output CSVs and replays the bars covered by the journal tail.
+        # Returns None (caller starts from scratch) when there is nothing usable.
+        snapshot, tail = store.load()
+        if snapshot is None or snapshot.get("signature") != self.state_signature():
+            return None
+        idx = _find_bar(bars, snapshot.get("last_ts"))
+        if idx is None:
+            return None
+        history = self._read_history(snapshot)
+        if history is None:
+            return None
+        equity_curve, trades, offsets = history
+
+        for name, value in snapshot["session"].items():
+            setattr(self, name, value)
+        self.current_date = date.fromisoformat(snapshot["current_date"]) if snapshot["current_date"] else None
+        self.execution.position = snapshot["position"]
+        self.execution.trades = trades
+        self.equity_curve = equity_curve
+        self.risk.restore(snapshot["risk"])
+        self.strategy.restore(snapshot["strategy"])
+        self.stats.restore(snapshot["stats"])
+        self.close_buffer = CloseBuffer()
+        self.last_ts = snapshot["last_ts"]
+        self.last_bar_time = snapshot["last_bar_time"]
+        self.last_processed_idx = idx
+        self.journal_seq = int(snapshot.get("seq", 0))
+        # Rows written after the snapshot are replayed below; cut them off so the next
+        # flush appends from the snapshot on instead of rewriting the files.
+        self._flush_marks = {}
+        for name, recorder in (("equity_curve.csv", equity_curve), ("trades.csv", trades)):
+            path = os.path.join(self.output_dir, name)
+            os.truncate(path, offsets[name])
+            self._flush_marks[name] = (len(recorder), offsets[name])
+
+        replayed = 0
+        consistent = None
+        if tail:
+            last = tail[-1]
+            target = _find_bar(bars, last.get("last_ts"))
+            if target is not None and target > idx:
+                replayed = self.process_bars(bars=SeriesWindow(bars, target + 1), start_idx=idx + 1, runtime=runtime)
+                consistent = (
+                    abs(float(self.capital) - float(last.get("capital", 0.0))) <= 1e-6
+                    and len(self.execution.trades) == int(last.get("trades", -1))
+                )
+            self.journal_seq = int(last["seq"])
+        return {
+            "snapshot_bar_time": snapshot["last_bar_time"],
+            "journal_entries": len(tail),
+            "replayed_bars": replayed,
+            "consistent": consistent,
+        }
 
     def _compute_stats(self):
-        total_trades = len(self.execution.trades)
-        total_pnl = sum(t["pnl"] for t in self.execution.trades)
-        win_trades = sum(1 for t in self.execution.trades if t["pnl"] > 0)
-        win_rate = (win_trades / total_trades * 100.0) if total_trades else 0.0
-        final_capital = self.initial_capital + total_pnl
-        max_drawdown = self._compute_max_drawdown()
+        self.stats.sync_trades(self.execution.trades)
         return {
             "initial_capital": self.initial_capital,
-            "final_capital": final_capital,
-            "total_trades": total_trades,
-            "win_rate": win_rate,
-            "total_pnl": total_pnl,
-            "max_drawdown": max_drawdown,
+            "final_capital": self.initial_capital + self.stats.pnl_sum,
+            "total_trades": self.stats.trades,
+            "win_rate": self.stats.win_rate,
+            "total_pnl": self.stats.pnl_sum,
+            "max_drawdown": self.stats.max_drawdown,
         }
 
+    def _sync_csv(self, recorder, name):
+        # Appends the rows recorded since the last flush. The file is written in full on
+        # the first flush, or when it is missing or no longer the size we left it at.
+        path = os.path.join(self.output_dir, name)
+        count, size = self._flush_marks.get(name, (0, None))
+        if size is None or not os.path.exists(path) or os.path.getsize(path) != size:
+            recorder.write_csv(path)
+        elif count < len(recorder):
+            recorder.append_csv(path, count)
+        self._flush_marks[name] = (len(recorder), os.path.getsize(path))
+
     def flush_outputs(self):
         os.makedirs(self.output_dir, exist_ok=True)
 
-        with open(os.path.join(self.output_dir, "equity_curve.csv"), "w", newline="", encoding="utf-8") as f:
-            fieldnames = ["step", "cash", "unrealized", "equity", "drawdown", "datetime"]
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for row in self.equity_curve:
-                writer.writerow(row)
-
-        with open(os.path.join(self.output_dir, "trades.csv"), "w", newline="", encoding="utf-8") as f:
-            if self.execution.trades:
-                fieldnames = list(self.execution.trades[0].keys())
-            else:
-                fieldnames = ["direction", "entry_price", "exit_price", "size", "pnl"]
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for trade in self.execution.trades:
-                writer.writerow(trade)
+        self._sync_csv(self.equity_curve, "equity_curve.csv")
+        self._sync_csv(self.execution.trades, "trades.csv")
 
         perf = self._compute_stats()
         with open(os.path.join(self.output_dir, "performance.json"), "w", encoding="utf-8") as f:
             json.dump(perf, f, ensure_ascii=False, indent=2)
 
-        trades_path = os.path.join(self.output_dir, "trades.csv")
-        paper_errors = check_trades(trades_path)
+        # Checks the rows just appended to trades.csv; the report is cumulative.
+        paper_errors = self.paper_check.update()
         paper_report_path = os.path.join(self.output_dir, "paper_check_report.json")
-        write_paper_check_report(paper_report_path, build_paper_check_report(trades_path, paper_errors))
+        write_paper_check_report(paper_report_path, self.paper_check.report())
         return perf, paper_errors
 
 
@@ -644,10 +718,17 @@ def get_no_new_data_alert_level(streak, cfg):
 def main():
     parser = argparse.ArgumentParser(description="Quasi realtime simulation runner")
     parser.add_argument("--symbol", default=None)
-    parser.add_argument("--source", default="akshare")
+    parser.add_argument("--source", default="akshare", help="akshare, csv or replay")
+    parser.add_argument("--replay-file", default=None, help="replay source csv, required by --source replay")
+    parser.add_argument("--replay-batch", type=int, default=None, help="rows released per replay fetch")
     parser.add_argument("--interval-sec", type=int, default=60)
     parser.add_argument("--max-cycles", type=int, default=0, help="0 means infinite loop")
     parser.add_argument("--output-dir", default="output")
+    parser.add_argument("--state-dir", default="state/sim_live", help="session snapshot + journal folder")
+    parser.add_argument(
+        "--snapshot-every", type=int, default=10, help="cycles between session snapshots, 0 disables snapshot/resume"
+    )
+    parser.add_argument("--fresh", action="store_true", help="ignore saved session state and replay from the start")
     parser.add_argument("--data-out", default=None, help="default: data/<symbol>.csv")
     parser.add_argument("--ignore-market-hours", action="store_true", help="run even outside market sessions")
     parser.add_argument("--auto-adjust", action="store_true", help="enable automatic strategy tuning")
@@ -671,20 +752,38 @@ def main():
     symbol = args.symbol or cfg.get("symbol", "M2609")
     data_out = args.data_out or f"data/{symbol}.csv"
     interval_sec = max(5, int(args.interval_sec))
-    runtime = RuntimeState("state/runtime_state.json")
-    alert = AlertManager(
-        cfg.get("monitor", {}).get("alert_file", "logs/alerts.log"),
-        cfg.get("monitor", {}).get("webhook_url", ""),
+    runtime = RuntimeState(
+        "state/runtime_state.json",
+        flush_interval=cfg.get("monitor", {}).get("runtime_flush_sec", 1.0),
+        feed=build_feed_publisher(cfg),
+        **state_options(cfg),
     )
+    logger = build_logger(cfg)
+    alert = build_alert_manager(cfg)
     tune_cfg = _normalize_tune_cfg(_resolve_tune_cfg(cfg, args))
     schedule = load_market_schedule(cfg)
     schedule_sig = market_hours_signature(cfg)
     use_market_hours = not args.ignore_market_hours
-    last_bar_time_seen = _read_latest_bar_time(data_out)
+    storage_cfg = cfg.get("data_storage") or {}
+    merge_service = MinuteMergeService(
+        symbol=symbol,
+        out_path=data_out,
+        source=build_minute_source(
+            args.source, symbol, out_path=data_out, replay_path=args.replay_file, batch_size=args.replay_batch
+        ),
+        raw_root=storage_cfg.get("raw_root", "E:/quantData"),
+        save_raw=bool(storage_cfg.get("save_raw", True)),
+    )
+    bar_reader = CsvTailReader(data_out)
+    bar_reader.poll()
+    last_bar_time_seen = bar_reader.latest_time
     no_new_data_streak = 0
     drawdown_alert_active = False
+    dq_tracker = BarQualityTracker()
+    session_store = SessionStore(args.state_dir) if args.snapshot_every > 0 else None
+    cycles_since_snapshot = args.snapshot_every
 
-    print(
+    logger.log(
         f"[SIM_LIVE] start symbol={symbol} source={args.source} interval={interval_sec}s "
         f"max_cycles={args.max_cycles if args.max_cycles else 'infinite'} auto_adjust={tune_cfg['enabled']} "
         f"use_market_hours={use_market_hours}"
@@ -708,7 +807,7 @@ def main():
                         "symbol": symbol,
                     }
                 )
-                print("[SIM_LIVE] market_hours reloaded")
+                logger.log("[SIM_LIVE] market_hours reloaded")
             else:
                 cfg = latest_cfg
             tune_cfg = _normalize_tune_cfg(_resolve_tune_cfg(cfg, args))
@@ -742,7 +841,7 @@ def main():
                         "sleep_sec": wait_sec,
                     }
                 )
-                print(f"[SIM_LIVE] market closed, next_open={next_text or '-'} sleep={wait_sec}s")
+                logger.log(f"[SIM_LIVE] market closed, next_open={next_text or '-'} sleep={wait_sec}s")
                 time.sleep(wait_sec)
 
         cycle += 1
@@ -757,9 +856,13 @@ def main():
             }
         )
 
-        fetch_ret = _run_fetch(symbol=symbol, out_path=data_out, source=args.source)
-        if fetch_ret.returncode != 0:
-            message = (fetch_ret.stderr or fetch_ret.stdout or "").strip()
+        merge_summary = None
+        message = ""
+        try:
+            merge_summary = merge_service.merge(config=cfg)
+        except (Exception, SystemExit) as exc:
+            message = str(exc).strip()
+        if merge_summary is None:
             runtime.update(
                 {
                     "event": "sim_live_fetch_failed",
@@ -775,12 +878,19 @@ def main():
                 message=f"cycle={cycle} symbol={symbol} source={args.source}",
                 data={"error": message},
             )
-            print(f"[SIM_LIVE] cycle={cycle} fetch failed: {message}")
+            logger.error(f"[SIM_LIVE] cycle={cycle} fetch failed: {message}")
         else:
-            fetch_text = (fetch_ret.stdout or "").strip()
-            if fetch_text:
-                print(fetch_text)
-            newest_bar_time = _read_latest_bar_time(data_out)
+            logger.log(
+                f"[DATA] source={merge_summary['source']} merged {data_out} rows={merge_summary['rows']} "
+                f"added={merge_summary['added']} symbol={symbol} "
+                f"range={merge_summary['start']} -> {merge_summary['end']} at {datetime.now():%Y-%m-%d %H:%M:%S}"
+            )
+            if merge_summary["raw_saved"]:
+                logger.log(f"[DATA] raw archived files={len(merge_summary['raw_saved'])}")
+            bar_reader.poll()
+            if bar_reader.reloaded:
+                dq_tracker = BarQualityTracker()
+            newest_bar_time = bar_reader.latest_time
             no_data_marked = False
             if newest_bar_time and newest_bar_time == last_bar_time_seen:
                 no_new_data_streak += 1
@@ -808,11 +918,11 @@ def main():
             if newest_bar_time:
                 last_bar_time_seen = newest_bar_time
 
-            bars_for_quality = _read_bars(data_out)
-            dq_report = _build_dq_report(bars_for_quality, schedule=schedule)
+            bars_for_quality = bar_reader.bars
+            dq_report = dq_tracker.update(bars_for_quality, schedule=schedule)
             ok_dq, dq_errors, dq_warnings = evaluate_data_quality(dq_report, cfg.get("data_quality", {}))
             for w in dq_warnings:
-                print(f"[SIM_LIVE][WARN] {w}")
+                logger.warn(f"[SIM_LIVE] {w}")
             if dq_warnings:
                 runtime.update(
                     {
@@ -845,7 +955,7 @@ def main():
                     message=f"cycle={cycle} symbol={symbol}",
                     data={"errors": dq_errors},
                 )
-                print(f"[SIM_LIVE] cycle={cycle} data quality blocked: {dq_errors}")
+                logger.error(f"[SIM_LIVE] cycle={cycle} data quality blocked: {dq_errors}")
                 if args.max_cycles > 0 and cycle >= args.max_cycles:
                     runtime.update(
                         {
@@ -869,10 +979,33 @@ def main():
                 continue
 
             if not tune_cfg["enabled"]:
+                bars = bars_for_quality
                 if session is None:
                     session = ContinuousPaperSession(cfg=cfg, symbol=symbol, output_dir=args.output_dir)
+                    resumed = None
+                    if session_store is not None and not args.fresh:
+                        started = time.perf_counter()
+                        resumed = session.resume(session_store, bars, runtime)
+                        if resumed:
+                            resumed["elapsed_ms"] = round((time.perf_counter() - started) * 1000.0, 3)
+                            runtime.update(
+                                dict(resumed, event="sim_live_resumed", mode="sim_live", cycle=cycle, symbol=symbol)
+                            )
+                            logger.log(
+                                f"[SIM_LIVE] resumed from snapshot at {resumed['snapshot_bar_time']} "
+                                f"journal={resumed['journal_entries']} replayed={resumed['replayed_bars']} "
+                                f"consistent={resumed['consistent']} in {resumed['elapsed_ms']}ms"
+                            )
+                            if resumed["consistent"] is False:
+                                alert.send_event(
+                                    event="sim_live_resume_mismatch",
+                                    level="WARN",
+                                    message=f"cycle={cycle} symbol={symbol}",
+                                    data=resumed,
+                                )
+                    if session_store is not None and not resumed:
+                        session_store.clear()
 
-                bars = bars_for_quality
                 start_idx = session.last_processed_idx + 1
                 if start_idx >= len(bars):
                     if not no_data_marked:
@@ -899,11 +1032,17 @@ def main():
                             message=f"cycle={cycle} symbol={symbol}",
                             data={"streak": no_new_data_streak, "reason": "no_new_bars_after_merge"},
                         )
-                    print(f"[SIM_LIVE] cycle={cycle} no new bars")
+                    logger.log(f"[SIM_LIVE] cycle={cycle} no new bars")
                 else:
                     no_new_data_streak = 0
                     processed = session.process_bars(bars=bars, start_idx=start_idx, runtime=runtime)
                     perf, paper_errors = session.flush_outputs()
+                    if session_store is not None:
+                        cycles_since_snapshot += 1
+                        take_snapshot = cycles_since_snapshot >= args.snapshot_every
+                        session.checkpoint(session_store, snapshot=take_snapshot)
+                        if take_snapshot:
+                            cycles_since_snapshot = 0
                     max_dd = _to_float(perf.get("max_drawdown"))
                     threshold = get_drawdown_alert_threshold(cfg)
                     if threshold is not None and max_dd is not None:
@@ -970,12 +1109,14 @@ def main():
                             message=f"cycle={cycle} symbol={symbol}",
                             data={"error_count": len(paper_errors), "errors": paper_errors[:5]},
                         )
-                    print(
+                    logger.log(
                         f"[SIM_LIVE] cycle={cycle} incremental done bars={processed} "
                         f"pnl={perf.get('total_pnl')} trades={perf.get('total_trades')} "
                         f"position={'HOLD' if session.execution.position else 'FLAT'}"
                     )
                 if args.max_cycles > 0 and cycle >= args.max_cycles:
+                    if session_store is not None and cycles_since_snapshot:
+                        session.checkpoint(session_store, snapshot=True)
                     runtime.update(
                         {
                             "event": "sim_live_finished",
@@ -984,7 +1125,7 @@ def main():
                             "symbol": symbol,
                         }
                     )
-                    print(f"[SIM_LIVE] finished cycles={cycle}")
+                    logger.log(f"[SIM_LIVE] finished cycles={cycle}")
                     break
                 runtime.update(
                     {
@@ -1009,7 +1150,7 @@ def main():
 
             if tune_cycle and tune_cfg["rollback_on_worse"]:
                 try:
-                    backtest_main(symbol_override=symbol, output_dir=args.output_dir)
+                    backtest_main(symbol_override=symbol, output_dir=args.output_dir, runtime=runtime, logger=logger)
                     baseline_perf = _read_perf(os.path.join(args.output_dir, "performance.json"))
                     baseline_pnl = _to_float(baseline_perf.get("total_pnl"))
                     runtime.update(
@@ -1021,7 +1162,7 @@ def main():
                             "baseline_pnl": baseline_pnl,
                         }
                     )
-                    print(f"[SIM_LIVE] cycle={cycle} baseline pnl={baseline_pnl}")
+                    logger.log(f"[SIM_LIVE] cycle={cycle} baseline pnl={baseline_pnl}")
                 except Exception as exc:
                     runtime.update(
                         {
@@ -1038,7 +1179,7 @@ def main():
                         message=f"cycle={cycle} symbol={symbol}",
                         data={"error": str(exc)},
                     )
-                    print(f"[SIM_LIVE] cycle={cycle} baseline failed: {exc}")
+                    logger.error(f"[SIM_LIVE] cycle={cycle} baseline failed: {exc}")
 
             if tune_cycle:
                 snapshot = _snapshot_files(["config.json", "state/strategy_state.json"])
@@ -1072,7 +1213,7 @@ def main():
                         message=f"cycle={cycle} symbol={symbol}",
                         data={"error": tune_error},
                     )
-                    print(f"[SIM_LIVE] cycle={cycle} tune failed: {tune_error}")
+                    logger.error(f"[SIM_LIVE] cycle={cycle} tune failed: {tune_error}")
                 else:
                     tune_log = (tune_ret.stdout or "").strip()
                     new_cfg = load_config()
@@ -1093,14 +1234,14 @@ def main():
                         }
                     )
                     if tune_log:
-                        print(tune_log)
-                    print(
+                        logger.log(tune_log)
+                    logger.log(
                         f"[SIM_LIVE] cycle={cycle} tune done changed={tune_changed} "
                         f"fast={new_strategy.get('fast')} slow={new_strategy.get('slow')}"
                     )
 
             try:
-                backtest_main(symbol_override=symbol, output_dir=args.output_dir)
+                backtest_main(symbol_override=symbol, output_dir=args.output_dir, runtime=runtime, logger=logger)
             except Exception as exc:
                 runtime.update(
                     {
@@ -1117,7 +1258,7 @@ def main():
                     message=f"cycle={cycle} symbol={symbol}",
                     data={"error": str(exc)},
                 )
-                print(f"[SIM_LIVE] cycle={cycle} backtest failed: {exc}")
+                logger.error(f"[SIM_LIVE] cycle={cycle} backtest failed: {exc}")
             else:
                 perf = _read_perf(os.path.join(args.output_dir, "performance.json"))
                 current_pnl = _to_float(perf.get("total_pnl"))
@@ -1148,11 +1289,11 @@ def main():
                         message=f"cycle={cycle} symbol={symbol}",
                         data={"baseline_pnl": baseline_pnl, "new_pnl": current_pnl},
                     )
-                    print(
+                    logger.log(
                         f"[SIM_LIVE] cycle={cycle} rollback tune: baseline_pnl={baseline_pnl} "
                         f"new_pnl={current_pnl}"
                     )
-                    backtest_main(symbol_override=symbol, output_dir=args.output_dir)
+                    backtest_main(symbol_override=symbol, output_dir=args.output_dir, runtime=runtime, logger=logger)
                     perf = _read_perf(os.path.join(args.output_dir, "performance.json"))
                     current_pnl = _to_float(perf.get("total_pnl"))
 
@@ -1211,7 +1352,7 @@ def main():
                         )
                     elif max_dd < threshold:
                         drawdown_alert_active = False
-                print(
+                logger.log(
                     f"[SIM_LIVE] cycle={cycle} done pnl={current_pnl} "
                     f"trades={perf.get('total_trades')}"
                 )
@@ -1225,7 +1366,7 @@ def main():
                     "symbol": symbol,
                 }
             )
-            print(f"[SIM_LIVE] finished cycles={cycle}")
+            logger.log(f"[SIM_LIVE] finished cycles={cycle}")
             break
 
         runtime.update(
@@ -1239,6 +1380,9 @@ def main():
         )
         time.sleep(interval_sec)
 
+    logger.close()
+    alert.close()
+
 
 if __name__ == "__main__":
     main()
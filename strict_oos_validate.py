@@ -4,8 +4,11 @@ from copy import deepcopy
 from datetime import datetime
 
 from engine.data_engine import DataEngine
-from engine.backtest_eval import run_once
+from engine.cost_sweep import build_cost_scenarios, run_cost_sweep
 from engine.param_version_store import ParamVersionStore
+from engine.state_db import state_options
+from engine.result_cache import describe_cache, open_result_cache, run_once_cached
+from engine.successive_halving import SEARCH_MODES, describe_search, run_search
 
 
 def load_config(path="config.json"):
@@ -119,12 +122,22 @@ def choose_winner(
     }
 
 
-def pick_best(config, bars, candidates, dd_penalty=0.4, min_trades=4):
+def pick_best(config, bars, candidates, dd_penalty=0.4, min_trades=4, workers=1, search="grid", eta=3, cache=None):
     best = None
     best_stats = None
     best_score = None
-    for candidate in candidates:
-        stats = run_once(config, bars, candidate)
+    results, search_info = run_search(
+        config,
+        bars,
+        candidates,
+        search=search,
+        dd_penalty=dd_penalty,
+        min_trades=min_trades,
+        eta=eta,
+        workers=workers,
+        cache=cache,
+    )
+    for candidate, stats in results:
         if stats["trades"] < min_trades:
             continue
         score = score_of(stats, dd_penalty)
@@ -132,7 +145,7 @@ def pick_best(config, bars, candidates, dd_penalty=0.4, min_trades=4):
             best = candidate
             best_stats = stats
             best_score = score
-    return best, best_stats, best_score
+    return best, best_stats, best_score, search_info
 
 
 def main():
@@ -146,6 +159,11 @@ def main():
     parser.add_argument("--min-score-improve", type=float, default=0.0)
     parser.add_argument("--require-positive-holdout", action="store_true")
     parser.add_argument("--apply-best", action="store_true")
+    parser.add_argument("--workers", type=int, default=1, help="candidate evaluation processes, 0 means all cores")
+    parser.add_argument("--cost-stress", action="store_true", help="add a slippage/commission stress table on holdout")
+    parser.add_argument("--search", choices=SEARCH_MODES, default="grid", help="grid: every candidate on all train bars")
+    parser.add_argument("--eta", type=int, default=3, help="successive halving: keep 1/eta per rung")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the backtest result cache")
     args = parser.parse_args()
 
     config = load_config()
@@ -160,21 +178,26 @@ def main():
     train_bars = bars[:-holdout_bars]
     oos_bars = bars[-holdout_bars:]
     baseline_cfg = deepcopy(config["strategy"])
+    cache = open_result_cache(config, enabled=not args.no_cache)
 
     candidates = build_candidates(config, top_n=max(50, int(args.max_candidates)))
-    best_cfg, best_train_stats, best_train_score = pick_best(
+    best_cfg, best_train_stats, best_train_score, search_info = pick_best(
         config=config,
         bars=train_bars,
         candidates=candidates,
         dd_penalty=args.dd_penalty,
         min_trades=max(0, int(args.min_trades)),
+        workers=args.workers,
+        search=args.search,
+        eta=args.eta,
+        cache=cache,
     )
     if not best_cfg:
         raise SystemExit("No candidate passed constraints on train segment.")
 
-    baseline_oos_stats = run_once(config, oos_bars, baseline_cfg)
+    baseline_oos_stats = run_once_cached(config, oos_bars, baseline_cfg, cache=cache)
     baseline_oos_score = score_of(baseline_oos_stats, args.dd_penalty)
-    best_oos_stats = run_once(config, oos_bars, best_cfg)
+    best_oos_stats = run_once_cached(config, oos_bars, best_cfg, cache=cache)
     best_oos_score = score_of(best_oos_stats, args.dd_penalty)
 
     decision = choose_winner(
@@ -193,7 +216,7 @@ def main():
         config["strategy"] = winner_cfg
         with open("config.json", "w", encoding="utf-8") as f:
             json.dump(config, f, ensure_ascii=False, indent=2)
-        version = ParamVersionStore("state/param_versions.json").append(
+        version = ParamVersionStore("state/param_versions.json", **state_options(config)).append(
             symbol=config["symbol"],
             params={
                 "fast": winner_cfg.get("fast"),
@@ -234,6 +257,8 @@ def main():
             "min_holdout_trades": args.min_holdout_trades,
             "min_score_improve": args.min_score_improve,
             "require_positive_holdout": bool(args.require_positive_holdout),
+            "workers": args.workers,
+            "compute": search_info,
         },
         "baseline": {
             "params": baseline_cfg,
@@ -251,17 +276,30 @@ def main():
         "winner": winner,
         "applied": bool(args.apply_best and winner == "tuned"),
         "version": version,
+        "cache": cache.metrics() if cache else None,
     }
+    if args.cost_stress:
+        scenarios = build_cost_scenarios(config)
+        report["cost_stress"] = {
+            "baseline": run_cost_sweep(config, oos_bars, baseline_cfg, scenarios),
+            "tuned": run_cost_sweep(config, oos_bars, best_cfg, scenarios),
+        }
     with open("output/strict_oos_report.json", "w", encoding="utf-8") as f:
         json.dump(report, f, ensure_ascii=False, indent=2)
 
     print("Strict OOS validation completed")
     print(f"symbol={config['symbol']}")
     print(f"train_bars={len(train_bars)} holdout_bars={len(oos_bars)}")
+    print(describe_search(search_info))
+    print(describe_cache(cache))
     print(f"baseline_holdout={baseline_oos_stats}")
     print(f"tuned_holdout={best_oos_stats}")
     print(f"decision={decision}")
     print(f"winner={winner} applied={report['applied']}")
+    for row in (report.get("cost_stress") or {}).get("tuned", []):
+        print(f"cost_stress[{row['scenario']}] pnl={row['pnl']:.2f} trades={row['trades']} max_dd={row['max_drawdown']:.2f}")
+    if cache:
+        cache.close()
 
 
 if __name__ == "__main__":
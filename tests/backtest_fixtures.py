@@ -0,0 +1,70 @@
+import math
+from datetime import datetime, timedelta
+
+# Synthetic minute bars and backtest configs shared by the search / cache / sweep tests.
+
+
+def minute_bars(prices, start=datetime(2026, 2, 9, 9, 0)):
+    bars = []
+    for i, price in enumerate(prices):
+        bars.append(
+            {
+                "datetime": (start + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M"),
+                "open": price,
+                "high": price + 2,
+                "low": price - 2,
+                "close": price,
+            }
+        )
+    return bars
+
+
+def sawtooth_bars(n):
+    return minute_bars(3000.0 + ((i * 7) % 23) - ((i * 3) % 11) for i in range(n))
+
+
+def wave_bars(n, amplitude, period, start=datetime(2026, 2, 9, 9, 0)):
+    return minute_bars((3000.0 + amplitude * math.sin(i / period) + ((i * 7) % 5) for i in range(n)), start=start)
+
+
+def basic_config():
+    # Wide stops, no session filter: trades on every bar.
+    return {
+        "symbol": "M2609",
+        "contract": {"slippage": 1, "multiplier": 10, "commission_per_contract": 1.0},
+        "risk": {
+            "stop_loss_percentage": 0.02,
+            "daily_loss_limit": None,
+            "max_drawdown": None,
+            "max_consecutive_losses": None,
+            "risk_per_trade": 0.01,
+            "atr_period": 5,
+            "atr_multiplier": 2.0,
+            "take_profit_multiplier": 2.0,
+        },
+        "backtest": {"initial_capital": 100000, "max_trades_per_day": 50},
+        "market_hours": {},
+    }
+
+
+def session_config():
+    # Tight stops and day sessions only, so the risk gates actually fire.
+    return {
+        "symbol": "M2609",
+        "contract": {"slippage": 1, "multiplier": 10, "commission_per_contract": 1.0},
+        "risk": {
+            "stop_loss_percentage": 0.003,
+            "daily_loss_limit": 3000,
+            "max_drawdown": None,
+            "max_consecutive_losses": 4,
+            "risk_per_trade": 0.002,
+            "atr_period": 5,
+            "atr_multiplier": 0.8,
+            "take_profit_multiplier": 0.8,
+        },
+        "backtest": {"initial_capital": 100000, "max_trades_per_day": 5},
+        "market_hours": {
+            "weekdays": [1, 2, 3, 4, 5],
+            "sessions": [{"start": "09:00", "end": "11:30"}, {"start": "13:30", "end": "15:00"}],
+        },
+    }
@@ -1,9 +1,59 @@
 import json
 import tempfile
+import threading
+import time
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from unittest import mock
 
-from engine.alert_manager import AlertManager
+from engine.alert_manager import DEFAULT_RATE_LIMIT_PER_MIN, AlertManager, build_alert_manager
+
+
+class WebhookStub:
+    # Local stand-in for a webhook endpoint: records JSON bodies, can fail the first
+    # `fail_first` requests with HTTP 500 and delay every response by `delay` seconds.
+    def __init__(self, fail_first=0, delay=0.0):
+        self.bodies = []
+        self.requests = 0
+        self.fail_first = fail_first
+        self.delay = delay
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                stub.requests += 1
+                if stub.delay:
+                    time.sleep(stub.delay)
+                if stub.requests <= stub.fail_first:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                stub.bodies.append(json.loads(body.decode("utf-8")))
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/hook"
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def alerts(self):
+        out = []
+        for body in self.bodies:
+            out.extend(body["alerts"] if "alerts" in body else [body])
+        return out
 
 
 class AlertManagerTest(unittest.TestCase):
@@ -14,11 +64,123 @@ class AlertManagerTest(unittest.TestCase):
             alert.send_event("unit_test", "hello", level="WARN", data={"x": 1})
             with open(path, "r", encoding="utf-8") as f:
                 line = f.readline().strip()
+            alert.close()
             payload = json.loads(line)
             self.assertEqual("unit_test", payload["event"])
             self.assertEqual("WARN", payload["level"])
             self.assertEqual(1, payload["data"]["x"])
 
+    def test_webhook_alerts_are_batched(self):
+        with tempfile.TemporaryDirectory() as td, WebhookStub() as hook:
+            alert = AlertManager(alert_file=str(Path(td) / "alerts.log"), webhook_url=hook.url, batch_wait_sec=0.3)
+            for i in range(5):
+                alert.send_event("unit_test", f"msg {i}")
+            self.assertTrue(alert.flush(5))
+            alert.close()
+            self.assertEqual([a["message"] for a in hook.alerts()], [f"msg {i}" for i in range(5)])
+            self.assertLess(len(hook.bodies), 5)
+            self.assertEqual(alert.stats["delivered"], 5)
+            with open(Path(td) / "alerts.log", "r", encoding="utf-8") as f:
+                self.assertEqual(len(f.readlines()), 5)
+
+    def test_retries_with_backoff_then_delivers(self):
+        with tempfile.TemporaryDirectory() as td, WebhookStub(fail_first=2) as hook:
+            alert = AlertManager(
+                alert_file=str(Path(td) / "alerts.log"), webhook_url=hook.url, batch_wait_sec=0, retry_backoff_sec=0.01
+            )
+            alert.send_event("unit_test", "hello")
+            alert.close()
+            self.assertEqual(hook.requests, 3)
+            self.assertEqual(hook.bodies[0]["message"], "hello")
+            self.assertEqual((alert.stats["retried"], alert.stats["delivered"], alert.stats["failed"]), (2, 1, 0))
+
+    def test_failed_delivery_is_counted(self):
+        with tempfile.TemporaryDirectory() as td, WebhookStub(fail_first=100) as hook:
+            alert = AlertManager(
+                alert_file=str(Path(td) / "alerts.log"),
+                webhook_url=hook.url,
+                batch_wait_sec=0,
+                max_retries=1,
+                retry_backoff_sec=0.01,
+            )
+            alert.send_event("unit_test", "hello")
+            alert.close()
+            self.assertEqual((alert.stats["retried"], alert.stats["failed"], alert.stats["delivered"]), (1, 1, 0))
+
+    def test_dedup_and_rate_limit(self):
+        with tempfile.TemporaryDirectory() as td, WebhookStub() as hook:
+            alert = AlertManager(
+                alert_file=str(Path(td) / "alerts.log"),
+                webhook_url=hook.url,
+                batch_wait_sec=0,
+                dedup_sec=60,
+                rate_limit_per_min=2,
+            )
+            # The message changes every cycle; dedup is keyed on event and level.
+            alert.send_event("sim_live_no_new_data", "cycle=1", level="WARN")
+            alert.send_event("sim_live_no_new_data", "cycle=2", level="WARN")
+            alert.send_event("sim_live_no_new_data", "cycle=3", level="ERROR")
+            alert.send_event("sim_live_no_new_data", "cycle=4", level="ERROR")
+            alert.send_event("sim_live_no_new_data", "cycle=5", level="INFO")
+            alert.send_event("other", "x")
+            alert.send_event("other", "y", dedup_key="y")
+            alert.close()
+            delivered = hook.alerts()
+            self.assertEqual([a["message"] for a in delivered], ["cycle=1", "cycle=3", "x", "y"])
+            self.assertEqual(delivered[1]["suppressed"], 1)
+            # cycle=5 is a new level but over the rate limit of 2 per minute.
+            self.assertEqual(alert.stats["suppressed"], 3)
+            with open(Path(td) / "alerts.log", "r", encoding="utf-8") as f:
+                self.assertEqual(len(f.readlines()), 7)
+
+    def test_rate_limit_is_on_by_default(self):
+        with tempfile.TemporaryDirectory() as td, WebhookStub() as hook:
+            alert = build_alert_manager({"monitor": {"alert_file": str(Path(td) / "alerts.log"), "webhook_url": hook.url}})
+            for i in range(DEFAULT_RATE_LIMIT_PER_MIN + 3):
+                alert.send_event("sim_live_no_new_data", f"cycle={i}", level="WARN")
+            alert.close()
+            self.assertEqual(len(hook.alerts()), DEFAULT_RATE_LIMIT_PER_MIN)
+            self.assertEqual(alert.stats["suppressed"], 3)
+
+    def test_slow_webhook_does_not_block_and_full_queue_drops(self):
+        with tempfile.TemporaryDirectory() as td, WebhookStub(delay=0.5) as hook:
+            alert = AlertManager(
+                alert_file=str(Path(td) / "alerts.log"), webhook_url=hook.url, queue_size=1, batch_size=1, batch_wait_sec=0
+            )
+            started = time.perf_counter()
+            for i in range(4):
+                alert.send_event("unit_test", f"msg {i}")
+                time.sleep(0.05)
+            self.assertLess(time.perf_counter() - started, 0.45)
+            alert.close()
+            self.assertGreater(alert.stats["dropped"], 0)
+            self.assertEqual(alert.stats["delivered"] + alert.stats["dropped"], 4)
+            self.assertEqual(len(hook.alerts()), alert.stats["delivered"])
+
+    def test_repeats_are_delivered_by_default_and_payload_is_copied(self):
+        with tempfile.TemporaryDirectory() as td, WebhookStub() as hook:
+            alert = AlertManager(alert_file=str(Path(td) / "alerts.log"), webhook_url=hook.url, batch_wait_sec=0)
+            data = {"cycle": 1}
+            alert.send_event("sim_live_no_new_data", "same", data=data)
+            data["cycle"] = 2
+            alert.send_event("sim_live_no_new_data", "same", data=data)
+            alert.close()
+            self.assertEqual([a["data"]["cycle"] for a in hook.alerts()], [1, 2])
+
+    def test_exit_hook_registered_once_and_removed_on_close(self):
+        with tempfile.TemporaryDirectory() as td, WebhookStub() as hook, mock.patch("engine.alert_manager.atexit") as hooks:
+            alert = AlertManager(alert_file=str(Path(td) / "alerts.log"), webhook_url=hook.url, batch_wait_sec=0)
+            alert.send_event("unit_test", "a")
+            alert.flush()
+            # A worker that died is restarted without a second exit hook.
+            alert._queue.put(None)
+            alert._worker.join(timeout=1.0)
+            alert.send_event("unit_test", "b")
+            alert.close()
+            self.assertEqual(hooks.register.call_count, 1)
+            hooks.unregister.assert_called_once_with(alert.close)
+            self.assertEqual(len(hook.alerts()), 2)
+
 
 if __name__ == "__main__":
     unittest.main()
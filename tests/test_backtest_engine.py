@@ -23,6 +23,18 @@ class _AlwaysLongStrategy:
         return None
 
 
+class _RecordingStrategy:
+    def __init__(self):
+        self.seen = []
+
+    def generate_signal(self, prices, step=None):
+        self.seen.append((step, len(prices), prices[-1], list(prices[-2:])))
+        return 0
+
+    def on_new_day(self):
+        return None
+
+
 class BacktestEngineTest(unittest.TestCase):
     def test_no_trade_path(self):
         bars = [
@@ -153,6 +165,33 @@ class BacktestEngineTest(unittest.TestCase):
             self.assertTrue(any(s.get("event") == "safety_kill_switch" for s in snapshots))
             self.assertEqual(risk.halt_reason, "KILL_SWITCH")
 
+    def test_strategy_sees_close_prefix_window(self):
+        bars = [
+            {"datetime": f"2026-02-09 09:0{i}", "open": 100 + i, "high": 101 + i, "low": 99 + i, "close": 100 + i}
+            for i in range(5)
+        ]
+        strategy = _RecordingStrategy()
+        run_backtest(
+            bars=bars,
+            strategy=strategy,
+            risk=RiskManager(atr_period=2),
+            execution=SimExecution(slippage=0),
+            strategy_cfg={"min_atr": 0.0},
+            symbol="M2609",
+            max_trades_per_day=5,
+            trade_start=None,
+            trade_end=None,
+            schedule=None,
+            initial_capital=100000,
+            schedule_checker=lambda dt, schedule: True,
+            runtime_update=None,
+        )
+        self.assertEqual(len(strategy.seen), len(bars))
+        for step, length, last, tail in strategy.seen:
+            self.assertEqual(length, step + 1)
+            self.assertEqual(last, bars[step]["close"])
+            self.assertEqual(tail, [b["close"] for b in bars[: step + 1]][-2:])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,181 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from datetime import date, datetime
+
+from engine.bar_store import BarSeries, BarStore, CsvTailReader, bar_minute, minute_to_datetime, to_epoch_minute
+from engine.data_engine import DataEngine
+
+_OHLC = ("datetime", "open", "high", "low", "close")
+
+
+def _ohlc(bar):
+    return {k: bar[k] for k in _OHLC}
+
+
+def _write_csv(path, rows, bom=False):
+    with open(path, "w", encoding="utf-8-sig" if bom else "utf-8", newline="") as f:
+        f.write("datetime,open,high,low,close,volume\n")
+        for dt, price in rows:
+            f.write(f"{dt},{price},{price + 1},{price - 1},{price + 0.5},10\n")
+
+
+class BarStoreTest(unittest.TestCase):
+    def test_to_epoch_minute(self):
+        self.assertEqual(to_epoch_minute("1970-01-01 00:00"), 0)
+        self.assertEqual(to_epoch_minute("1970-01-02 01:30"), 1440 + 90)
+        self.assertEqual(to_epoch_minute("1970-01-02 01:30:59"), 1440 + 90)
+        self.assertEqual(to_epoch_minute("bad"), -1)
+
+    def test_bars_carry_parsed_clock(self):
+        bar = BarSeries.from_bars(
+            [{"datetime": "2026-02-12 13:31", "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0}]
+        )[0]
+        self.assertEqual(bar["day_ord"], date(2026, 2, 12).toordinal())
+        self.assertEqual(bar["minute_of_day"], 13 * 60 + 31)
+        self.assertEqual(minute_to_datetime(bar["ts"]), datetime(2026, 2, 12, 13, 31))
+        self.assertEqual(bar_minute(bar), bar["ts"])
+        self.assertEqual(bar_minute({"datetime": "2026-02-12 13:31"}), bar["ts"])
+        with self.assertRaises(ValueError):
+            bar_minute({"datetime": "bad"})
+
+    def test_series_behaves_like_bar_list(self):
+        bars = [
+            {"datetime": "2026-02-12 09:00", "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5},
+            {"datetime": "2026-02-12 09:01", "open": 1.5, "high": 2.5, "low": 1.0, "close": 2.0},
+            {"datetime": "2026-02-12 09:02", "open": 2.0, "high": 3.0, "low": 1.5, "close": 2.5},
+        ]
+        series = BarSeries.from_bars(bars)
+        self.assertEqual(len(series), 3)
+        self.assertEqual(_ohlc(series[0]), bars[0])
+        self.assertEqual(_ohlc(series[-1]), bars[-1])
+        self.assertEqual([_ohlc(b) for b in series], bars)
+        self.assertEqual([_ohlc(b) for b in series[1:]], bars[1:])
+        self.assertEqual(list(series), [series[i] for i in range(3)])
+        self.assertIsInstance(series[1:], BarSeries)
+        self.assertEqual(series[-1]["datetime"], "2026-02-12 09:02")
+        self.assertEqual(series.minutes[1] - series.minutes[0], 1)
+        with self.assertRaises(IndexError):
+            series[3]
+
+    def test_data_engine_builds_and_reuses_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "M2609.csv")
+            _write_csv(csv_path, [("2026-02-12 09:00", 100.0), ("2026-02-12 09:01", 101.0)], bom=True)
+            engine = DataEngine(data_dir=tmp)
+
+            bars = engine.get_bars("M2609")
+            self.assertEqual(
+                _ohlc(bars[0]), {"datetime": "2026-02-12 09:00", "open": 100.0, "high": 101.0, "low": 99.0, "close": 100.5}
+            )
+            self.assertTrue(engine.store.is_fresh("M2609"))
+            folder = os.path.join(tmp, ".cache", "M2609")
+            with open(os.path.join(folder, "meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self.assertEqual(meta["rows"], 2)
+            self.assertTrue(os.path.exists(os.path.join(folder, meta["generation"], "closes.npy")))
+
+            cached = engine.get_bars("M2609")
+            self.assertIsInstance(cached.closes, np.memmap)
+            self.assertEqual(list(cached), list(bars))
+            self.assertEqual(engine.get_price_series("M2609"), [100.5, 101.5])
+
+    def test_cache_invalidated_when_csv_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "M2609.csv")
+            _write_csv(csv_path, [("2026-02-12 09:00", 100.0)])
+            store = BarStore(tmp)
+            self.assertEqual(len(store.load("M2609")), 1)
+
+            _write_csv(csv_path, [("2026-02-12 09:00", 100.0), ("2026-02-12 09:01", 102.0)])
+            later = time.time() + 5
+            os.utime(csv_path, (later, later))
+            self.assertFalse(store.is_fresh("M2609"))
+            reloaded = store.load("M2609")
+            self.assertEqual(len(reloaded), 2)
+            self.assertEqual(reloaded[-1]["close"], 102.5)
+
+    def test_new_generation_replaces_old_and_short_columns_fall_back_to_csv(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "M2609.csv")
+            _write_csv(csv_path, [("2026-02-12 09:00", 100.0)])
+            store = BarStore(tmp)
+            store.load("M2609")
+            first = store._read_meta("M2609")["generation"]
+
+            _write_csv(csv_path, [("2026-02-12 09:00", 100.0), ("2026-02-12 09:01", 102.0)])
+            later = time.time() + 5
+            os.utime(csv_path, (later, later))
+            store.load("M2609")
+            meta = store._read_meta("M2609")
+            self.assertNotEqual(meta["generation"], first)
+            self.assertEqual(sorted(os.listdir(os.path.join(tmp, ".cache", "M2609"))), sorted(["meta.json", meta["generation"]]))
+
+            # Columns that disagree with meta.json (e.g. a torn write) are not used.
+            np.save(os.path.join(tmp, ".cache", "M2609", meta["generation"], "closes.npy"), np.array([1.0]))
+            self.assertTrue(store.is_fresh("M2609"))
+            bars = store.load("M2609")
+            self.assertEqual(len(bars), 2)
+            self.assertEqual(bars[-1]["close"], 102.5)
+
+    def test_uncached_path_matches_cached(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _write_csv(os.path.join(tmp, "M2609.csv"), [("2026-02-12 09:00", 100.0), ("2026-02-12 09:05", 99.0)])
+            cached = DataEngine(data_dir=tmp).get_bars("M2609")
+            plain = DataEngine(data_dir=tmp, use_cache=False).get_bars("M2609")
+            self.assertEqual(list(cached), list(plain))
+
+
+class CsvTailReaderTest(unittest.TestCase):
+    def test_poll_parses_only_appended_rows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "M2609.csv")
+            _write_csv(path, [("2026-02-12 09:00", 100.0), ("2026-02-12 09:01", 101.0)], bom=True)
+            reader = CsvTailReader(path)
+            self.assertEqual(reader.poll(), 2)
+            self.assertTrue(reader.reloaded)
+            self.assertEqual(reader.poll(), 0)
+            self.assertFalse(reader.reloaded)
+
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("2026-02-12 09:02,102.0,103.0,101.0,102.5,10\n")
+            self.assertEqual(reader.poll(), 1)
+            self.assertFalse(reader.reloaded)
+            self.assertEqual(reader.latest_time, "2026-02-12 09:02")
+            self.assertEqual(reader.bars[-1]["close"], 102.5)
+            self.assertEqual(reader.bars[-1]["minute_of_day"], 9 * 60 + 2)
+            self.assertEqual(len(reader.bars), 3)
+
+    def test_rewritten_history_triggers_reload(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "M2609.csv")
+            _write_csv(path, [("2026-02-12 09:00", 100.0), ("2026-02-12 09:01", 101.0)])
+            reader = CsvTailReader(path)
+            reader.poll()
+            _write_csv(path, [("2026-02-12 09:00", 100.0), ("2026-02-12 09:01", 99.0), ("2026-02-12 09:02", 98.0)])
+            self.assertEqual(reader.poll(), 3)
+            self.assertTrue(reader.reloaded)
+            self.assertEqual([b["close"] for b in reader.bars], [100.5, 99.5, 98.5])
+
+    def test_unterminated_row_extended_later(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "M2609.csv")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("datetime,open,high,low,close\n2026-02-12 09:00,1,2,0,1.5")
+            reader = CsvTailReader(path)
+            reader.poll()
+            self.assertEqual(reader.bars[-1]["close"], 1.5)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("5\n2026-02-12 09:01,1,2,0,1.6\n")
+            reader.poll()
+            self.assertTrue(reader.reloaded)
+            self.assertEqual([b["close"] for b in reader.bars], [1.55, 1.6])
+
+
+if __name__ == "__main__":
+    unittest.main()
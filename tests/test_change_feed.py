@@ -0,0 +1,80 @@
+import os
+import tempfile
+import time
+import unittest
+
+from engine.change_feed import FeedListener, FeedPublisher, FileWatch, TailReader
+from engine.runtime_state import RuntimeState
+
+
+class ChangeFeedTest(unittest.TestCase):
+    def test_file_watch_reports_each_change_once(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = os.path.join(td, "performance.json")
+            watch = FileWatch(path)
+            self.assertFalse(watch.changed())
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("{}")
+            self.assertTrue(watch.changed())
+            self.assertFalse(watch.changed())
+            with open(path, "w", encoding="utf-8") as f:
+                f.write('{"total_pnl": 1}')
+            self.assertTrue(watch.changed())
+
+    def test_tail_reader_starts_at_last_line_and_follows_appends(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = os.path.join(td, "alerts.log")
+            with open(path, "w", encoding="utf-8") as f:
+                for i in range(2000):
+                    f.write(f"[t] alert {i}\n")
+            tail = TailReader(path, block_size=64)
+            self.assertEqual(tail.poll(), ["[t] alert 1999"])
+            self.assertEqual(tail.poll(), [])
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("[t] new 1\n[t] new")
+            self.assertEqual(tail.poll(), ["[t] new 1"])
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(" 2\n")
+            self.assertEqual(tail.poll(), ["[t] new 2"])
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("[t] rewritten\n")
+            self.assertEqual(tail.poll(), ["[t] rewritten"])
+
+    def test_runtime_state_pushes_new_events(self):
+        with tempfile.TemporaryDirectory() as td:
+            listener = FeedListener(0)
+            port = listener.sock.getsockname()[1]
+            publisher = FeedPublisher(port)
+            try:
+                runtime = RuntimeState(os.path.join(td, "runtime_state.json"), feed=publisher)
+                runtime.update({"event": "trade_open", "last_step": 1})
+                runtime.update({"event": "trade_close", "last_step": 2})
+                received = []
+                deadline = time.monotonic() + 2.0
+                while len(received) < 2 and time.monotonic() < deadline:
+                    received.extend(listener.drain())
+                    time.sleep(0.01)
+            finally:
+                publisher.close()
+                listener.close()
+            self.assertEqual([p["last_step"] for p in received], [1, 2])
+            self.assertEqual([[e["seq"] for e in p["recent_events"]] for p in received], [[1], [2]])
+
+    def test_oversized_payload_becomes_resync(self):
+        listener = FeedListener(0)
+        publisher = FeedPublisher(listener.sock.getsockname()[1])
+        try:
+            publisher.publish({"updated_at": "x", "blob": "a" * 70000})
+            received = []
+            deadline = time.monotonic() + 2.0
+            while not received and time.monotonic() < deadline:
+                received.extend(listener.drain())
+                time.sleep(0.01)
+        finally:
+            publisher.close()
+            listener.close()
+        self.assertEqual(received, [{"resync": True, "updated_at": "x"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import math
+import random
+import unittest
+from datetime import datetime
+
+from backtest_fixtures import minute_bars, session_config
+
+from engine.backtest_eval import run_once
+from engine.cost_sweep import (
+    apply_cost_scenario,
+    build_cost_scenarios,
+    record_signal_timeline,
+    replay_costs,
+    run_cost_sweep,
+)
+
+
+def _bars(n, seed=3):
+    rng = random.Random(seed)
+    prices = [3000.0 + 25 * math.sin(i / 35.0) + rng.gauss(0, 3) for i in range(n)]
+    return minute_bars(prices, start=datetime(2026, 2, 9, 8, 30))
+
+
+def _config():
+    config = session_config()
+    config["cost_model"] = {
+        "profiles": [
+            {"name": "day", "start": "09:00", "end": "15:00", "slippage": 1.0, "fill_ratio_min": 0.8},
+            {"name": "night", "start": "21:00", "end": "23:00", "slippage": 2.0, "commission_multiplier": 1.2},
+        ]
+    }
+    config["risk"]["loss_streak_reduce_ratio"] = 0.2
+    return config
+
+
+STRATEGIES = [
+    {"name": "ma", "fast": 3, "slow": 12, "mode": "trend", "min_diff": 0.0, "cooldown_bars": 15, "trade_start": "09:10"},
+    {
+        "name": "rsi_ma",
+        "fast": 4,
+        "slow": 16,
+        "min_diff": 0.2,
+        "rsi_period": 8,
+        "rsi_overbought": 60,
+        "rsi_oversold": 40,
+        "max_consecutive_losses": 2,
+        "trade_start": "09:30",
+        "trade_end": "14:30",
+    },
+    {
+        "name": "multi",
+        "members": [
+            {"name": "ma", "fast": 3, "slow": 10, "mode": "trend", "min_diff": 0.0, "cooldown_bars": 20},
+            {"name": "ma", "fast": 5, "slow": 20, "mode": "reverse", "min_diff": 0.0},
+        ],
+        "weights": [1.0, 0.5],
+        "threshold": 0.2,
+        "trade_start": "09:10",
+    },
+]
+
+
+class CostSweepTest(unittest.TestCase):
+    def test_replay_matches_full_backtest_for_every_scenario(self):
+        config = _config()
+        bars = _bars(3000)
+        scenarios = [None] + build_cost_scenarios(config) + [{"name": "partial", "fill_ratio_min": 0.5}]
+        for strategy_cfg in STRATEGIES:
+            timeline = record_signal_timeline(config, bars, strategy_cfg)
+            for scenario in scenarios:
+                with self.subTest(strategy=strategy_cfg["name"], scenario=scenario and scenario["name"]):
+                    expected = run_once(apply_cost_scenario(config, scenario), bars, strategy_cfg)
+                    self.assertEqual(replay_costs(config, timeline, scenario), expected)
+
+    def test_slippage_shifts_profiles_and_leaves_config_alone(self):
+        config = _config()
+        out = apply_cost_scenario(config, {"slippage": 3})
+        self.assertEqual([p["slippage"] for p in out["cost_model"]["profiles"]], [3.0, 4.0])
+        self.assertEqual(out["contract"]["slippage"], 3)
+        self.assertEqual(config["contract"]["slippage"], 1)
+        self.assertEqual(config["cost_model"]["profiles"][0]["slippage"], 1.0)
+
+    def test_sweep_rows_and_default_grid(self):
+        config = _config()
+        scenarios = build_cost_scenarios(config)
+        self.assertEqual([s["name"] for s in scenarios][:3], ["slip=1 comm=1", "slip=1 comm=2", "slip=2 comm=1"])
+        self.assertEqual(len(scenarios), 6)
+        config["cost_sweep"] = {"slippage": [0, 5], "commission_per_contract": [3]}
+        rows = run_cost_sweep(config, _bars(800), STRATEGIES[0], build_cost_scenarios(config))
+        self.assertEqual([r["scenario"] for r in rows], ["slip=0 comm=3", "slip=5 comm=3"])
+        self.assertEqual(set(rows[0]), {"scenario", "slippage", "commission_per_contract", "pnl", "trades", "max_drawdown"})
+        self.assertGreaterEqual(rows[0]["pnl"], rows[1]["pnl"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+
+from dashboard_gui import MonitorUI
+
+
+class _Feed:
+    def __init__(self, payloads):
+        self.payloads = payloads
+
+    def drain(self):
+        payloads, self.payloads = self.payloads, []
+        return payloads
+
+    def close(self):
+        self.closed = True
+
+
+class _Closable:
+    def close(self):
+        self.closed = True
+
+    def destroy(self):
+        self.closed = True
+
+
+def _events(*seqs):
+    return {"recent_events": [{"event": "trade_open", "seq": seq} for seq in seqs]}
+
+
+def _monitor(payloads, runtime):
+    # MonitorUI without the Tk window: only the feed / runtime plumbing is exercised.
+    ui = MonitorUI.__new__(MonitorUI)
+    ui.feed = _Feed(payloads)
+    ui.last_event_seq = 0
+    ui.applied = []
+    ui.forced = []
+
+    def update_from_runtime(payload):
+        ui.applied.append([item["seq"] for item in payload.get("recent_events", [])])
+        ui.last_event_seq = max([ui.last_event_seq] + ui.applied[-1])
+
+    def read_runtime(force=False):
+        ui.forced.append(force)
+        return runtime if force else None
+
+    ui._update_from_runtime = update_from_runtime
+    ui._read_runtime = read_runtime
+    ui._mark_runtime_seen = lambda: None
+    return ui
+
+
+class MonitorUIFeedTest(unittest.TestCase):
+    def test_contiguous_pushes_skip_the_file(self):
+        ui = _monitor([_events(1, 2), _events(3)], runtime=None)
+        self.assertTrue(ui._update_runtime_feed())
+        self.assertEqual(ui.applied, [[1, 2], [3]])
+        self.assertEqual(ui.forced, [])
+
+    def test_dropped_datagram_forces_a_runtime_read(self):
+        ring = _events(1, 2, 3, 4, 5)
+        ui = _monitor([_events(1, 2), _events(4), _events(5)], runtime=ring)
+        self.assertTrue(ui._update_runtime_feed())
+        # Payloads after the gap are not applied before the ring that still has seq 3.
+        self.assertEqual(ui.applied, [[1, 2], [1, 2, 3, 4, 5]])
+        self.assertEqual(ui.forced, [True])
+        self.assertEqual(ui.last_event_seq, 5)
+
+    def test_restarted_run_is_not_a_gap(self):
+        ui = _monitor([_events(1)], runtime=None)
+        ui.last_event_seq = 40
+        ui._update_runtime_feed()
+        self.assertEqual(ui.forced, [])
+
+    def test_close_releases_the_feed_and_the_state_db(self):
+        ui = _monitor([], runtime=None)
+        ui.runtime_db = _Closable()
+        ui.runtime_db.db = _Closable()
+        ui.root = _Closable()
+        ui._stop_live_run = lambda: None
+        ui._on_close()
+        self.assertTrue(ui.feed.closed)
+        self.assertTrue(ui.runtime_db.db.closed)
+        self.assertTrue(ui.root.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
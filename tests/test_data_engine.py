@@ -1,6 +1,7 @@
 import unittest
 
-from engine.data_engine import DataEngine
+from engine.bar_store import BarSeries
+from engine.data_engine import BarQualityTracker, DataEngine
 from engine.market_scheduler import load_market_schedule
 
 
@@ -45,6 +46,45 @@ class DataEngineTest(unittest.TestCase):
         self.assertAlmostEqual(report["max_jump_ratio"], 0.10, places=6)
         self.assertAlmostEqual(report["coverage_ratio"], 2.0 / 3.0, places=6)
 
+    def test_validate_bars_accepts_bar_series(self):
+        bars = [
+            {"datetime": "2026-02-12 11:30", "open": 1, "high": 1, "low": 1, "close": 1},
+            {"datetime": "2026-02-12 11:30", "open": 1, "high": 1, "low": 1, "close": 1},
+            {"datetime": "2026-02-12 13:31", "open": 1, "high": 1, "low": 1, "close": 2},
+        ]
+        engine = DataEngine()
+        self.assertEqual(engine.validate_bars(BarSeries.from_bars(bars)), engine.validate_bars(bars))
+
+    def test_tracker_merges_appended_tail(self):
+        bars = [
+            {"datetime": "2026-02-12 09:00", "open": 100, "high": 100, "low": 100, "close": 100},
+            {"datetime": "2026-02-12 09:03", "open": 100, "high": 100, "low": 100, "close": 101},
+            {"datetime": "2026-02-12 09:03", "open": 100, "high": 100, "low": 100, "close": 101},
+            {"datetime": "2026-02-12 09:04", "open": 100, "high": 100, "low": 100, "close": 120},
+            {"datetime": "2026-02-12 09:10", "open": 100, "high": 100, "low": 100, "close": 119},
+        ]
+        engine = DataEngine()
+        tracker = BarQualityTracker(engine)
+        for n in (1, 2, 3, 5):
+            self.assertEqual(tracker.update(bars[:n]), engine.validate_bars(bars[:n]))
+        self.assertEqual(tracker.count, 5)
+
+    def test_tracker_rebuilds_when_history_changes(self):
+        bars = [
+            {"datetime": "2026-02-12 09:00", "open": 1, "high": 1, "low": 1, "close": 1},
+            {"datetime": "2026-02-12 09:05", "open": 1, "high": 1, "low": 1, "close": 1},
+        ]
+        tracker = BarQualityTracker()
+        tracker.update(bars)
+        rewritten = [dict(bars[0], datetime="2026-02-12 08:59")] + bars[1:] + [
+            {"datetime": "2026-02-12 09:01", "open": 1, "high": 1, "low": 1, "close": 1}
+        ]
+        self.assertEqual(tracker.update(rewritten), DataEngine().validate_bars(rewritten))
+        out_of_order = bars + [{"datetime": "2026-02-12 09:02", "open": 1, "high": 1, "low": 1, "close": 1}]
+        tracker = BarQualityTracker()
+        tracker.update(bars)
+        self.assertEqual(tracker.update(out_of_order)["missing"], 3)
+
 
 if __name__ == "__main__":
     unittest.main()
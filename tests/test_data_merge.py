@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+
+from engine.data_merge import AkshareMinuteSource, MinuteMergeService, ReplayMinuteSource, build_minute_source
+
+
+def _write(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+class DataMergeTest(unittest.TestCase):
+    def test_replay_source_releases_batches(self):
+        with tempfile.TemporaryDirectory() as td:
+            feed = os.path.join(td, "feed.csv")
+            _write(
+                feed,
+                [
+                    "datetime,open,high,low,close",
+                    "2026-02-10 09:00:00,1,2,1,2",
+                    "2026-02-10 09:01:00,2,3,2,3",
+                    "2026-02-10 09:02:00,3,4,3,4",
+                ],
+            )
+            source = ReplayMinuteSource(feed, batch_size=2)
+            self.assertEqual([r[0] for r in source.fetch()], ["2026-02-10 09:00", "2026-02-10 09:01"])
+            self.assertEqual(len(source.fetch()), 3)
+            self.assertEqual(len(source.fetch()), 3)
+
+    def test_merge_appends_only_new_minutes(self):
+        with tempfile.TemporaryDirectory() as td:
+            feed = os.path.join(td, "feed.csv")
+            out = os.path.join(td, "M2609.csv")
+            _write(
+                feed,
+                [
+                    "datetime,open,high,low,close",
+                    "2026-02-10 09:00,1,2,1,2",
+                    "2026-02-10 09:01,2,3,2,3",
+                    "2026-02-10 09:02,3,4,3,4",
+                ],
+            )
+            _write(out, ["datetime,open,high,low,close", "2026-02-10 09:00,1.0,9.0,1.0,9.0"])
+            service = MinuteMergeService("M2609", out, ReplayMinuteSource(feed, batch_size=2), save_raw=False)
+
+            summary = service.merge()
+            self.assertEqual(summary["added"], 1)
+            self.assertFalse(summary["rewritten"])
+            # Existing rows win over fetched duplicates.
+            self.assertEqual(
+                _read(out),
+                ["datetime,open,high,low,close", "2026-02-10 09:00,1.0,9.0,1.0,9.0", "2026-02-10 09:01,2.0,3.0,2.0,3.0"],
+            )
+
+            summary = service.merge()
+            self.assertEqual(summary["added"], 1)
+            self.assertEqual(summary["rows"], 3)
+            self.assertEqual(summary["end"], "2026-02-10 09:02")
+            self.assertEqual(len(_read(out)), 4)
+
+    def test_merge_rewrites_for_backfill_and_unsorted_file(self):
+        with tempfile.TemporaryDirectory() as td:
+            feed = os.path.join(td, "feed.csv")
+            out = os.path.join(td, "M2609.csv")
+            _write(feed, ["datetime,open,high,low,close", "2026-02-10 09:01,2,3,2,3"])
+            _write(
+                out,
+                [
+                    "datetime,open,high,low,close,volume",
+                    "2026-02-10 09:02,3,4,3,4,1",
+                    "2026-02-10 09:00,1,2,1,2,1",
+                ],
+            )
+            service = MinuteMergeService("M2609", out, ReplayMinuteSource(feed), save_raw=False)
+            summary = service.merge()
+            self.assertTrue(summary["rewritten"])
+            self.assertEqual(
+                [line.split(",")[0] for line in _read(out)],
+                ["datetime", "2026-02-10 09:00", "2026-02-10 09:01", "2026-02-10 09:02"],
+            )
+
+    def test_merge_reloads_when_file_changes_externally(self):
+        with tempfile.TemporaryDirectory() as td:
+            feed = os.path.join(td, "feed.csv")
+            out = os.path.join(td, "M2609.csv")
+            _write(feed, ["datetime,open,high,low,close", "2026-02-10 09:05,1,1,1,1"])
+            service = MinuteMergeService("M2609", out, ReplayMinuteSource(feed), save_raw=False)
+            service.merge()
+            _write(out, ["datetime,open,high,low,close", "2026-02-10 09:05,1.0,1.0,1.0,1.0", "2026-02-10 09:06,1,1,1,1"])
+            self.assertEqual(service.merge()["rows"], 2)
+
+    def test_unsupported_source(self):
+        with self.assertRaises(SystemExit):
+            build_minute_source("foo", "M2609")
+
+    def test_csv_source_still_fetches_and_replay_needs_its_own_file(self):
+        source = build_minute_source("CSV", "M2609", out_path="data/M2609.csv")
+        self.assertIsInstance(source, AkshareMinuteSource)
+        self.assertEqual(source.name, "csv")
+        with self.assertRaises(SystemExit):
+            build_minute_source("replay", "M2609", out_path="data/M2609.csv")
+        with self.assertRaises(SystemExit):
+            build_minute_source("replay", "M2609", out_path="data/M2609.csv", replay_path="data/../data/M2609.csv")
+        self.assertIsInstance(
+            build_minute_source("replay", "M2609", out_path="data/M2609.csv", replay_path="feed.csv"), ReplayMinuteSource
+        )
+
+    def test_merge_checks_policy_with_the_requested_source(self):
+        with tempfile.TemporaryDirectory() as td:
+            out = os.path.join(td, "M2609.csv")
+            config = {"data_policy": {"mode": "commercial", "approved_sources": ["akshare"], "commercial_ack": "x"}}
+            service = MinuteMergeService("M2609", out, build_minute_source("csv", "M2609", out_path=out), save_raw=False)
+            with self.assertRaises(SystemExit):
+                service.merge(config)
+            self.assertFalse(os.path.exists(out))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+import random
+import unittest
+from fractions import Fraction
+
+from engine.indicators import ATR, RSI, RollingMean
+from engine.strategy import RSIMAStrategy, Strategy, _calc_rsi
+
+
+def _legacy_ma_signal(prices, fast, slow, trend_window, min_diff, trend_filter):
+    if len(prices) < slow or (trend_filter and len(prices) < trend_window):
+        return 0
+    fast_ma = sum(prices[-fast:]) / fast
+    slow_ma = sum(prices[-slow:]) / slow
+    trend_dir = 0
+    if trend_filter:
+        trend_ma = sum(prices[-trend_window:]) / trend_window
+        trend_dir = 1 if prices[-1] > trend_ma else -1 if prices[-1] < trend_ma else 0
+    if abs(fast_ma - slow_ma) < min_diff:
+        return 0
+    if fast_ma > slow_ma:
+        return 0 if trend_filter and trend_dir != 1 else 1
+    if fast_ma < slow_ma:
+        return 0 if trend_filter and trend_dir != -1 else -1
+    return 0
+
+
+def _random_walk(n, seed=7, tick=0.5):
+    rng = random.Random(seed)
+    price = 3000.0
+    prices = []
+    for _ in range(n):
+        price += rng.choice([-2, -1, 0, 1, 2]) * tick
+        prices.append(price)
+    return prices
+
+
+def _tick_walk(n, tick, seed):
+    # Integer tick counts plus the float closes a feed would deliver for them.
+    rng = random.Random(seed)
+    level = 30000
+    ticks = []
+    for _ in range(n):
+        level += rng.choice([-2, -1, 0, 0, 1, 2])
+        ticks.append(level)
+    return ticks, [round(t * tick, 6) for t in ticks]
+
+
+def _sign(value):
+    return 1 if value > 0 else -1 if value < 0 else 0
+
+
+def _exact_signal(ticks, tick, fast, slow, trend_window, min_diff, trend_filter, rsi=None):
+    # Signal of Strategy / RSIMAStrategy in exact tick arithmetic; rsi = (period, overbought, oversold).
+    tick = Fraction(str(tick))
+    fast_ma = Fraction(sum(ticks[-fast:]), fast) * tick
+    slow_ma = Fraction(sum(ticks[-slow:]), slow) * tick
+    if abs(fast_ma - slow_ma) < Fraction(str(min_diff)):
+        return 0
+    cross = _sign(fast_ma - slow_ma)
+    trend_dir = 0
+    if trend_filter:
+        trend_dir = _sign(Fraction(ticks[-1] * trend_window, 1) - sum(ticks[-trend_window:]))
+    if rsi is None:
+        if trend_filter and cross != trend_dir:
+            return 0
+        return cross
+    period, overbought, oversold = rsi
+    changes = [b - a for a, b in zip(ticks[-period - 1:-1], ticks[-period:])]
+    gains = sum(c for c in changes if c > 0)
+    losses = -sum(c for c in changes if c < 0)
+
+    def rsi_vs(level):
+        if losses == 0:
+            return _sign(100 - level)
+        return _sign(100 * gains - Fraction(str(level)) * (gains + losses))
+
+    signal = 0
+    if cross == 1 and rsi_vs(oversold) <= 0:
+        signal = 1
+    elif cross == -1 and rsi_vs(overbought) >= 0:
+        signal = -1
+    if trend_filter and signal != 0 and signal != trend_dir:
+        return 0
+    return signal
+
+
+class IndicatorsTest(unittest.TestCase):
+    def test_rolling_mean_matches_tail_sum(self):
+        prices = _random_walk(300)
+        ma = RollingMean(20)
+        for i, p in enumerate(prices):
+            ma.on_bar(p)
+            self.assertEqual(ma.value, sum(prices[max(0, i - 19): i + 1]) / 20)
+        self.assertTrue(ma.ready)
+
+    def test_simple_rsi_matches_calc_rsi(self):
+        prices = _random_walk(300)
+        rsi = RSI(10)
+        for i, p in enumerate(prices):
+            rsi.on_bar(p)
+            self.assertEqual(rsi.value, _calc_rsi(prices[: i + 1], 10))
+
+    def test_wilder_rsi_stays_in_range(self):
+        rsi = RSI(5, method="wilder")
+        for p in _random_walk(100):
+            rsi.on_bar(p)
+        self.assertTrue(0.0 <= rsi.value <= 100.0)
+        with self.assertRaises(ValueError):
+            RSI(5, method="ema")
+
+    def test_atr_mean_of_true_ranges(self):
+        atr = ATR(3)
+        bars = [(101, 99, 100), (103, 100, 102), (102, 98, 99), (100, 97, 98)]
+        values = [atr.on_bar(h, l, c) for h, l, c in bars]
+        self.assertEqual(values[:3], [None, None, None])
+        self.assertAlmostEqual(values[3], (3 + 4 + 3) / 3.0)
+
+    def test_ma_strategy_matches_legacy_signals(self):
+        prices = _random_walk(1500)
+        s = Strategy(fast=4, slow=28, mode="trend", min_diff=0.5, trend_filter=True, trend_window=120)
+        for i in range(len(prices)):
+            window = prices[: i + 1]
+            expected = _legacy_ma_signal(window, 4, 28, 120, 0.5, True)
+            self.assertEqual(s.generate_signal(window, step=i), expected)
+
+    def test_rsi_strategy_matches_fresh_instances(self):
+        prices = _random_walk(800, seed=3)
+        params = dict(rsi_period=10, rsi_overbought=60, rsi_oversold=38, fast=4, slow=28, min_diff=0.5, trend_filter=True, trend_window=40)
+        incremental = RSIMAStrategy(**params)
+        for i in range(0, len(prices), 3):
+            window = prices[: i + 1]
+            self.assertEqual(incremental.generate_signal(window), RSIMAStrategy(**params).generate_signal(window))
+
+    def test_ma_strategy_matches_exact_ticks(self):
+        # Sub-unit ticks make float averages of equal tick sums differ in the last bits.
+        for tick, seed in ((0.1, 1), (0.2, 2), (0.1, 3)):
+            ticks, prices = _tick_walk(1200, tick, seed)
+            for fast, slow, min_diff in ((3, 6, 0.0), (4, 20, 0.2), (5, 10, 0.1)):
+                s = Strategy(fast=fast, slow=slow, mode="trend", min_diff=min_diff, trend_filter=True, trend_window=30)
+                for i in range(30, len(prices)):
+                    expected = _exact_signal(ticks[: i + 1], tick, fast, slow, 30, min_diff, True)
+                    self.assertEqual(s.generate_signal(prices[: i + 1]), expected, (tick, seed, fast, slow, i))
+
+    def test_rsi_strategy_matches_exact_ticks(self):
+        for tick, seed in ((0.1, 4), (0.2, 5)):
+            ticks, prices = _tick_walk(1200, tick, seed)
+            for period, overbought, oversold in ((4, 75, 25), (6, 50, 50), (10, 60, 40)):
+                s = RSIMAStrategy(
+                    rsi_period=period, rsi_overbought=overbought, rsi_oversold=oversold,
+                    fast=3, slow=6, min_diff=0.0, trend_filter=True, trend_window=12,
+                )
+                for i in range(12, len(prices)):
+                    expected = _exact_signal(ticks[: i + 1], tick, 3, 6, 12, 0.0, True, rsi=(period, overbought, oversold))
+                    self.assertEqual(s.generate_signal(prices[: i + 1]), expected, (tick, seed, period, i))
+
+    def test_sync_restarts_on_a_different_series(self):
+        # Same length and same last close, different history: must not reuse the old sums.
+        a = [10.0, 10.0, 10.0, 10.0, 10.0, 12.0]
+        b = [14.0, 14.0, 14.0, 14.0, 14.0, 12.0]
+        s = Strategy(fast=2, slow=5, mode="trend")
+        self.assertEqual(s.generate_signal(a), 1)
+        self.assertEqual(s.generate_signal(b), -1)
+        a.append(12.0)
+        b.append(12.0)
+        self.assertEqual(s.generate_signal(b), _legacy_ma_signal(b, 2, 5, 50, 0.0, False))
+
+    def test_set_params_resets_indicators(self):
+        prices = [10, 11, 12, 13, 14, 15, 14, 13, 12, 11]
+        s = Strategy(fast=2, slow=4, mode="trend")
+        s.generate_signal(prices[:6])
+        s.set_params(fast=3, slow=5)
+        self.assertEqual(s.generate_signal(prices), _legacy_ma_signal(prices, 3, 5, 50, 0.0, False))
+
+
+if __name__ == "__main__":
+    unittest.main()
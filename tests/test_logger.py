@@ -0,0 +1,97 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from engine.logger import Logger, build_logger
+
+
+class LoggerTest(unittest.TestCase):
+    def test_text_lines_and_levels(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = os.path.join(td, "logs", "runtime.log")
+            logger = Logger(path, level="INFO", echo=False)
+            logger.log("hello")
+            logger.debug("hidden")
+            logger.warn("careful")
+            logger.close()
+            with open(path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            self.assertEqual(len(lines), 2)
+            self.assertTrue(lines[0].endswith("] hello"))
+            self.assertTrue(lines[1].endswith("] [WARN] careful"))
+
+    def test_jsonl_records(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = os.path.join(td, "runtime.jsonl")
+            logger = Logger(path, fmt="jsonl", echo=False)
+            logger.error("boom", symbol="M2605", cycle=3)
+            logger.close()
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.loads(f.readline())
+            self.assertEqual((record["level"], record["msg"], record["symbol"], record["cycle"]), ("ERROR", "boom", "M2605", 3))
+
+    def test_size_rotation_with_gzip(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = os.path.join(td, "runtime.log")
+            logger = Logger(path, max_bytes=200, backup_count=2, compress=True, echo=False)
+            for i in range(30):
+                logger.log(f"line {i:02d} " + "x" * 20)
+            logger.close()
+            self.assertLessEqual(os.path.getsize(path), 200)
+            self.assertTrue(os.path.exists(f"{path}.1.gz"))
+            self.assertTrue(os.path.exists(f"{path}.2.gz"))
+            self.assertFalse(os.path.exists(f"{path}.3.gz"))
+            with gzip.open(f"{path}.1.gz", "rt", encoding="utf-8") as f:
+                rotated = f.read().splitlines()
+            with open(path, "r", encoding="utf-8") as f:
+                current = f.read().splitlines()
+            # The newest backup holds the lines right before the live file.
+            self.assertEqual(int(rotated[-1].split()[3]) + 1, int(current[0].split()[3]))
+
+    def test_time_rotation(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = os.path.join(td, "runtime.log")
+            logger = Logger(path, rotate_interval_sec=3600, echo=False)
+            logger.log("first")
+            logger._opened_at -= 3600
+            logger.log("second")
+            logger.close()
+            with open(f"{path}.1", "r", encoding="utf-8") as f:
+                self.assertIn("first", f.read())
+            with open(path, "r", encoding="utf-8") as f:
+                self.assertIn("second", f.read())
+
+    def test_async_mode_writes_everything_on_close(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = os.path.join(td, "runtime.log")
+            logger = build_logger({"monitor": {"log_file": path, "log_async": True}})
+            logger.echo = False
+            for i in range(500):
+                logger.log(f"line {i}")
+            logger.flush()
+            with open(path, "r", encoding="utf-8") as f:
+                self.assertEqual(len(f.read().splitlines()), 500)
+            logger.close()
+            self.assertEqual(logger.dropped, 0)
+
+    def test_close_unregisters_and_later_lines_are_written(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = os.path.join(td, "runtime.log")
+            with mock.patch("engine.logger.atexit") as hooks:
+                logger = Logger(path, async_mode=True, echo=False)
+                logger.log("before")
+                logger.close()
+                logger.log("after")
+                logger.close()
+            hooks.unregister.assert_called_once_with(logger.close)
+            self.assertIsNone(logger._file)
+            with open(path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            self.assertEqual([line.split("] ")[-1] for line in lines], ["before", "after"])
+
+
+if __name__ == "__main__":
+    unittest.main()
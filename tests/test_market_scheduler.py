@@ -1,7 +1,8 @@
 import unittest
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from engine.market_scheduler import is_market_open, load_market_schedule, next_market_open
+from engine.bar_store import datetime_to_minute
+from engine.market_scheduler import compile_schedule, is_market_open, load_market_schedule, next_market_open
 
 
 class MarketSchedulerTest(unittest.TestCase):
@@ -110,6 +111,39 @@ class MarketSchedulerTest(unittest.TestCase):
         schedule = load_market_schedule(cfg)
         self.assertTrue(is_market_open(datetime(2026, 2, 14, 9, 30), schedule))
 
+    def test_compiled_mask_matches_is_market_open(self):
+        cfg = {
+            "market_hours": {
+                "sessions": [{"start": "09:00", "end": "11:30"}, {"start": "21:00", "end": "02:30"}],
+                "weekdays": [1, 2, 3, 4, 5],
+                "holidays": {"dates": ["2026-02-16"]},
+                "special_closures": [{"date": "2026-02-11", "start": "09:20", "end": "09:40"}],
+            }
+        }
+        schedule = load_market_schedule(cfg)
+        compiled = compile_schedule(schedule)
+        self.assertIs(compile_schedule(schedule), compiled)
+        times = [datetime(2026, 2, 10) + timedelta(minutes=m) for m in range(0, 8 * 1440, 7)]
+        mask = compiled.open_mask([datetime_to_minute(t) for t in times])
+        self.assertEqual(list(mask), [is_market_open(t, schedule) for t in times])
+        self.assertFalse(compiled.is_open(datetime_to_minute(datetime(2026, 2, 11, 9, 30))))
+        self.assertTrue(compiled.is_open(datetime_to_minute(datetime(2026, 2, 14, 1, 30))))
+
+    def test_compiled_mask_extends_lazily(self):
+        schedule = load_market_schedule({"market_hours": {"sessions": [{"start": "09:00", "end": "11:30"}]}})
+        compiled = compile_schedule(schedule)
+        self.assertTrue(compiled.is_open(datetime_to_minute(datetime(2026, 2, 11, 9, 30))))
+        rows = len(compiled.mask)
+        self.assertTrue(compiled.is_open(datetime_to_minute(datetime(2020, 2, 11, 9, 30))))
+        self.assertTrue(compiled.is_open(datetime_to_minute(datetime(2030, 2, 11, 9, 30))))
+        self.assertGreater(len(compiled.mask), rows)
+        self.assertEqual(next_market_open(datetime(2030, 2, 11, 12, 0), schedule), datetime(2030, 2, 12, 9, 0))
+
+    def test_seconds_keep_exact_session_end(self):
+        schedule = load_market_schedule({"market_hours": {"sessions": [{"start": "09:00", "end": "11:30"}]}})
+        self.assertTrue(is_market_open(datetime(2026, 2, 11, 11, 30), schedule))
+        self.assertFalse(is_market_open(datetime(2026, 2, 11, 11, 30, 30), schedule))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -4,7 +4,7 @@ import os
 import tempfile
 import unittest
 
-from paper_consistency_check import build_report, check_trades, write_report
+from paper_consistency_check import IncrementalTradeCheck, build_report, check_trades, write_report
 
 
 class PaperConsistencyCheckTest(unittest.TestCase):
@@ -82,6 +82,40 @@ class PaperConsistencyCheckTest(unittest.TestCase):
             self.assertFalse(data["ok"])
             self.assertEqual(data["error_count"], 2)
 
+    def test_incremental_check_validates_appended_csv_rows(self):
+        fields = ["direction", "entry_price", "exit_price", "size", "gross_pnl", "commission", "pnl"]
+        good = {"direction": "LONG", "entry_price": 100, "exit_price": 101, "size": 1, "gross_pnl": 10, "commission": 2, "pnl": 8}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trades.csv")
+            check = IncrementalTradeCheck(path)
+            self.assertEqual(check.update(), [f"missing file: {path}"])
+
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                writer.writerows([good, dict(good, pnl=9)])
+            self.assertEqual(check.update(), ["row 2: pnl mismatch gross=10.0 fee=2.0 pnl=9.0"])
+
+            with open(path, "a", newline="", encoding="utf-8") as f:
+                csv.DictWriter(f, fieldnames=fields).writerow(dict(good, size=0))
+            errors = check.update()
+            self.assertEqual(len(errors), 2)
+            self.assertTrue(errors[1].startswith("row 3: invalid size"))
+            self.assertEqual(check.update(), errors)
+            report = check.report()
+            self.assertFalse(report["ok"])
+            self.assertEqual(report["trades_path"], path)
+            self.assertEqual(report["checked_trades"], 3)
+            self.assertEqual(report["error_count"], 2)
+
+            # A rewritten file is checked again from its first row.
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                writer.writerow(good)
+            self.assertEqual(check.update(), [])
+            self.assertEqual(check.report()["checked_trades"], 1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,74 @@
+import threading
+import unittest
+
+from backtest_fixtures import basic_config, sawtooth_bars
+
+from engine.backtest_eval import run_once
+from engine.parallel_eval import (
+    SharedArray,
+    TaskCancelled,
+    evaluate_candidates,
+    parallel_map,
+    resolve_workers,
+    run_tasks,
+)
+
+
+def _scaled(shared, item):
+    return shared * item
+
+
+def _shared_sum(shared, item):
+    return float(shared.array[item:].sum())
+
+
+class ParallelEvalTest(unittest.TestCase):
+    def test_resolve_workers(self):
+        self.assertEqual(resolve_workers(3), 3)
+        self.assertGreaterEqual(resolve_workers(0), 1)
+        self.assertGreaterEqual(resolve_workers(None), 1)
+
+    def test_parallel_map_keeps_item_order(self):
+        items = list(range(25))
+        self.assertEqual(parallel_map(_scaled, items, shared=3, workers=2, chunksize=2), [3 * i for i in items])
+        self.assertEqual(parallel_map(_scaled, items, shared=3, workers=1), [3 * i for i in items])
+        self.assertEqual(parallel_map(_scaled, [], shared=3, workers=4), [])
+
+    def test_evaluate_candidates_matches_serial_run_once(self):
+        config = basic_config()
+        bars = sawtooth_bars(150)
+        candidates = [
+            {"name": "ma", "fast": f, "slow": s, "mode": "trend", "min_diff": 0.0}
+            for f, s in [(3, 8), (5, 20), (4, 12)]
+        ]
+        expected = [run_once(config, bars, c) for c in candidates]
+        self.assertEqual(evaluate_candidates(config, bars, candidates, workers=2), expected)
+
+    def test_run_tasks_reports_progress_and_cancels(self):
+        seen = []
+        out = run_tasks(_scaled, range(10), shared=2, workers=2, chunksize=3, progress=lambda d, t: seen.append((d, t)))
+        self.assertEqual(out, [2 * i for i in range(10)])
+        # Chunks (3, 3, 3, 1) may finish in any order; done counts only ever grow.
+        self.assertEqual(len(seen), 4)
+        self.assertEqual([d for d, _ in seen], sorted(d for d, _ in seen))
+        self.assertEqual(seen[-1], (10, 10))
+        self.assertTrue(all(t == 10 for _, t in seen))
+
+        cancel = threading.Event()
+
+        def stop_after_first(done, total):
+            cancel.set()
+
+        with self.assertRaises(TaskCancelled):
+            run_tasks(_scaled, range(10), shared=2, workers=1, chunksize=2, progress=stop_after_first, cancel=cancel)
+        with self.assertRaises(TaskCancelled):
+            run_tasks(_scaled, range(10), shared=2, workers=2, cancel=lambda: True)
+
+    def test_shared_array_is_read_by_workers(self):
+        with SharedArray([1.0, 2.0, 3.0, 4.0]) as prices:
+            out = parallel_map(_shared_sum, range(4), shared=prices, workers=2, chunksize=1)
+        self.assertEqual(out, [10.0, 9.0, 7.0, 4.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
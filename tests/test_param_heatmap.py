@@ -1,6 +1,14 @@
+import os
+import tempfile
 import unittest
+from datetime import datetime
 
-from param_heatmap import build_windows, stability_of
+from backtest_fixtures import session_config, wave_bars
+
+from engine.backtest_eval import run_once
+from engine.cost_sweep import apply_cost_scenario
+from engine.result_cache import ResultCache
+from param_heatmap import build_windows, evaluate_windows, stability_of
 
 
 class ParamHeatmapTest(unittest.TestCase):
@@ -17,6 +25,28 @@ class ParamHeatmapTest(unittest.TestCase):
         self.assertEqual(len(windows[0]), 4)
         self.assertEqual(windows[-1][-1]["datetime"], bars[-1]["datetime"])
 
+    def test_evaluate_windows_with_cost_scenarios_and_cache(self):
+        cfg = session_config()
+        bars = wave_bars(900, 25, 35.0, start=datetime(2026, 2, 9, 8, 30))
+        windows = build_windows(bars, window_bars=450, window_step=450)
+        strategies = [
+            {"name": "ma", "fast": fast, "slow": 12, "mode": "trend", "min_diff": 0.0, "trade_start": "09:10"}
+            for fast in (3, 5)
+        ]
+        scenarios = [{"name": "slip=3", "slippage": 3}]
+        expected = [
+            [[run_once(cfg, wb, sc), run_once(apply_cost_scenario(cfg, scenarios[0]), wb, sc)] for wb in windows]
+            for sc in strategies
+        ]
+        self.assertTrue(any(cell[0]["trades"] for row in expected for cell in row))
+        self.assertEqual(evaluate_windows(cfg, windows, strategies, scenarios), expected)
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResultCache(os.path.join(tmp, "results.db"))
+            self.assertEqual(evaluate_windows(cfg, windows, strategies, scenarios, cache=cache), expected)
+            self.assertEqual(evaluate_windows(cfg, windows, strategies, scenarios, cache=cache), expected)
+            self.assertEqual((cache.misses, cache.hits), (8, 8))
+            cache.close()
+
 
 if __name__ == "__main__":
     unittest.main()
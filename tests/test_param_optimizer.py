@@ -0,0 +1,114 @@
+import random
+import unittest
+
+from engine.param_optimizer import (
+    evaluate_grid_with_drawdown,
+    evaluate_params,
+    evaluate_params_with_drawdown,
+    pick_best_params,
+    pick_best_params_scored,
+    window_sums,
+)
+
+
+def _tick_walk(n, seed):
+    rng = random.Random(seed)
+    price = 3000.0
+    prices = []
+    for _ in range(n):
+        price += rng.choice([-2, -1, 0, 0, 1, 2]) * 0.5
+        prices.append(price)
+    return prices
+
+
+def _sub_tick_walk(n, tick, seed):
+    # Integer tick counts plus the float closes a feed would deliver for them.
+    rng = random.Random(seed)
+    level = 30000
+    ticks = []
+    for _ in range(n):
+        level += rng.choice([-2, -1, 0, 0, 1, 2])
+        ticks.append(level)
+    return ticks, [round(t * tick, 6) for t in ticks]
+
+
+def _exact_stats(ticks, prices, fast, slow):
+    # evaluate_params_with_drawdown with the crossover decided on integer tick sums.
+    position = 0
+    entry = 0.0
+    pnl = 0.0
+    peak = 0.0
+    max_dd = 0.0
+    trades = 0
+    for i in range(slow, len(prices)):
+        gap = sum(ticks[i - fast:i]) * slow - sum(ticks[i - slow:i]) * fast
+        signal = 1 if gap > 0 else -1 if gap < 0 else 0
+        if position == 0 and signal != 0:
+            position = signal
+            entry = prices[i]
+        elif position != 0 and signal != 0 and signal != position:
+            pnl += (prices[i] - entry) * position
+            peak = max(peak, pnl)
+            max_dd = max(max_dd, peak - pnl)
+            trades += 1
+            position = signal
+            entry = prices[i]
+    if position != 0:
+        pnl += (prices[-1] - entry) * position
+        peak = max(peak, pnl)
+        max_dd = max(max_dd, peak - pnl)
+        trades += 1
+    return {"pnl": pnl, "max_drawdown": max_dd, "trades": trades}
+
+
+class ParamOptimizerTest(unittest.TestCase):
+    def test_grid_matches_scalar_evaluator(self):
+        candidates = [{"fast": f, "slow": s} for f in range(1, 9) for s in range(2, 40, 3)]
+        candidates.append({"fast": 12, "slow": 6})
+        for seed in range(4):
+            prices = _tick_walk(300, seed)
+            results = evaluate_grid_with_drawdown(prices, candidates)
+            for c, stats in zip(candidates, results):
+                self.assertEqual(stats, evaluate_params_with_drawdown(prices, c["fast"], c["slow"]))
+
+    def test_sub_unit_ticks_match_exact_crossovers(self):
+        # With 0.1 / 0.2 ticks equal tick sums round differently in a sliding sum and a
+        # fresh one; both evaluators must still see the exact ties.
+        candidates = [{"fast": f, "slow": s} for f in range(1, 7) for s in range(2, 25, 2) if f <= s]
+        for tick, seed in ((0.1, 1), (0.2, 2), (0.1, 3), (0.2, 4)):
+            ticks, prices = _sub_tick_walk(600, tick, seed)
+            results = evaluate_grid_with_drawdown(prices, candidates)
+            for c, stats in zip(candidates, results):
+                expected = _exact_stats(ticks, prices, c["fast"], c["slow"])
+                self.assertEqual(evaluate_params_with_drawdown(prices, c["fast"], c["slow"]), expected, (tick, seed, c))
+                self.assertEqual(stats, expected, (tick, seed, c))
+
+    def test_window_sums_across_blocks(self):
+        values = [float(i % 7) - 3.0 for i in range(50)]
+        for window in (1, 3, 8, 50):
+            sums = window_sums(values, window, block=8)
+            self.assertEqual(list(sums[:window]), [0.0] * window)
+            for i in range(window, len(values) + 1):
+                self.assertEqual(sums[i], sum(values[i - window:i]))
+
+    def test_grid_short_series_returns_none(self):
+        self.assertEqual(evaluate_grid_with_drawdown([1.0, 2.0, 3.0], [{"fast": 2, "slow": 5}]), [None])
+
+    def test_pick_best_uses_grid_and_keeps_first_on_ties(self):
+        prices = _tick_walk(400, 11)
+        candidates = [{"fast": 3, "slow": 8}, {"fast": 5, "slow": 20}, {"fast": 3, "slow": 8}]
+        best, score, stats = pick_best_params_scored(prices, candidates, objective="pnl_dd", dd_penalty=0.5)
+        expected = max(
+            candidates,
+            key=lambda c: evaluate_params_with_drawdown(prices, c["fast"], c["slow"])["pnl"]
+            - 0.5 * evaluate_params_with_drawdown(prices, c["fast"], c["slow"])["max_drawdown"],
+        )
+        self.assertIs(best, expected)
+        self.assertEqual(stats, evaluate_params_with_drawdown(prices, best["fast"], best["slow"]))
+
+        best_pnl, pnl = pick_best_params(prices, candidates)
+        self.assertEqual(pnl, max(evaluate_params(prices, c["fast"], c["slow"]) for c in candidates))
+
+
+if __name__ == "__main__":
+    unittest.main()
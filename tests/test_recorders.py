@@ -0,0 +1,101 @@
+import csv
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from engine.execution_sim import SimExecution
+from engine.perf_report import build_monthly_metrics
+from engine.recorders import EQUITY_FIELDS, TRADE_FIELDS, EquityRecorder, TradeRecord, TradeRecorder
+
+
+class RecordersTest(unittest.TestCase):
+    def _curve(self, n):
+        curve = EquityRecorder(capacity=2)
+        for i in range(n):
+            curve.append(i, 1000.0 + i, 0.0, 1000.0 + i, float(i % 3), f"2026-02-{1 + i // 10:02d} 09:{i % 60:02d}")
+        return curve
+
+    def test_equity_recorder_grows_and_yields_rows(self):
+        curve = self._curve(25)
+        self.assertEqual(len(curve), 25)
+        self.assertEqual(
+            curve[3],
+            {"step": 3, "cash": 1003.0, "unrealized": 0.0, "equity": 1003.0, "drawdown": 0.0, "datetime": "2026-02-01 09:03"},
+        )
+        self.assertEqual(curve[-1]["step"], 24)
+        self.assertEqual(list(curve), curve[:])
+        with self.assertRaises(IndexError):
+            curve[25]
+        cols = curve.to_numpy()
+        self.assertEqual(cols["equity"].tolist(), [row["equity"] for row in curve])
+        self.assertEqual(cols["datetime"][0], "2026-02-01 09:00")
+        self.assertEqual(curve.column("equity"), cols["equity"].tolist())
+        self.assertEqual(curve.column("datetime"), cols["datetime"].tolist())
+        with self.assertRaises(KeyError):
+            curve.column("missing")
+
+    def test_equity_csv_and_binary_output(self):
+        curve = self._curve(12)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "equity_curve.csv")
+            curve.write_csv(path)
+            with open(path, "r", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+            self.assertEqual(tuple(rows[0].keys()), EQUITY_FIELDS)
+            self.assertEqual([float(r["equity"]) for r in rows], [r["equity"] for r in curve])
+            self.assertEqual(rows[5]["datetime"], "2026-02-01 09:05")
+
+            npz = os.path.join(tmp, "equity_curve.npz")
+            curve.write_binary(npz)
+            with np.load(npz) as data:
+                self.assertEqual(data["step"].tolist(), list(range(12)))
+                self.assertEqual(data["drawdown"].tolist(), [float(i % 3) for i in range(12)])
+
+    def test_trade_record_behaves_like_trade_dict(self):
+        ex = SimExecution(slippage=0, contract_multiplier=10, commission_per_contract=1.0)
+        ex.send_order("M", 1, 100.0, 2, bar_time="2026-02-11 09:00")
+        ex.force_close(101.0, bar_time="2026-02-11 09:30")
+        trade = ex.trades[0]
+        self.assertIsInstance(trade, TradeRecord)
+        self.assertEqual(trade.keys(), list(TRADE_FIELDS))
+        self.assertEqual(trade["pnl"], trade.get("pnl"))
+        self.assertEqual(trade.to_dict()["exit_time"], "2026-02-11 09:30")
+        self.assertEqual(trade, trade.to_dict())
+        self.assertIsNone(trade.get("missing"))
+        with self.assertRaises(KeyError):
+            trade["missing"]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trades.csv")
+            ex.trades.write_csv(path)
+            with open(path, "r", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(float(rows[0]["gross_pnl"]), trade["gross_pnl"])
+        self.assertEqual(rows[0]["cost_profile"], "default")
+
+        cols = ex.trades.to_numpy()
+        self.assertEqual(cols["pnl"].tolist(), [trade["pnl"]])
+        self.assertEqual(cols["direction"].tolist(), ["LONG"])
+        self.assertEqual(ex.trades.column("exit_time"), ["2026-02-11 09:30"])
+
+    def test_empty_trades_keep_header(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trades.csv")
+            TradeRecorder().write_csv(path)
+            with open(path, "r", encoding="utf-8") as f:
+                self.assertEqual(f.read().strip(), ",".join(TRADE_FIELDS))
+
+    def test_perf_report_reads_recorder_columns(self):
+        curve = self._curve(30)
+        trades = TradeRecorder([TradeRecord(exit_time="2026-02-02 09:00", pnl=5.0)])
+        self.assertEqual(
+            build_monthly_metrics(curve, trades),
+            build_monthly_metrics(list(curve), [trades[0].to_dict()]),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+
+from backtest_fixtures import basic_config, sawtooth_bars
+
+from engine.backtest_eval import run_once
+from engine.bar_store import BarSeries
+from engine.parallel_eval import evaluate_candidates
+from engine.result_cache import ResultCache, backtest_key, hash_bars, open_result_cache, run_once_cached
+
+
+CANDIDATES = [
+    {"name": "ma", "fast": f, "slow": s, "mode": "trend", "min_diff": 0.0} for f, s in [(3, 8), (5, 20), (4, 12)]
+]
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache", "results.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_keys_follow_data_config_sections_and_params(self):
+        bars = sawtooth_bars(50)
+        config = basic_config()
+        self.assertEqual(hash_bars(bars), hash_bars(BarSeries.from_bars(bars)))
+        changed = [dict(b) for b in bars]
+        changed[10]["close"] += 0.5
+        self.assertNotEqual(hash_bars(bars), hash_bars(changed))
+
+        h = hash_bars(bars)
+        key = backtest_key(h, config, CANDIDATES[0])
+        self.assertEqual(key, backtest_key(h, dict(config, strategy={"fast": 99}), CANDIDATES[0]))
+        self.assertNotEqual(key, backtest_key(h, dict(config, symbol="RB2610"), CANDIDATES[0]))
+        self.assertNotEqual(key, backtest_key(h, dict(config, risk=dict(config["risk"], risk_per_trade=0.02)), CANDIDATES[0]))
+        self.assertNotEqual(key, backtest_key(h, config, CANDIDATES[1]))
+
+    def test_symbol_seeds_fill_draws_so_it_is_keyed(self):
+        config = basic_config()
+        config["contract"] = dict(config["contract"], fill_ratio_min=0.5, fill_ratio_max=1.0)
+        other = dict(config, symbol="RB2610")
+        bars = sawtooth_bars(200)
+        cache = ResultCache(self.path)
+        first = run_once_cached(config, bars, CANDIDATES[0], cache=cache)
+        second = run_once_cached(other, bars, CANDIDATES[0], cache=cache)
+        self.assertNotEqual(first, second)
+        self.assertEqual(second, run_once(other, bars, CANDIDATES[0]))
+        self.assertEqual(cache.hits, 0)
+        cache.close()
+
+    def test_cached_evaluation_matches_and_counts_hits(self):
+        config = basic_config()
+        bars = sawtooth_bars(200)
+        expected = [run_once(config, bars, c) for c in CANDIDATES]
+        cache = ResultCache(self.path)
+        self.assertEqual(evaluate_candidates(config, bars, CANDIDATES, cache=cache), expected)
+        self.assertEqual((cache.hits, cache.misses, cache.stores), (0, 3, 3))
+        self.assertEqual(evaluate_candidates(config, bars, CANDIDATES[1:], cache=cache), expected[1:])
+        self.assertEqual(run_once_cached(config, bars, CANDIDATES[0], cache=cache), expected[0])
+        metrics = cache.metrics()
+        self.assertEqual((metrics["hits"], metrics["misses"], metrics["entries"]), (3, 3, 3))
+        cache.close()
+
+        # A new process sees the stored results.
+        reopened = ResultCache(self.path)
+        self.assertEqual(evaluate_candidates(config, bars, CANDIDATES, workers=2, cache=reopened), expected)
+        self.assertEqual(reopened.hits, 3)
+        reopened.close()
+
+    def test_lru_eviction(self):
+        cache = ResultCache(self.path, max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertEqual(cache.get_many(["a", "b", "c"]), {"a": 1, "c": 3})
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.cached(["c", "d", "d"], lambda missing: [v * 10 for v in missing]), [3, 10, 10])
+        self.assertEqual(cache.entries(), 2)
+        cache.close()
+
+    def test_open_from_config(self):
+        self.assertIsNone(open_result_cache({"backtest_cache": {"enabled": False}}))
+        self.assertIsNone(open_result_cache({}, enabled=False))
+        cache = open_result_cache({"backtest_cache": {"path": self.path, "max_entries": 10}})
+        self.assertEqual((cache.path, cache.max_entries), (self.path, 10))
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,45 @@
+import random
 import unittest
 
-from engine.rsi_tuner import evaluate_candidate_walk_forward, evaluate_rsi_ma_params_with_drawdown
+from engine.rsi_tuner import (
+    RSIMAWalkForward,
+    evaluate_candidate_walk_forward,
+    evaluate_candidates_walk_forward,
+    evaluate_rsi_ma_grid_with_drawdown,
+    evaluate_rsi_ma_params_with_drawdown,
+)
+from engine.strategy import RSIMAStrategy
+
+
+def _reference_stats(prices, params):
+    # The original bar-by-bar loop driving RSIMAStrategy with growing price prefixes.
+    slow = params["slow"]
+    rsi_period = params["rsi_period"]
+    min_required = max(slow, rsi_period + 1)
+    if len(prices) < min_required:
+        return None
+    strategy = RSIMAStrategy(**params)
+    position, entry, pnl, peak, max_dd, trades = 0, 0.0, 0.0, 0.0, 0.0, 0
+    for i in range(min_required - 1, len(prices)):
+        signal = strategy.generate_signal(prices[: i + 1], step=i)
+        price = prices[i]
+        if position == 0 and signal != 0:
+            position, entry = signal, price
+            continue
+        if position != 0 and signal != 0 and signal != position:
+            trade_pnl = (price - entry) * position
+            pnl += trade_pnl
+            peak = max(peak, pnl)
+            max_dd = max(max_dd, peak - pnl)
+            trades += 1
+            strategy.on_trade_close(trade_pnl, i)
+            position, entry = signal, price
+    if position != 0:
+        pnl += (prices[-1] - entry) * position
+        peak = max(peak, pnl)
+        max_dd = max(max_dd, peak - pnl)
+        trades += 1
+    return {"pnl": pnl, "max_drawdown": max_dd, "trades": trades}
 
 
 class RSITunerTest(unittest.TestCase):
@@ -47,6 +86,90 @@ class RSITunerTest(unittest.TestCase):
         self.assertTrue(summary["windows_valid"] >= 0)
         self.assertIn("test_total_pnl", summary)
 
+    def test_linear_evaluator_matches_strategy_loop(self):
+        rng = random.Random(7)
+        for _ in range(60):
+            price = 100.0
+            prices = []
+            for _ in range(rng.randint(30, 300)):
+                price += rng.choice([rng.gauss(0, 1), 0.0, 1.0, -1.0])
+                prices.append(round(price, 2))
+            params = {
+                "fast": rng.randint(2, 12),
+                "slow": rng.randint(5, 30),
+                "rsi_period": rng.randint(2, 16),
+                "rsi_overbought": rng.choice([55, 60, 100]),
+                "rsi_oversold": rng.choice([0, 40, 45]),
+                "min_diff": rng.choice([0.0, 0.2]),
+                "cooldown_bars": rng.choice([0, 5]),
+                "max_consecutive_losses": rng.choice([None, 2]),
+                "trend_filter": rng.choice([False, True]),
+                "trend_window": rng.randint(10, 40),
+            }
+            with self.subTest(params=params):
+                self.assertEqual(evaluate_rsi_ma_params_with_drawdown(prices, params), _reference_stats(prices, params))
+
+    def test_sub_unit_ticks_match_strategy_loop(self):
+        # 0.1 / 0.2 ticks: MA equality, min_diff and RSI levels are hit exactly in tick
+        # arithmetic but round differently in prefix sums and rolling sums.
+        rng = random.Random(21)
+        for case in range(80):
+            tick = (0.1, 0.2)[case % 2]
+            level = rng.randint(20000, 40000)
+            prices = []
+            for _ in range(rng.randint(40, 400)):
+                level += rng.choice([-2, -1, 0, 0, 1, 2])
+                prices.append(round(level * tick, 6))
+            slow = rng.randint(2, 24)
+            params = {
+                "fast": rng.randint(1, slow),
+                "slow": slow,
+                "rsi_period": rng.choice([2, 4, 5, 8, 10]),
+                "rsi_overbought": rng.choice([50, 60, 75, 80]),
+                "rsi_oversold": rng.choice([20, 25, 40, 50]),
+                "min_diff": rng.choice([0.0, tick, 2 * tick, 0.05]),
+                "cooldown_bars": rng.choice([0, 3]),
+                "max_consecutive_losses": rng.choice([None, 3]),
+                "trend_filter": rng.choice([False, True]),
+                "trend_window": rng.randint(4, 30),
+            }
+            with self.subTest(tick=tick, params=params):
+                self.assertEqual(evaluate_rsi_ma_params_with_drawdown(prices, params), _reference_stats(prices, params))
+
+    def test_grid_and_batch_walk_forward_match_single_calls(self):
+        prices = [100 + (i % 12) + (i % 7) * 0.5 for i in range(300)]
+        base = {"rsi_period": 6, "rsi_overbought": 60, "rsi_oversold": 40, "cooldown_bars": 3}
+        candidates = [{"fast": f, "slow": s} for f in (3, 5) for s in (8, 12, 400)]
+        grid = evaluate_rsi_ma_grid_with_drawdown(prices, [dict(base, **c) for c in candidates])
+        self.assertEqual(grid, [evaluate_rsi_ma_params_with_drawdown(prices, dict(base, **c)) for c in candidates])
+        self.assertIsNone(grid[2])
+        batch = evaluate_candidates_walk_forward(prices, candidates, 120, 60, 60, base, min_trades=1)
+        single = [evaluate_candidate_walk_forward(prices, c, 120, 60, 60, base, min_trades=1) for c in candidates]
+        self.assertEqual(batch, single)
+        self.assertEqual(batch[2]["windows_valid"], 0)
+        parallel = evaluate_candidates_walk_forward(prices, candidates, 120, 60, 60, base, min_trades=1, workers=2)
+        self.assertEqual(parallel, batch)
+
+    def test_full_series_signals_match_slice_evaluation(self):
+        rng = random.Random(11)
+        price = 3000.0
+        prices = []
+        for _ in range(600):
+            price += rng.choice([-2, -1, 0, 0, 1, 2]) * 0.1
+            prices.append(round(price, 6))
+        base = {"rsi_period": 6, "rsi_overbought": 60, "rsi_oversold": 40, "trend_window": 30}
+        params_list = [
+            dict(base, fast=3, slow=10),
+            dict(base, fast=5, slow=5, min_diff=0.1, trend_filter=True),
+            dict(base, fast=4, slow=12, cooldown_bars=4, max_consecutive_losses=3),
+            dict(base, fast=15, slow=8),
+            dict(base, fast=2, slow=6, rsi_overbought=50, rsi_oversold=50, trend_filter=True),
+        ]
+        engine = RSIMAWalkForward(prices, params_list)
+        for start, end in ((0, 600), (25, 200), (333, 345), (590, 600)):
+            expected = [evaluate_rsi_ma_params_with_drawdown(prices[start:end], p) for p in params_list]
+            self.assertEqual(engine.window_stats(start, end), expected)
+
 
 if __name__ == "__main__":
     unittest.main()
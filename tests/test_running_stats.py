@@ -0,0 +1,48 @@
+import math
+import random
+import unittest
+
+from engine.running_stats import RunningStats
+
+
+class RunningStatsTest(unittest.TestCase):
+    def test_trade_summary_matches_rescan(self):
+        random.seed(7)
+        trades = [{"pnl": round(random.gauss(0, 50), 2)} for _ in range(200)] + [{"pnl": 0.0}]
+        stats = RunningStats()
+        for i in range(0, len(trades), 17):
+            stats.sync_trades(trades[: i + 17])
+        wins = [t["pnl"] for t in trades if t["pnl"] > 0]
+        losses = [t["pnl"] for t in trades if t["pnl"] <= 0]
+        expected = (
+            len(trades),
+            sum(t["pnl"] for t in trades),
+            len(wins) / len(trades) * 100,
+            sum(wins) / len(wins),
+            sum(losses) / len(losses),
+            sum(wins) / abs(sum(losses)),
+            sum(t["pnl"] for t in trades) / len(trades),
+        )
+        self.assertEqual(stats.trade_summary(), expected)
+
+    def test_empty(self):
+        stats = RunningStats()
+        self.assertEqual(stats.trade_summary(), (0, 0.0, 0.0, 0, 0, 0.0, 0.0))
+        self.assertEqual(stats.max_drawdown, 0.0)
+        self.assertEqual(stats.sortino, 0.0)
+
+    def test_drawdown_and_sortino(self):
+        curve = [100.0, 110.0, 104.0, 120.0, 90.0, 95.0, 0.0, 10.0]
+        stats = RunningStats()
+        drawdowns = [stats.add_equity(eq) for eq in curve]
+        self.assertEqual(drawdowns, [0.0, 0.0, 6.0, 0.0, 30.0, 25.0, 120.0, 110.0])
+        self.assertEqual(stats.max_drawdown, 120.0)
+
+        returns = [(b - a) / a for a, b in zip(curve, curve[1:]) if a != 0]
+        downside = [r for r in returns if r < 0]
+        expected = (sum(returns) / len(returns)) / math.sqrt(sum(r * r for r in downside) / len(downside))
+        self.assertEqual(stats.sortino, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+import unittest
+
+from engine.runtime_state import RuntimeState
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class RuntimeStateTest(unittest.TestCase):
+    def test_low_priority_updates_are_coalesced(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = os.path.join(td, "state", "runtime_state.json")
+            runtime = RuntimeState(path, flush_interval=3600)
+            runtime.update({"last_step": 0})
+            self.assertEqual(_read(path)["last_step"], 0)
+            for step in range(1, 50):
+                runtime.update({"event": "tick", "last_step": step})
+            self.assertEqual(_read(path)["last_step"], 0)
+            self.assertEqual(runtime.load()["last_step"], 49)
+
+            runtime.update({"event": "trade_open", "position": {"direction": "LONG"}})
+            data = _read(path)
+            self.assertEqual(data["last_step"], 49)
+            self.assertEqual(data["event"], "trade_open")
+            self.assertFalse(os.path.exists(path + ".tmp"))
+
+    def test_flush_writes_pending_state(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = os.path.join(td, "runtime_state.json")
+            runtime = RuntimeState(path, flush_interval=3600)
+            runtime.update({"event": "tick", "last_step": 1})
+            runtime.update({"event": "tick", "last_step": 2})
+            runtime.flush()
+            self.assertEqual(_read(path)["last_step"], 2)
+
+    def test_event_ring_is_bounded_and_published(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = os.path.join(td, "runtime_state.json")
+            runtime = RuntimeState(path, max_events=3)
+            for i in range(5):
+                runtime.update({"event": "trade_close", "trades": i})
+            runtime.update({"event": "tick", "last_step": 9})
+            events = _read(path)["recent_events"]
+            self.assertEqual([e["trades"] for e in events], [2, 3, 4])
+            self.assertEqual([e["seq"] for e in events], [3, 4, 5])
+            self.assertEqual(runtime.recent_events(), events)
+
+    def test_existing_state_is_merged_unless_replaced(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = os.path.join(td, "runtime_state.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"symbol": "M2609", "recent_events": [{"seq": 1}]}, f)
+            runtime = RuntimeState(path)
+            runtime.update({"capital": 1.0})
+            data = _read(path)
+            self.assertEqual(data["symbol"], "M2609")
+            self.assertEqual(data["recent_events"], [])
+            runtime.update({"capital": 2.0}, replace=True)
+            self.assertNotIn("symbol", _read(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from engine.series_window import CloseBuffer, SeriesWindow
+
+
+class SeriesWindowTest(unittest.TestCase):
+    def test_window_matches_prefix_slice(self):
+        data = [1.0, 2.0, 3.0, 4.0, 5.0]
+        view = SeriesWindow(data, 3)
+        self.assertEqual(len(view), 3)
+        self.assertEqual(view[-1], 3.0)
+        self.assertEqual(view[-2], 2.0)
+        self.assertEqual(view[-2:], [2.0, 3.0])
+        self.assertEqual(view[-10:], [1.0, 2.0, 3.0])
+        self.assertEqual(list(view), [1.0, 2.0, 3.0])
+        self.assertEqual(sum(view[-3:]), 6.0)
+        with self.assertRaises(IndexError):
+            view[3]
+        with self.assertRaises(IndexError):
+            view[-4]
+
+    def test_close_buffer_sync_rebuilds_on_mismatch(self):
+        bars = [{"close": float(i)} for i in range(5)]
+        buf = CloseBuffer()
+        buf.sync(bars, 3)
+        self.assertEqual(buf.closes, [0.0, 1.0, 2.0])
+        buf.append(3.0)
+        buf.sync(bars, 4)
+        self.assertEqual(len(buf), 4)
+
+        rewritten = [{"close": float(i) + 0.5} for i in range(5)]
+        buf.sync(rewritten, 4)
+        self.assertEqual(buf.window()[-1], 3.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
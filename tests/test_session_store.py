@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+
+from engine.session_store import SessionStore
+
+
+class SessionStoreTest(unittest.TestCase):
+    def test_snapshot_and_journal_tail(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SessionStore(os.path.join(tmp, "sim_live"))
+            self.assertEqual(store.load(), (None, []))
+
+            store.append_journal({"seq": 1, "capital": 1.0})
+            store.save_snapshot({"seq": 1, "value": [1, 2, 3]})
+            self.assertEqual(os.path.getsize(store.journal_path), 0)
+            store.append_journal({"seq": 2, "capital": 2.0})
+            store.append_journal({"seq": 3, "capital": 3.0})
+            snapshot, tail = store.load()
+            self.assertEqual(snapshot["value"], [1, 2, 3])
+            self.assertEqual([e["seq"] for e in tail], [2, 3])
+
+    def test_ignores_covered_and_torn_journal_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SessionStore(tmp)
+            store.save_snapshot({"seq": 5})
+            with open(store.journal_path, "a", encoding="utf-8") as f:
+                f.write('{"seq": 4}\n{"seq": 6}\n{"seq": 7, "cap')
+            self.assertEqual(store.load()[1], [{"seq": 6}])
+
+            with open(store.snapshot_path, "w", encoding="utf-8") as f:
+                f.write('{"seq": 5, "version": 1}')
+            self.assertEqual(store.load(), (None, []))
+            with open(store.snapshot_path, "w", encoding="utf-8") as f:
+                f.write("not json")
+            self.assertEqual(store.load(), (None, []))
+            store.clear()
+            self.assertFalse(os.path.exists(store.journal_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,8 +2,14 @@ import unittest
 import tempfile
 import json
 import os
+import random
 
+from engine.bar_store import make_bar
+from engine.recorders import TradeRecord
+from engine.runtime_state import RuntimeState
+from engine.session_store import SessionStore
 from sim_live_runner import (
+    ContinuousPaperSession,
     _build_dq_report,
     compute_runtime_metrics,
     get_drawdown_alert_threshold,
@@ -82,6 +88,99 @@ class SimLiveRunnerTest(unittest.TestCase):
         cfg_b = {"market_hours": {"sessions": [{"start": "21:00", "end": "02:30"}]}}
         self.assertNotEqual(market_hours_signature(cfg_a), market_hours_signature(cfg_b))
 
+    def test_flush_outputs_appends_new_rows(self):
+        with open("config_template.json", "r", encoding="utf-8-sig") as f:
+            cfg = json.load(f)
+        with tempfile.TemporaryDirectory() as tmp:
+            session = ContinuousPaperSession(cfg=cfg, symbol="M2605", output_dir=tmp)
+            trade = TradeRecord(direction="LONG", entry_price=100.0, exit_price=101.0, size=1.0, gross_pnl=10.0, commission=2.0, pnl=8.0)
+            session.equity_curve.append(0, 100000.0, 0.0, 100000.0, 0.0, "2026-02-11 09:00")
+            session.flush_outputs()
+            session.equity_curve.append(1, 100008.0, 0.0, 100008.0, 0.0, "2026-02-11 09:01")
+            session.execution.trades.append(trade)
+            _, errors = session.flush_outputs()
+            self.assertEqual(errors, [])
+
+            full = os.path.join(tmp, "full.csv")
+            for name, recorder in (("equity_curve.csv", session.equity_curve), ("trades.csv", session.execution.trades)):
+                recorder.write_csv(full)
+                with open(os.path.join(tmp, name), "r", encoding="utf-8") as a, open(full, "r", encoding="utf-8") as b:
+                    self.assertEqual(a.read(), b.read())
+
+            # A file changed behind the session's back is rewritten in full.
+            with open(os.path.join(tmp, "equity_curve.csv"), "w", encoding="utf-8") as f:
+                f.write("step\n")
+            session.flush_outputs()
+            with open(os.path.join(tmp, "equity_curve.csv"), "r", encoding="utf-8") as f:
+                self.assertEqual(len(f.read().splitlines()), 3)
+            with open(os.path.join(tmp, "paper_check_report.json"), "r", encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["checked_trades"], 1)
+
+    def test_resume_restores_snapshot_and_replays_journal_tail(self):
+        with open("config_template.json", "r", encoding="utf-8-sig") as f:
+            cfg = json.load(f)
+        cfg["strategy"].update({"name": "ma", "fast": 3, "slow": 8, "trade_start": "", "trade_end": ""})
+        rng = random.Random(7)
+        bars = []
+        price = 3000.0
+        for i in range(600):
+            price += rng.gauss(0, 8)
+            dt = f"2026-02-{10 + i // 200:02d} {9 + (i % 200) // 60:02d}:{i % 200 % 60:02d}"
+            bars.append(make_bar(dt, price, price + 2, price - 2, price))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            runtime = RuntimeState(os.path.join(tmp, "runtime_state.json"))
+            store = SessionStore(os.path.join(tmp, "state"))
+
+            full = ContinuousPaperSession(cfg=cfg, symbol="M2605", output_dir=os.path.join(tmp, "full"))
+            full.process_bars(bars, 0, runtime)
+
+            crashed = ContinuousPaperSession(cfg=cfg, symbol="M2605", output_dir=os.path.join(tmp, "out"))
+            crashed.process_bars(bars[:300], 0, runtime)
+            crashed.checkpoint(store, snapshot=True)
+            crashed.process_bars(bars[:450], 300, runtime)
+            crashed.flush_outputs()
+            crashed.checkpoint(store)
+
+            resumed = ContinuousPaperSession(cfg=cfg, symbol="M2605", output_dir=os.path.join(tmp, "out"))
+            info = resumed.resume(store, bars, runtime)
+            self.assertEqual(info["replayed_bars"], 150)
+            self.assertTrue(info["consistent"])
+            self.assertEqual(resumed.last_processed_idx, 449)
+            resumed.process_bars(bars, 450, runtime)
+
+            self.assertGreater(len(full.execution.trades), 0)
+            self.assertEqual(resumed.capital, full.capital)
+            self.assertEqual(list(resumed.execution.trades), list(full.execution.trades))
+            self.assertEqual(list(resumed.equity_curve), list(full.equity_curve))
+
+            # The snapshot only counts trades; a second restart rebuilds them and the
+            # equity curve from the output CSVs, which end up identical to the full run's.
+            resumed.checkpoint(store, snapshot=True)
+            with open(store.snapshot_path, "r", encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["trades"], len(full.execution.trades))
+            self.assertEqual(store.load()[1], [])
+            again = ContinuousPaperSession(cfg=cfg, symbol="M2605", output_dir=os.path.join(tmp, "out"))
+            info = again.resume(store, bars, runtime)
+            self.assertEqual(info["replayed_bars"], 0)
+            self.assertEqual(again.capital, full.capital)
+            self.assertEqual(list(again.execution.trades), list(full.execution.trades))
+            self.assertEqual(list(again.equity_curve), list(full.equity_curve))
+            full.flush_outputs()
+            again.flush_outputs()
+            for name in ("equity_curve.csv", "trades.csv"):
+                with open(os.path.join(tmp, "full", name), "rb") as a, open(os.path.join(tmp, "out", name), "rb") as b:
+                    self.assertEqual(a.read(), b.read())
+
+            # Output CSVs that no longer match the snapshot are not resumed from.
+            with open(os.path.join(tmp, "out", "equity_curve.csv"), "w", encoding="utf-8") as f:
+                f.write("step\n")
+            out = os.path.join(tmp, "out")
+            self.assertIsNone(ContinuousPaperSession(cfg=cfg, symbol="M2605", output_dir=out).resume(store, bars, runtime))
+
+            other = dict(cfg, strategy=dict(cfg["strategy"], fast=4))
+            self.assertIsNone(ContinuousPaperSession(cfg=other, symbol="M2605", output_dir=tmp).resume(store, bars, runtime))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,139 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from engine.param_version_store import ParamVersionStore
+from engine.runtime_state import RuntimeState
+from engine.state_db import StateDB, state_options
+from engine.state_store import StateStore
+from engine.strategy_state import StrategyState
+
+
+class StateDBTest(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.td = self._td.name
+        self.db = StateDB(os.path.join(self.td, "state.db"))
+
+    def tearDown(self):
+        self.db.close()
+        self._td.cleanup()
+
+    def test_upsert_touches_only_given_keys(self):
+        self.db.upsert("ctp_state", {"md_connected": True, "symbol": "M2609"})
+        self.db.upsert("ctp_state", {"md_connected": False})
+        self.assertEqual(self.db.load("ctp_state"), {"md_connected": False, "symbol": "M2609"})
+        self.db.upsert("ctp_state", {"x": [1, 2]}, replace=True)
+        self.assertEqual(self.db.load("ctp_state"), {"x": [1, 2]})
+        mode = self.db._query("PRAGMA journal_mode")[0][0]
+        self.assertEqual(mode, "wal")
+
+    def test_transaction_rolls_back_every_write(self):
+        self.db.update_many({"a": {"k": 1}, "b": {"k": 1}})
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.update_many({"a": {"k": 2}, "b": {"k": 2}})
+                raise RuntimeError("boom")
+        self.assertEqual((self.db.get("a", "k"), self.db.get("b", "k")), (1, 1))
+
+    def test_other_connection_sees_only_committed_state(self):
+        reader = sqlite3.connect(self.db.path)
+        try:
+            with self.db.transaction():
+                self.db.upsert("runtime_state", {"last_step": 5})
+                self.assertEqual(reader.execute("SELECT COUNT(*) FROM kv").fetchone()[0], 0)
+            self.assertEqual(reader.execute("SELECT COUNT(*) FROM kv").fetchone()[0], 1)
+        finally:
+            reader.close()
+
+    def test_state_store_imports_existing_json(self):
+        path = os.path.join(self.td, "ctp_state.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"local_positions": {"M2609": 1}}, f)
+        store = StateStore(path, db=self.db, export_json=False)
+        store.update({"md_connected": True})
+        state = store.load()
+        self.assertEqual(state["local_positions"], {"M2609": 1})
+        self.assertTrue(state["md_connected"])
+        with open(path, "r", encoding="utf-8") as f:
+            self.assertNotIn("md_connected", json.load(f))
+
+    def test_strategy_state_exports_json_when_asked(self):
+        path = os.path.join(self.td, "strategy_state.json")
+        state = StrategyState(path, db=self.db, export_json=True)
+        state.save_params({"fast": 5, "slow": 20})
+        self.assertEqual(state.load()["params"], {"fast": 5, "slow": 20})
+        with open(path, "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["params"]["slow"], 20)
+
+    def test_runtime_state_flushes_changed_keys_and_event_ring(self):
+        path = os.path.join(self.td, "runtime_state.json")
+        self.db.upsert("runtime_state", {"symbol": "M2609", "stale": 1})
+        self.db.append_events("runtime_state", [{"seq": 9, "event": "old"}])
+        runtime = RuntimeState(path, max_events=3, db=self.db, export_json=False)
+        for i in range(5):
+            runtime.update({"event": "trade_close", "trades": i})
+        reader = RuntimeState(path, db=self.db, export_json=False).load()
+        self.assertEqual(reader["symbol"], "M2609")
+        self.assertEqual(reader["trades"], 4)
+        self.assertEqual([e["seq"] for e in reader["recent_events"]], [3, 4, 5])
+        self.assertFalse(os.path.exists(path))
+
+        runtime.update({"capital": 2.0}, replace=True)
+        reader = RuntimeState(path, db=self.db, export_json=False).load()
+        self.assertNotIn("symbol", reader)
+        self.assertEqual(reader["capital"], 2.0)
+        self.assertEqual(reader["recent_events"], [])
+
+    def test_replaced_runtime_state_restarts_the_event_ring_everywhere(self):
+        path = os.path.join(self.td, "runtime_state.json")
+        runtime = RuntimeState(path, db=self.db, export_json=True)
+        runtime.update({"event": "trade_open"})
+        runtime.update({"event": "trade_close"})
+        runtime.update({"event": "trade_open", "capital": 1.0}, replace=True)
+        with open(path, "r", encoding="utf-8") as f:
+            exported = json.load(f)["recent_events"]
+        stored = RuntimeState(path, db=self.db, export_json=False).load()["recent_events"]
+        self.assertEqual([e["seq"] for e in exported], [1])
+        self.assertEqual([e["seq"] for e in stored], [1])
+        self.assertEqual(runtime.recent_events(), exported)
+
+    def test_param_versions_are_indexed_rows(self):
+        path = os.path.join(self.td, "param_versions.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"versions": [{"version_id": "old1", "symbol": "M2609", "params": {"fast": 3},
+                                     "source": "manual", "created_at": "2020-01-01 00:00:00"}]}, f)
+        store = ParamVersionStore(path, db=self.db, export_json=False)
+        v1 = store.append("M2609", {"fast": 5}, "optimize")
+        v2 = store.append("M2609", {"fast": 6}, "optimize")
+        store.append("RB2610", {"fast": 7}, "optimize")
+        versions = store.list_versions(symbol="M2609", limit=10)
+        self.assertEqual([v["version_id"] for v in versions], [v1["version_id"], v2["version_id"], "old1"])
+        self.assertEqual(store.get(v2["version_id"])["params"], {"fast": 6})
+        self.assertIsNone(store.get("missing"))
+        plan = self.db._query(
+            "EXPLAIN QUERY PLAN SELECT * FROM param_versions WHERE symbol = ? ORDER BY created_at DESC", ("M2609",)
+        )
+        self.assertIn("idx_param_versions_symbol_created", " ".join(str(row) for row in plan))
+
+        cfg_path = os.path.join(self.td, "config.json")
+        with open(cfg_path, "w", encoding="utf-8") as f:
+            json.dump({"strategy": {"fast": 1}}, f)
+        strategy_path = os.path.join(self.td, "strategy_state.json")
+        store.rollback_to(cfg_path, "old1", strategy_state_path=strategy_path)
+        self.assertEqual(self.db.load("strategy_state")["params"]["fast"], 3)
+
+    def test_state_options_from_config(self):
+        self.assertEqual(state_options({}), {"db": None, "export_json": True})
+        options = state_options({"state": {"backend": "sqlite", "db_path": os.path.join(self.td, "cfg.db")}})
+        try:
+            self.assertIsInstance(options["db"], StateDB)
+            self.assertFalse(options["export_json"])
+        finally:
+            options["db"].close()
+
+
+if __name__ == "__main__":
+    unittest.main()
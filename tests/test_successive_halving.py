@@ -0,0 +1,64 @@
+import unittest
+
+from backtest_fixtures import basic_config, wave_bars
+
+from engine.parallel_eval import evaluate_candidates
+from engine.successive_halving import plan_rungs, run_search, score_stats, successive_halving
+
+
+def _candidates():
+    return [
+        {"name": "ma", "fast": fast, "slow": slow, "mode": "trend", "min_diff": 0.0}
+        for fast in (2, 3, 5)
+        for slow in (10, 20, 40)
+    ]
+
+
+class SuccessiveHalvingTest(unittest.TestCase):
+    def test_plan_rungs(self):
+        self.assertEqual(plan_rungs(2700, 27, eta=3, min_bars=1), [(100, 27), (300, 9), (900, 3), (2700, 1)])
+        self.assertEqual(plan_rungs(2700, 27, eta=3), [(300, 27), (900, 9), (2700, 3)])
+        self.assertEqual(plan_rungs(2700, 27, eta=3, keep=5, min_bars=1), [(300, 27), (900, 9), (2700, 5)])
+        self.assertEqual(plan_rungs(100, 27, eta=3), [(100, 27)])
+
+    def test_finalists_are_scored_on_all_bars_and_compute_is_saved(self):
+        config = basic_config()
+        bars = wave_bars(2400, 30, 40.0)
+        candidates = _candidates()
+        results, info = successive_halving(config, bars, candidates, eta=3, keep=2, min_bars=200)
+        self.assertEqual([r["candidates"] for r in info["rungs"]], [9, 3, 2])
+        self.assertEqual(info["rungs"][-1]["bars"], len(bars))
+        self.assertEqual(len(results), 2)
+        for candidate, stats in results:
+            self.assertEqual(stats, evaluate_candidates(config, bars, [candidate])[0])
+        self.assertEqual(info["full_grid_bar_evaluations"], len(bars) * len(candidates))
+        self.assertLess(info["bar_evaluations"], info["full_grid_bar_evaluations"])
+        self.assertGreater(info["saved_ratio"], 0.0)
+
+    def test_grid_mode_evaluates_every_candidate(self):
+        config = basic_config()
+        bars = wave_bars(600, 30, 40.0)
+        candidates = _candidates()
+        results, info = run_search(config, bars, candidates, search="grid")
+        self.assertEqual([c for c, _ in results], candidates)
+        self.assertEqual([s for _, s in results], evaluate_candidates(config, bars, candidates))
+        self.assertEqual(info["saved_ratio"], 0.0)
+        # Too few bars for a shorter rung: halving degrades to the full grid.
+        halving, halving_info = run_search(config, bars, candidates, search="halving")
+        self.assertEqual(halving, results)
+        self.assertEqual(halving_info["saved_ratio"], 0.0)
+        with self.assertRaises(ValueError):
+            run_search(config, bars, candidates, search="random")
+
+    def test_halving_keeps_the_grid_winner(self):
+        config = basic_config()
+        bars = wave_bars(2400, 30, 40.0)
+        candidates = _candidates()
+        grid, _ = run_search(config, bars, candidates, search="grid")
+        best = max(grid, key=lambda item: score_stats(item[1], 0.4))
+        halving, _ = successive_halving(config, bars, candidates, eta=3, keep=1, min_bars=200)
+        self.assertEqual(halving, [best])
+
+
+if __name__ == "__main__":
+    unittest.main()
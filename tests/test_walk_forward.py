@@ -1,6 +1,18 @@
+import random
 import unittest
 
-from engine.walk_forward import build_windows, run_walk_forward
+from engine.param_optimizer import evaluate_params_with_drawdown, pick_best_params_scored
+from engine.walk_forward import MAWalkForward, build_windows, run_walk_forward, summarize_candidates_walk_forward
+
+
+def _tick_walk(n, seed, tick=0.5):
+    rng = random.Random(seed)
+    level = 6000
+    prices = []
+    for _ in range(n):
+        level += rng.choice([-2, -1, 0, 0, 1, 2])
+        prices.append(round(level * tick, 6))
+    return prices
 
 
 class WalkForwardTest(unittest.TestCase):
@@ -32,6 +44,76 @@ class WalkForwardTest(unittest.TestCase):
         self.assertTrue(result["summary"]["windows_valid"] >= 1)
         self.assertIn("test_total_pnl", result["summary"])
 
+    def test_shared_engine_matches_per_window_evaluation(self):
+        candidates = [{"fast": f, "slow": s} for f in (1, 3, 5) for s in (4, 9, 21)] + [{"fast": 12, "slow": 6}]
+        for seed in range(3):
+            prices = _tick_walk(500, seed)
+            engine = MAWalkForward(prices, candidates)
+            for start, end in ((0, 500), (37, 160), (200, 226), (480, 500)):
+                expected = [evaluate_params_with_drawdown(prices[start:end], c["fast"], c["slow"]) for c in candidates]
+                self.assertEqual(engine.window_stats(start, end), expected)
+
+            result = run_walk_forward(prices, candidates, 120, 40, step_size=30, objective="pnl_dd", dd_penalty=0.5)
+            for row in result["rows"]:
+                train = prices[row["train_start"]: row["train_end"]]
+                best, score, stats = pick_best_params_scored(train, candidates, objective="pnl_dd", dd_penalty=0.5)
+                self.assertEqual((row["best_fast"], row["best_slow"]), (best["fast"], best["slow"]))
+                self.assertEqual((row["train_score"], row["train_pnl"]), (score, stats["pnl"]))
+                test = evaluate_params_with_drawdown(prices[row["test_start"]: row["test_end"]], best["fast"], best["slow"])
+                self.assertEqual((row["test_pnl"], row["test_trades"]), (test["pnl"], test["trades"]))
+
+    def test_sub_unit_ticks_match_per_window_evaluation(self):
+        # Full-series and per-slice averages of 0.1 / 0.2-tick prices round differently;
+        # ties must still come out the same in both.
+        candidates = [{"fast": f, "slow": s} for f in range(1, 7) for s in range(2, 22, 3) if f <= s]
+        for tick, seed in ((0.1, 1), (0.2, 2), (0.1, 5), (0.2, 6)):
+            prices = _tick_walk(800, seed, tick=tick)
+            engine = MAWalkForward(prices, candidates)
+            for start, end in ((0, 800), (13, 170), (201, 260), (333, 700), (770, 800)):
+                expected = [evaluate_params_with_drawdown(prices[start:end], c["fast"], c["slow"]) for c in candidates]
+                self.assertEqual(engine.window_stats(start, end), expected, (tick, seed, start, end))
+
+    def test_summaries_match_single_candidate_runs(self):
+        prices = _tick_walk(400, 9)
+        candidates = [{"fast": 3, "slow": 8}, {"fast": 5, "slow": 20}, {"fast": 4, "slow": 90}]
+        summaries = summarize_candidates_walk_forward(prices, candidates, 100, 50, step_size=50, min_trades=2)
+        for c, summary in zip(candidates, summaries):
+            expected = run_walk_forward(prices, [c], 100, 50, step_size=50, min_trades=2)["summary"]
+            self.assertEqual(summary, expected)
+
+    def test_flat_window_has_no_signal(self):
+        # 100.1 is not exact in binary, so summed means of a flat window can differ by
+        # rounding; the tie rule must not read that as a crossover.
+        prices = [100.1] * 30 + [100.6 + 0.5 * k for k in range(10)]
+        engine = MAWalkForward(prices, [{"fast": 2, "slow": 5}])
+        self.assertEqual(engine.window_stats(0, 30), [{"pnl": 0.0, "max_drawdown": 0.0, "trades": 0}])
+        stats = engine.window_stats(10, 40)[0]
+        self.assertEqual(stats["trades"], 1)
+        self.assertAlmostEqual(stats["pnl"], prices[-1] - prices[31])
+
+    def test_parallel_runs_match_serial(self):
+        prices = _tick_walk(700, 4)
+        candidates = [{"fast": f, "slow": s} for f in (2, 4, 6) for s in (10, 15, 30)]
+        serial = run_walk_forward(prices, candidates, 150, 50, step_size=40, objective="pnl_dd", dd_penalty=0.3)
+        seen = []
+        parallel = run_walk_forward(
+            prices,
+            candidates,
+            150,
+            50,
+            step_size=40,
+            objective="pnl_dd",
+            dd_penalty=0.3,
+            workers=2,
+            progress=lambda done, total: seen.append(total),
+        )
+        self.assertEqual(parallel, serial)
+        self.assertEqual(set(seen), {len(serial["rows"])})
+        self.assertEqual(
+            summarize_candidates_walk_forward(prices, candidates, 150, 50, step_size=40, workers=2),
+            summarize_candidates_walk_forward(prices, candidates, 150, 50, step_size=40),
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -4,6 +4,7 @@ import json
 import os
 
 from engine.data_engine import DataEngine
+from engine.parallel_eval import print_progress
 from engine.walk_forward import run_walk_forward
 
 
@@ -49,6 +50,7 @@ def main():
     parser.add_argument("--test-size", type=int, default=120, help="test window bars")
     parser.add_argument("--step-size", type=int, default=120, help="rolling step bars")
     parser.add_argument("--out-dir", default="output", help="output directory")
+    parser.add_argument("--workers", type=int, default=1, help="window evaluation processes, 0 means all cores")
     args = parser.parse_args()
 
     cfg = load_config()
@@ -74,6 +76,8 @@ def main():
         objective=objective,
         dd_penalty=dd_penalty,
         min_trades=min_trades,
+        workers=args.workers,
+        progress=print_progress("walk-forward windows", every=2.0),
     )
 
     os.makedirs(args.out_dir, exist_ok=True)
@@ -2,9 +2,12 @@ import argparse
 import json
 
 from engine.data_engine import DataEngine
-from engine.rsi_tuner import evaluate_candidate_walk_forward
+from engine.parallel_eval import print_progress
+from engine.result_cache import describe_cache, hash_prices, make_key, open_result_cache
+from engine.rsi_tuner import evaluate_candidates_walk_forward
+from engine.state_db import state_options
 from engine.strategy_state import StrategyState
-from engine.walk_forward import run_walk_forward
+from engine.walk_forward import summarize_candidates_walk_forward
 
 
 def load_config(path="config.json"):
@@ -26,6 +29,49 @@ def build_candidates(fast_min, fast_max, slow_min, slow_max, slow_step):
     return candidates
 
 
+def summarize_candidates(prices, candidates, strategy_name, base_params, windows_cfg, workers=1, progress=None, cache=None):
+    rsi = strategy_name in ("rsi_ma", "rsi")
+    if cache is not None:
+        # Summaries depend on prices, windows and (for rsi_ma) base_params only.
+        dataset_hash = hash_prices(prices)
+        setup = ["rsi_ma", base_params, windows_cfg] if rsi else ["ma", None, windows_cfg]
+        keys = [make_key("walk_forward", dataset_hash, setup + [candidate]) for candidate in candidates]
+        return cache.cached(
+            keys,
+            lambda missing: summarize_candidates(
+                prices,
+                [candidates[pos] for pos in missing],
+                strategy_name,
+                base_params,
+                windows_cfg,
+                workers=workers,
+                progress=progress,
+            ),
+        )
+    if rsi:
+        return evaluate_candidates_walk_forward(
+            prices=prices,
+            candidates=candidates,
+            train_size=windows_cfg["train_size"],
+            test_size=windows_cfg["test_size"],
+            step_size=windows_cfg["step_size"],
+            base_params=base_params,
+            min_trades=0,
+            workers=workers,
+            progress=progress,
+        )
+    return summarize_candidates_walk_forward(
+        prices=prices,
+        candidates=candidates,
+        train_size=windows_cfg["train_size"],
+        test_size=windows_cfg["test_size"],
+        step_size=windows_cfg["step_size"],
+        min_trades=0,
+        workers=workers,
+        progress=progress,
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(description="Tune fast/slow by walk-forward result.")
     parser.add_argument("--symbol", default=None)
@@ -40,6 +86,8 @@ def main():
     parser.add_argument("--dd-penalty", type=float, default=0.5)
     parser.add_argument("--min-positive-windows", type=int, default=1)
     parser.add_argument("--allow-non-ma", action="store_true", help="allow tune for unsupported strategy names")
+    parser.add_argument("--workers", type=int, default=1, help="candidate evaluation processes, 0 means all cores")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the backtest result cache")
     args = parser.parse_args()
 
     cfg = load_config()
@@ -72,33 +120,24 @@ def main():
         "trend_window": cfg["strategy"].get("trend_window", 50),
     }
 
+    cache = open_result_cache(cfg, enabled=not args.no_cache)
+    windows_cfg = {"train_size": args.train_size, "test_size": args.test_size, "step_size": args.step_size}
+    summaries = summarize_candidates(
+        prices,
+        candidates,
+        strategy_name,
+        base_params,
+        windows_cfg,
+        workers=args.workers,
+        progress=print_progress("walk-forward chunks", every=2.0),
+        cache=cache,
+    )
+    print(describe_cache(cache))
+
     best = None
     best_score = None
     best_summary = None
-    for candidate in candidates:
-        if strategy_name in ("rsi_ma", "rsi"):
-            summary = evaluate_candidate_walk_forward(
-                prices=prices,
-                candidate=candidate,
-                train_size=args.train_size,
-                test_size=args.test_size,
-                step_size=args.step_size,
-                base_params=base_params,
-                min_trades=0,
-            )
-        else:
-            result = run_walk_forward(
-                prices=prices,
-                candidates=[candidate],
-                train_size=args.train_size,
-                test_size=args.test_size,
-                step_size=args.step_size,
-                objective="pnl",
-                dd_penalty=0.0,
-                min_trades=0,
-            )
-            summary = result["summary"]
-
+    for candidate, summary in zip(candidates, summaries):
         if summary["windows_valid"] == 0:
             continue
         if summary["windows_positive"] < args.min_positive_windows:
@@ -117,7 +156,7 @@ def main():
     cfg["strategy"]["slow"] = best["slow"]
     save_config(cfg, "config.json")
 
-    StrategyState("state/strategy_state.json").save_params(
+    StrategyState("state/strategy_state.json", **state_options(cfg)).save_params(
         {
             "fast": best["fast"],
             "slow": best["slow"],